@@ -0,0 +1,295 @@
+"""
+Time the data pipeline's stages on synthetic data of growing size, to see how
+each one scales.
+
+Run from the project root:
+    python -m src.benchmark                              # scales 0.25, 0.5 and 1
+    python -m src.benchmark --scales 1 10 100 --stages process_data player_matchups
+    python -m src.benchmark --repeat 3                   # best of three runs per measurement
+
+For every scale, synthetic_data.py writes an IPL.csv into its own work directory
+under benchmarks/work/ (reused by later runs with the same scale and seed),
+which is then processed like the real data. Every stage is measured in a fresh
+process with the processed frames already loaded, recording wall and CPU time,
+the process's peak RSS and how much the stage itself added to it. The sections
+of generate_comprehensive_stats are also timed one by one.
+
+Each stage gets a scaling exponent: the slope of log(time) against log(ball
+rows) across the scales, so ~1 is linear and ~2 quadratic. Stages above
+--max-exponent are flagged as superlinear. Results are printed as a table and
+appended to benchmarks/history.json, and each stage is compared with the
+previous run in the history at the same scale.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from profiling import peak_rss_mb, profile_stage, reset_peak_rss
+from synthetic_data import generate
+
+BENCHMARK_DIR = 'benchmarks'
+WORK_DIR = os.path.join(BENCHMARK_DIR, 'work')
+HISTORY_PATH = os.path.join(BENCHMARK_DIR, 'history.json')
+MODEL_ASSETS_DIR = 'model_assets'
+
+# Pipeline stages plus the two run outside its stage graph
+DEFAULT_STAGES = ['process_data', 'elo', 'comprehensive_stats', 'player_matchups', 'venue_analytics',
+                  'team_matches', 'team_performance', 'advanced_analytics', 'prediction_data',
+                  'rebuild_archetypes', 'archetype_analytics']
+# Stages faster than this at the largest scale are too noisy to flag
+MIN_FLAG_SECONDS = 0.1
+
+def stage_names():
+    from pipeline import STAGE_NAMES
+    return ['process_data', 'elo'] + STAGE_NAMES
+
+def section_times(starts, end):
+    """Seconds per comprehensive stats section from its (banner, start) marks; the last mark ends the run"""
+    marks = starts + [(None, end)]
+    times = {}
+    for (title, start), (_, finish) in zip(marks, marks[1:]):
+        if title is not None and title[0].isdigit():
+            name = title.split('. ', 1)[1].replace('GENERATING ', '').lower()
+            times[name] = round(finish - start, 3)
+    return times
+
+def rss_baseline():
+    """
+    Resident memory before a stage, to subtract from its peak: the current RSS
+    where the peak can be reset (profile_stage resets it too), otherwise the
+    process's peak so far
+    """
+    reset_peak_rss()
+    return peak_rss_mb()
+
+def measure(name):
+    """
+    Run one stage in this process, from the current (work) directory, and return
+    its metrics. Meant to be called in a fresh process per measurement.
+    """
+    if name == 'process_data':
+        from process_data import process_data
+        baseline = rss_baseline()
+        with profile_stage(name) as metrics:
+            process_data()
+        metrics['rows'] = {'raw': int(sum(1 for _ in open('data/IPL.csv')) - 1)}
+    else:
+        from pipeline import load_frames, STAGES_BY_NAME
+        matches, balls = load_frames()
+        baseline = rss_baseline()
+        if name == 'elo':
+            from elo import EloTracker
+            def run(matches, balls):
+                tracker = EloTracker()
+                tracker.process_matches(matches)
+                tracker.team_series()
+        else:
+            run = STAGES_BY_NAME[name]['run']
+        with profile_stage(name) as metrics:
+            run(matches.copy(), balls)
+        metrics['rows'] = {'matches': len(matches), 'balls': len(balls)}
+        if name == 'comprehensive_stats':
+            import generate_comprehensive_stats
+            metrics['sections'] = section_times(generate_comprehensive_stats.section_starts, time.perf_counter())
+    if baseline is not None and metrics['peak_rss_mb'] is not None:
+        metrics['stage_rss_mb'] = round(metrics['peak_rss_mb'] - baseline, 1)
+    return metrics
+
+def prepare_work_dir(scale, seed):
+    """Work directory with a synthetic data/IPL.csv at this scale, created on first use"""
+    work = os.path.join(WORK_DIR, f'x{scale:g}_seed{seed}')
+    raw = os.path.join(work, 'data', 'IPL.csv')
+    if not os.path.exists(raw):
+        print(f"[benchmark] Generating synthetic data at {scale:g}x in {work}")
+        # Write under a temporary name so an interrupted run is not reused
+        matches, rows = generate(raw + '.part', scale=scale, seed=seed)
+        os.replace(raw + '.part', raw)
+        print(f"[benchmark] {matches} matches, {rows} deliveries")
+    # Stages that read the shipped encoders expect them under model_assets/
+    if os.path.isdir(MODEL_ASSETS_DIR):
+        os.makedirs(os.path.join(work, MODEL_ASSETS_DIR), exist_ok=True)
+        for name in os.listdir(MODEL_ASSETS_DIR):
+            if name.endswith('.pkl'):
+                shutil.copy2(os.path.join(MODEL_ASSETS_DIR, name), os.path.join(work, MODEL_ASSETS_DIR, name))
+    os.makedirs(os.path.join(work, 'webapp', 'static', 'data'), exist_ok=True)
+    return work
+
+def run_measurement(name, work):
+    """Measure one stage in a subprocess run from the work directory; returns (metrics, error)"""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        result_path = f.name
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', name, '--result', result_path],
+                              cwd=work, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+        with open(result_path) as f:
+            return json.load(f), None
+    finally:
+        os.remove(result_path)
+
+def scaling_exponent(sizes, seconds):
+    """Slope of log(seconds) against log(size), or None with fewer than two usable points"""
+    points = [(s, t) for s, t in zip(sizes, seconds) if s and t and t > 0]
+    if len(set(s for s, _ in points)) < 2:
+        return None
+    x, y = np.log([s for s, _ in points]), np.log([t for _, t in points])
+    return round(float(np.polyfit(x, y, 1)[0]), 2)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)['runs']
+
+def previous_wall(history, seed, scale, stage):
+    """Wall time of a stage at this scale and seed in the latest earlier run that measured it"""
+    for run in reversed(history):
+        if run['seed'] == seed:
+            wall = run['stages'].get(stage, {}).get(f'{scale:g}', {}).get('wall_s')
+            if wall is not None:
+                return wall
+    return None
+
+def run_benchmark(scales, stages, seed=0, repeat=1, max_exponent=1.3):
+    """
+    Measure every stage at every scale (best wall time of repeat runs) and return
+    the run record: per-stage metrics keyed by scale, scaling exponents and the
+    stages flagged as superlinear. Comprehensive stats sections are reported as
+    'comprehensive_stats/<section>'.
+    """
+    results, sizes, failures = {}, {}, {}
+    for scale in scales:
+        key = f'{scale:g}'
+        work = prepare_work_dir(scale, seed)
+        # Every other stage reads the processed files
+        if 'process_data' not in stages and not os.path.exists(os.path.join(work, 'data', 'IPL_balls.feather')):
+            run_measurement('process_data', work)
+        for name in stages:
+            print(f"[benchmark] {key}x {name}")
+            best = None
+            for _ in range(repeat):
+                metrics, error = run_measurement(name, work)
+                if error:
+                    failures.setdefault(name, {})[key] = error
+                    print(f"[benchmark] {name} failed at {key}x: {error}")
+                    break
+                if best is None or metrics['wall_s'] < best['wall_s']:
+                    best = metrics
+            if best is None:
+                continue
+            if 'balls' in best['rows']:
+                sizes[key] = best['rows']['balls']
+            elif key not in sizes:
+                sizes[key] = best['rows']['raw']
+            for section, seconds in best.pop('sections', {}).items():
+                results.setdefault(f'{name}/{section}', {})[key] = {'wall_s': seconds}
+            results.setdefault(name, {})[key] = best
+
+    scaling = {}
+    for name, by_scale in results.items():
+        keys = [f'{s:g}' for s in scales if f'{s:g}' in by_scale]
+        scaling[name] = scaling_exponent([sizes.get(k) for k in keys], [by_scale[k]['wall_s'] for k in keys])
+    largest = {name: by_scale[max(by_scale, key=float)]['wall_s'] for name, by_scale in results.items()}
+    superlinear = [name for name, exponent in scaling.items()
+                   if exponent is not None and exponent > max_exponent and largest[name] >= MIN_FLAG_SECONDS]
+
+    return {
+        'generated_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'seed': seed,
+        'repeat': repeat,
+        'scales': [float(s) for s in scales],
+        'ball_rows': sizes,
+        'max_exponent': max_exponent,
+        'stages': results,
+        'scaling': scaling,
+        'superlinear': superlinear,
+        'failures': failures
+    }
+
+def print_report(run, history):
+    keys = [f'{s:g}' for s in run['scales']]
+    rows = ', '.join(f"{k}x={run['ball_rows'].get(k, '?')}" for k in keys)
+    print(f"\n[benchmark] Wall time by scale (ball rows: {rows})")
+    header = f"  {'stage':<48}" + ''.join(f"{k + 'x':>10}" for k in keys)
+    print(header + f"{'stage rss':>11}{'exponent':>10}{'vs last':>9}")
+    for name, by_scale in run['stages'].items():
+        line = f"  {name:<48}"
+        for k in keys:
+            line += f"{by_scale[k]['wall_s']:9.2f}s" if k in by_scale else f"{'-':>10}"
+        largest = by_scale[max(by_scale, key=float)]
+        rss = largest.get('stage_rss_mb')
+        line += f"{rss:8.0f} MB" if rss is not None else f"{'-':>11}"
+        exponent = run['scaling'].get(name)
+        line += f"{exponent:10.2f}" if exponent is not None else f"{'-':>10}"
+        last = previous_wall(history, run['seed'], float(max(by_scale, key=float)), name)
+        line += f"{largest['wall_s'] / last:8.2f}x" if last else f"{'-':>9}"
+        if name in run['superlinear']:
+            line += "  SUPERLINEAR"
+        print(line)
+    if run['superlinear']:
+        print(f"\n[benchmark] Superlinear (exponent > {run['max_exponent']}): {', '.join(run['superlinear'])}")
+    for name, by_scale in run['failures'].items():
+        for key, error in by_scale.items():
+            print(f"[benchmark] {name} failed at {key}x: {error}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data of growing size")
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.25, 0.5, 1],
+                        help="synthetic data sizes as multiples of the real match history")
+    parser.add_argument('--stages', nargs='+', default=DEFAULT_STAGES, metavar='STAGE',
+                        help=f"stages to measure (default: {' '.join(DEFAULT_STAGES)})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help="runs per measurement; the fastest is kept")
+    parser.add_argument('--max-exponent', type=float, default=1.3,
+                        help="flag stages whose time grows faster than size ** this")
+    parser.add_argument('--history', default=HISTORY_PATH)
+    # Internal: measure one stage in this process and write its metrics to --result
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        metrics = measure(args.measure)
+        with open(args.result, 'w') as f:
+            json.dump(metrics, f)
+        return 0
+
+    unknown = set(args.stages) - set(stage_names())
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(stage_names())})")
+    # Keep pipeline order so archetype_analytics finds rebuild_archetypes' output
+    stages = [name for name in stage_names() if name in args.stages]
+    scales = sorted(set(args.scales))
+
+    history = load_history(args.history)
+    run = run_benchmark(scales, stages, seed=args.seed, repeat=args.repeat, max_exponent=args.max_exponent)
+    print_report(run, history)
+
+    os.makedirs(os.path.dirname(args.history) or '.', exist_ok=True)
+    with open(args.history, 'w') as f:
+        json.dump({'runs': history + [run]}, f, indent=2)
+    print(f"\n[benchmark] Appended this run to {args.history}")
+    return 1 if run['failures'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
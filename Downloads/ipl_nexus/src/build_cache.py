@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import re
+import pandas as pd
+
+MANIFEST_PATH = 'webapp/static/data/.build_manifest.json'
+MANIFEST_VERSION = 1
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def module_sources(module):
+    """Source files of a src module and every src module it imports, transitively"""
+    seen, todo = set(), [module]
+    while todo:
+        name = todo.pop()
+        path = os.path.join(SRC_DIR, f'{name}.py')
+        if name in seen or not os.path.exists(path):
+            continue
+        seen.add(name)
+        with open(path) as f:
+            todo += re.findall(r'^\s*(?:from|import)\s+(\w+)', f.read(), re.M)
+    return sorted(os.path.join(SRC_DIR, f'{name}.py') for name in seen)
+
+class BuildCache:
+    """
+    Fingerprints of the last successful build of each pipeline stage, kept in a
+    small manifest next to the outputs.
+
+    A stage's fingerprint covers the contents of its input files, the source of
+    its module (and the src modules it imports) and its parameters. When it
+    matches the manifest and the outputs are still on disk, the stage can be
+    skipped and its existing outputs reused.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        if manifest.get('version') != MANIFEST_VERSION:
+            manifest = {}
+        self.stages = manifest.get('stages', {})
+        # path -> size, mtime and digest, so unchanged files are not re-hashed
+        self.files = manifest.get('files', {})
+
+    def file_hash(self, path):
+        """sha256 of a file (None if missing), reusing the stored digest while size and mtime are unchanged"""
+        if not os.path.isfile(path):
+            return None
+        st = os.stat(path)
+        cached = self.files.get(path)
+        if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self.files[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        """Hash of everything that decides a stage's outputs"""
+        parts = {
+            'inputs': {path: self.file_hash(path) for path in stage['inputs']},
+            'sources': {os.path.basename(path): self.file_hash(path) for path in module_sources(stage['module'])},
+            'params': stage.get('params', {}),
+            'outputs': sorted(stage['outputs']),
+            'pandas': pd.__version__
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def is_fresh(self, stage, fingerprint):
+        """True if the stage last built with this fingerprint and its outputs still exist"""
+        entry = self.stages.get(stage['name'])
+        return (entry is not None and entry['fingerprint'] == fingerprint
+                and all(os.path.exists(path) for path in stage['outputs']))
+
+    def record(self, stage, fingerprint):
+        self.stages[stage['name']] = {
+            'fingerprint': fingerprint,
+            'built_at': pd.Timestamp.now().isoformat(timespec='seconds')
+        }
+
+    def forget(self, stage):
+        self.stages.pop(stage['name'], None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'stages': self.stages, 'files': self.files}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
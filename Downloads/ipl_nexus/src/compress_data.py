@@ -0,0 +1,161 @@
+"""
+Precompressed .gz and .br copies of the dashboard JSON, which the Flask data
+route sends as-is to clients that accept them, so nothing is compressed per
+request.
+
+Run from the project root (the pipeline also runs it after every build):
+    python -m src.compress_data
+    python -m src.compress_data --jobs 4
+
+Brotli at quality 11 makes files ~10% smaller than quality 9 but is over a
+hundred times slower (a few seconds per MB), so only new or changed files are
+compressed and the work is spread over --jobs processes. A file counts as
+changed when its content hash differs from the one recorded when its copies
+were written (in .compressed.json), so a stage that rewrites identical JSON
+costs nothing here. The web app uses the same record to tell whether a copy
+still matches its file.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError: # Without the Brotli package only .gz copies are written
+    brotli = None
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from data_manifest import content_hash, write_json_if_changed
+
+DATA_DIR = 'webapp/static/data'
+# Relative path -> {'digest': content hash the copies were made from,
+#                   'copies': {suffix: True if written, False if not smaller}}
+RECORD_NAME = '.compressed.json'
+# Smaller files gain too little to be worth a second request path
+MIN_BYTES = 1024
+BROTLI_QUALITY = 11
+
+def gzip_bytes(data):
+    # Fixed mtime so unchanged JSON compresses to identical bytes
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def brotli_bytes(data):
+    return brotli.compress(data, quality=BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+
+def compressors():
+    """Suffix -> compress function for every encoding available here"""
+    available = {'.gz': gzip_bytes}
+    if brotli is not None:
+        available['.br'] = brotli_bytes
+    return available
+
+def load_record(directory=DATA_DIR):
+    """The compression record of directory ({} if missing or unreadable)"""
+    try:
+        with open(os.path.join(directory, RECORD_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def compress_file(path, suffixes):
+    """
+    Write the given precompressed siblings of one file. A sibling that would not
+    be smaller than the file is deleted instead. Returns ({suffix: written},
+    number of siblings removed).
+    """
+    codecs = compressors()
+    with open(path, 'rb') as f:
+        data = f.read()
+    copies = {}
+    removed = 0
+    for suffix in suffixes:
+        compressed = codecs[suffix](data)
+        copies[suffix] = len(compressed) < len(data)
+        if not copies[suffix]:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+                removed += 1
+            continue
+        # Replace atomically so the server never sends a partly written file
+        with open(path + suffix + '.tmp', 'wb') as f:
+            f.write(compressed)
+        os.replace(path + suffix + '.tmp', path + suffix)
+    return copies, removed
+
+def precompress(directory=DATA_DIR, min_bytes=MIN_BYTES, jobs=1):
+    """
+    Write a .gz (and, with Brotli installed, a .br) sibling next to every JSON
+    file under directory of at least min_bytes, compressing files across jobs
+    worker processes. Siblings made from the file's current content (per the
+    record) are kept, and siblings whose source is gone or too small are
+    deleted. Returns (written, removed).
+    """
+    suffixes = list(compressors())
+    record = load_record(directory)
+    current = {}
+    tasks = []
+    removed = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.startswith('.'): # Build state, not served
+                continue
+            path = os.path.join(root, name)
+            source, suffix = os.path.splitext(path)
+            if suffix in ('.gz', '.br'):
+                # Stale copy of a source that no longer qualifies
+                if not (source.endswith('.json') and os.path.exists(source)
+                        and os.path.getsize(source) >= min_bytes):
+                    os.remove(path)
+                    removed += 1
+                continue
+            if suffix != '.json' or os.path.getsize(path) < min_bytes:
+                continue
+
+            logical = os.path.relpath(path, directory).replace(os.sep, '/')
+            digest = content_hash(path)
+            entry = record.get(logical, {})
+            copies = entry.get('copies', {}) if entry.get('digest') == digest else {}
+            # Missing from the record, or written but deleted since
+            stale = [s for s in suffixes if s not in copies or (copies[s] and not os.path.exists(path + s))]
+            current[logical] = {'digest': digest, 'copies': copies}
+            if stale:
+                tasks.append((path, stale, logical))
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(compress_file, [t[0] for t in tasks], [t[1] for t in tasks],
+                                    chunksize=max(len(tasks) // (jobs * 4), 1)))
+    else:
+        results = [compress_file(path, stale) for path, stale, _ in tasks]
+
+    written = 0
+    for (_, _, logical), (copies, dropped) in zip(tasks, results):
+        current[logical]['copies'] = {**current[logical]['copies'], **copies}
+        written += sum(copies.values())
+        removed += dropped
+    # Written last, so a copy is only ever listed once it is complete
+    write_json_if_changed(os.path.join(directory, RECORD_NAME), dict(sorted(current.items())))
+    return written, removed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write .gz/.br copies of the dashboard JSON")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    written, removed = precompress(jobs=args.jobs)
+    encodings = ', '.join(compressors())
+    print(f"Wrote {written} compressed files ({encodings}) and removed {removed} stale ones "
+          f"in {time.perf_counter() - start:.2f}s")
+    if brotli is None:
+        print("Brotli is not installed; skipped .br files (pip install Brotli)")
+
+if __name__ == "__main__":
+    main()
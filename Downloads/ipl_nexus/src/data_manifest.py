@@ -0,0 +1,88 @@
+"""
+Manifest of content-hashed names for the dashboard data, written by the
+pipeline after every build.
+
+The web app resolves data URLs through it (the data_url template helper), so a
+page asks for e.g. /data/team_matches.3f2a9c1b7d4e.json. That name is served
+as team_matches.json and cached by browsers for a year, and a rebuild that
+changes the file changes its name, so unchanged data is never fetched twice.
+
+Only the files the templates load through data_url are listed, as nothing else
+is ever asked for under a hashed name (the per-batter matchup shards, for one,
+are read by the API, not by pages).
+"""
+import hashlib
+import json
+import os
+import re
+
+DATA_DIR = 'webapp/static/data'
+TEMPLATES_DIR = 'webapp/templates'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+# data_url("name.json") in a template; data URLs are always built from literal names
+DATA_URL_CALL = re.compile(r"""data_url\(\s*(["'])(?P<name>[^"']+)\1\s*\)""")
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def hashed_name(name, digest):
+    """team_matches.json -> team_matches.<digest>.json"""
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{digest}{ext}'
+
+def page_data_files(templates_dir=TEMPLATES_DIR):
+    """Data files (relative to the data directory) that the templates load through data_url"""
+    names = set()
+    for root, _, files in os.walk(templates_dir):
+        for name in files:
+            if name.endswith('.html'):
+                with open(os.path.join(root, name), encoding='utf-8') as f:
+                    names.update(m['name'] for m in DATA_URL_CALL.finditer(f.read()))
+    return names
+
+def build_manifest(directory=DATA_DIR, templates_dir=TEMPLATES_DIR):
+    """Each data file the templates load (see page_data_files) that exists under directory -> its content-hashed name"""
+    manifest = {}
+    for logical in sorted(page_data_files(templates_dir)):
+        path = os.path.join(directory, *logical.split('/'))
+        if os.path.isfile(path):
+            manifest[logical] = hashed_name(logical, content_hash(path))
+    return manifest
+
+def write_json_if_changed(path, data):
+    """
+    Write data to path as JSON unless the file already holds exactly that, so
+    an unchanged file keeps its mtime (and is not recompressed or reloaded).
+    The file is replaced atomically. Returns True if it was written.
+    """
+    text = json.dumps(data, indent=2)
+    try:
+        with open(path) as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path + '.tmp', 'w') as f:
+        f.write(text)
+    os.replace(path + '.tmp', path)
+    return True
+
+def write_manifest(directory=DATA_DIR, templates_dir=TEMPLATES_DIR):
+    """
+    Rebuild directory/manifest.json if its content changed and return the
+    manifest. The web app checks each entry against the file's current content
+    before using it, so a file rewritten without refreshing the manifest is
+    served under its plain name.
+    """
+    manifest = build_manifest(directory, templates_dir)
+    write_json_if_changed(os.path.join(directory, MANIFEST_NAME), manifest)
+    return manifest
+
+if __name__ == "__main__":
+    manifest = write_manifest()
+    print(f"Wrote {len(manifest)} entries to {os.path.join(DATA_DIR, MANIFEST_NAME)}")
@@ -1,24 +1,156 @@
 import pandas as pd
 import numpy as np
+import json
+import os
+
+# Rating state and history saved after each run, so later runs only apply new matches
+ELO_CHECKPOINT_PATH = 'model_assets/elo_checkpoint.json'
+
+HISTORY_COLUMNS = ['match_id', 'date', 'season', 'team1', 'team2',
+                   'rating_team1_pre', 'rating_team2_pre', 'rating_team1_post', 'rating_team2_post',
+                   'winner', 'win_prob_team1']
+
+# Columns of an already-processed match that, if changed, invalidate the checkpoint
+MATCH_KEY_COLUMNS = ['date', 'team1', 'team2', 'winner']
+
+def home_venue(venues):
+    """The venue a team has played at most often ({venue: matches}); ties to the alphabetically first"""
+    return min(venues, key=lambda v: (-venues[v], v)) if venues else None
+
+def home_flags(df, venue_counts):
+    """
+    +1/-1/0 per match of df (in rating order) when team1/team2/neither is at home.
+    A team's home ground is taken from its matches before that one only (see
+    home_venue), so a match is never rated with venue information from later
+    seasons and new matches never change the flags of earlier ones.
+    venue_counts maps team -> {venue: matches played there} over the matches
+    before df and is updated in place; a team's first match has no home ground.
+    """
+    flags = np.zeros(len(df))
+    for i, (team1, team2, venue) in enumerate(zip(df['team1'], df['team2'], df['venue'])):
+        homes = [home_venue(venue_counts.get(team)) for team in (team1, team2)]
+        flags[i] = int(homes[0] == venue) - int(homes[1] == venue)
+        if pd.notna(venue):
+            for team in (team1, team2):
+                venues = venue_counts.setdefault(team, {})
+                venues[venue] = venues.get(venue, 0) + 1
+    return flags
+
+def margin_units(matches):
+    """Size of each result on a common scale: 10 runs or 2 wickets in hand make one unit"""
+    zeros = pd.Series(0, index=matches.index)
+    return (matches.get('win_by_runs', zeros).fillna(0) / 10
+            + matches.get('win_by_wickets', zeros).fillna(0) / 2).to_numpy(dtype=float)
+
+def mov_multiplier(units, mov_scale):
+    """Margin-of-victory multiplier on K (shaped like mov_scale x units); mov_scale=0 is plain Elo"""
+    return 1 + np.multiply.outer(np.asarray(mov_scale, dtype=float), np.log1p(units))
+
+def match_arrays(matches_df, teams=(), venue_counts=None, last_season=None):
+    """
+    Matches in rating order (by date, then match_id; missing teams dropped) and the
+    arrays the engine runs on. Team codes extend teams in order of first appearance.
+    venue_counts holds the venues of the matches already rated (see home_flags)
+    and is updated in place; last_season is the season of the last match already
+    rated, so the first new match is only flagged as a season start if the season
+    changed.
+    """
+    df = matches_df[matches_df['team1'].notna() & matches_df['team2'].notna()]
+    df = df.assign(date=df['date'].astype(str).str[:10]).sort_values(['date', 'match_id'], kind='mergesort')
+
+    teams = list(teams)
+    seen = set(teams)
+    teams += [t for t in pd.unique(df[['team1', 'team2']].values.ravel()) if t not in seen]
+    codes = {t: i for i, t in enumerate(teams)}
+
+    winner = df['match_won_by']
+
+    season = df['season'].fillna(0).astype(int).to_numpy()
+    previous = np.concatenate([[last_season if last_season is not None else -1], season[:-1]])
+
+    arrays = {
+        'team1': df['team1'].map(codes).to_numpy(),
+        'team2': df['team2'].map(codes).to_numpy(),
+        'score1': np.where(winner == df['team1'], 1.0, np.where(winner == df['team2'], 0.0, 0.5)),
+        'home': home_flags(df, {} if venue_counts is None else venue_counts),
+        'units': margin_units(df),
+        'season': season,
+        'season_start': season != previous
+    }
+    return df, teams, arrays
+
+def replay_ratings(team1, team2, score1, ratings, k, home=None, home_advantage=0, mov=None,
+                   season_start=None, regression=0, base_rating=1500):
+    """
+    Sequential Elo updates over integer-coded match arrays, for one or many
+    parameter sets at once.
+
+    ratings has shape (configs, teams) and is updated in place; k, home_advantage
+    and regression are scalars or one value per config. team1/team2 index teams,
+    score1 is 1, 0 or 0.5 for team1, home is +1/-1/0 when team1/team2/neither is at
+    home, and mov is the margin-of-victory multiplier per match (or per config and
+    match). At each season_start, ratings regress towards base_rating by the
+    regression fraction. The loop runs once over the matches and every step is
+    vectorized across configs, so a whole grid costs little more than one replay.
+
+    Returns the pre-match ratings of both sides and team1's expected score, each
+    shaped (configs, matches).
+    """
+    configs, n = ratings.shape[0], len(team1)
+    k = np.broadcast_to(np.asarray(k, dtype=float), (configs,))
+    home_advantage = np.broadcast_to(np.asarray(home_advantage, dtype=float), (configs,))
+    regression = np.broadcast_to(np.asarray(regression, dtype=float), (configs,))
+    home = np.zeros(n) if home is None else home
+    mov = np.ones(n) if mov is None else mov
+    k_mov = np.broadcast_to(k[:, None] * mov, (configs, n))
+    regress = season_start is not None and regression.any()
+
+    r1_pre, r2_pre, p1 = np.empty((configs, n)), np.empty((configs, n)), np.empty((configs, n))
+    for i, (a, b, s1, h) in enumerate(zip(team1.tolist(), team2.tolist(), score1.tolist(), home.tolist())):
+        if regress and season_start[i]:
+            ratings -= regression[:, None] * (ratings - base_rating)
+        ra, rb = ratings[:, a].copy(), ratings[:, b].copy()
+        p = 1 / (1 + 10 ** ((rb - ra - home_advantage * h) / 400))
+        ratings[:, a] = ra + k_mov[:, i] * (s1 - p)
+        ratings[:, b] = rb + k_mov[:, i] * ((1 - s1) - (1 - p))
+        r1_pre[:, i], r2_pre[:, i], p1[:, i] = ra, rb, p
+    return r1_pre, r2_pre, p1
 
 class EloTracker:
-    def __init__(self, k_factor=30, base_rating=1500, home_advantage=0):
+    def __init__(self, k_factor=30, base_rating=1500, home_advantage=0, mov_scale=0, season_regression=0):
         self.k = k_factor
         self.ratings = {} # dict of team -> rating
-        self.history = [] # list of dicts
+        self.history = pd.DataFrame(columns=HISTORY_COLUMNS) # one row per processed match
         self.base_rating = base_rating
-        self.home_advantage = home_advantage
+        self.home_advantage = home_advantage # rating points added to the home side
+        self.mov_scale = mov_scale # weight of the margin of victory on K (0 = plain Elo)
+        self.season_regression = season_regression # fraction regressed to base_rating each new season
+        self.venue_counts = {} # team -> {venue: matches played there}, for home grounds
+
+    @property
+    def params(self):
+        return {
+            'k_factor': self.k,
+            'base_rating': self.base_rating,
+            'home_advantage': self.home_advantage,
+            'mov_scale': self.mov_scale,
+            'season_regression': self.season_regression
+        }
 
     def get_rating(self, team):
         return self.ratings.get(team, self.base_rating)
 
-    def calculate_expected_score(self, rating_a, rating_b):
-        return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+    def calculate_expected_score(self, rating_a, rating_b, home=0):
+        return 1 / (1 + 10 ** ((rating_b - rating_a - self.home_advantage * home) / 400))
 
-    def update_ratings(self, team1, team2, winner, margin=None):
+    def update_ratings(self, team1, team2, winner, margin=None, home=0):
+        """
+        Rate a single match. margin is in margin_units (10 runs or 2 wickets each);
+        home is 1 if team1 is at home, -1 if team2 is.
+        """
         r1 = self.get_rating(team1)
         r2 = self.get_rating(team2)
-        
+
         # Outcome: 1 if team1 wins, 0 if team2 wins, 0.5 if tie
         if winner == team1:
             actual_score = 1
@@ -26,69 +158,150 @@ class EloTracker:
             actual_score = 0
         else:
             actual_score = 0.5 # Tie/No Result
-            
-        expected_score = self.calculate_expected_score(r1, r2)
-        
-        # Margin of victory multiplier (optional, can be added later)
-        # For now, standard K-factor update
-        
-        new_r1 = r1 + self.k * (actual_score - expected_score)
-        new_r2 = r2 + self.k * ((1 - actual_score) - (1 - expected_score))
-        
+
+        expected_score = self.calculate_expected_score(r1, r2, home)
+
+        # Margin of victory multiplier
+        k = self.k * float(mov_multiplier(margin or 0, self.mov_scale))
+
+        new_r1 = r1 + k * (actual_score - expected_score)
+        new_r2 = r2 + k * ((1 - actual_score) - (1 - expected_score))
+
         self.ratings[team1] = new_r1
         self.ratings[team2] = new_r2
-        
+
         return new_r1, new_r2
 
     def process_matches(self, matches_df):
         """
-        Process matches in chronological order.
-        matches_df must have: date, team1, team2, winner
+        Process matches in chronological order (ties on the same date by match_id),
+        continuing from the current ratings.
+        matches_df must have: match_id, date, season, team1, team2, match_won_by,
+        plus venue for a home advantage and win_by_runs/win_by_wickets for MOV.
+        Matches missing a team are skipped. Returns the history rows for these matches.
         """
-        # Sort by date
-        df = matches_df.sort_values('date').reset_index(drop=True)
-        
-        history_records = []
-        
-        for idx, row in df.iterrows():
-            t1 = row['team1']
-            t2 = row['team2']
-            winner = row['match_won_by'] # or 'winner' column
-            
-            # Get pre-match ratings
-            r1_pre = self.get_rating(t1)
-            r2_pre = self.get_rating(t2)
-            
-            # Update
-            # Handle Ties or No Result if needed
-            # Assuming 'match_won_by' has team name or is NaN/Tie
-            
-            # Clean winner name to match team1/team2
-            # (Assuming standardization happened before this)
-            
-            r1_post, r2_post = self.update_ratings(t1, t2, winner)
-            
-            history_records.append({
-                'match_id': row.get('match_id'),
-                'date': row['date'],
-                'season': row.get('season'),
-                'team1': t1,
-                'team2': t2,
-                'rating_team1_pre': r1_pre,
-                'rating_team2_pre': r2_pre,
-                'rating_team1_post': r1_post,
-                'rating_team2_post': r2_post,
-                'winner': winner,
-                'win_prob_team1': self.calculate_expected_score(r1_pre, r2_pre)
-            })
-            
-        return pd.DataFrame(history_records)
+        last_season = int(self.history['season'].iloc[-1]) if not self.history.empty else None
+        df, teams, arrays = match_arrays(matches_df, self.ratings, self.venue_counts, last_season)
+
+        ratings = np.array([[self.get_rating(t) for t in teams]], dtype=float)
+        mov = mov_multiplier(arrays['units'], self.mov_scale)
+        r1_pre, r2_pre, p1 = replay_ratings(
+            arrays['team1'], arrays['team2'], arrays['score1'], ratings, self.k,
+            home=arrays['home'], home_advantage=self.home_advantage, mov=mov,
+            season_start=arrays['season_start'], regression=self.season_regression,
+            base_rating=self.base_rating)
+        r1_pre, r2_pre, p1 = r1_pre[0], r2_pre[0], p1[0]
+        self.ratings = dict(zip(teams, ratings[0].tolist()))
+
+        # Post-match ratings follow from the pre-match ones and the result
+        score1 = arrays['score1']
+        history = pd.DataFrame({
+            'match_id': df['match_id'].astype(int).to_numpy(),
+            'date': df['date'].to_numpy(),
+            'season': arrays['season'],
+            'team1': df['team1'].to_numpy(),
+            'team2': df['team2'].to_numpy(),
+            'rating_team1_pre': r1_pre,
+            'rating_team2_pre': r2_pre,
+            'rating_team1_post': r1_pre + self.k * mov * (score1 - p1),
+            'rating_team2_post': r2_pre + self.k * mov * ((1 - score1) - (1 - p1)),
+            'winner': df['match_won_by'].to_numpy(),
+            'win_prob_team1': p1
+        })
+        self.history = history if self.history.empty else pd.concat([self.history, history], ignore_index=True)
+        return history
+
+    def update(self, matches_df):
+        """
+        Bring the ratings up to date with matches_df, applying only matches not yet
+        in the history. Falls back to a full replay from the base rating if a new
+        match sorts before the last processed one (by date, then match_id) or a
+        processed match has changed or disappeared. Home grounds only depend on
+        earlier matches (see home_flags), so new matches never change them for
+        matches already rated.
+        Returns (history rows applied, whether a full replay was needed).
+        """
+        if self.history.empty:
+            return self.process_matches(matches_df), True
+
+        # Matches missing a team are never rated, so they are never "new" either
+        matches_df = matches_df[matches_df['team1'].notna() & matches_df['team2'].notna()]
+
+        known = matches_df[matches_df['match_id'].isin(self.history['match_id'])]
+        new = matches_df[~matches_df['match_id'].isin(self.history['match_id'])]
+
+        current = known.assign(date=known['date'].astype(str).str[:10], winner=known['match_won_by'])
+        current = current.set_index('match_id')[MATCH_KEY_COLUMNS].fillna('').astype(str)
+        saved = self.history.set_index('match_id')[MATCH_KEY_COLUMNS].fillna('').astype(str)
+        changed = (current != saved.loc[current.index]).any(axis=1).any() or len(known) < len(self.history)
+        # Replay order is (date, match_id), so a new match on the last processed
+        # day with a lower id also belongs before matches already applied
+        last_date, last_id = max(zip(self.history['date'].astype(str), self.history['match_id'].astype(int)))
+        new_dates = new['date'].astype(str).str[:10]
+        out_of_order = ((new_dates < last_date) | ((new_dates == last_date) & (new['match_id'].astype(int) < last_id))).any()
+
+        if changed or out_of_order:
+            self.ratings = {}
+            self.history = pd.DataFrame(columns=HISTORY_COLUMNS)
+            self.venue_counts = {}
+            return self.process_matches(matches_df), True
+        return self.process_matches(new), False
+
+    def team_series(self, history=None):
+        """
+        Post-match rating series per team, {team: {'dates': [...], 'ratings': [...]}}
+        with ratings rounded for charts, from one groupby over both sides of every
+        match in history (default: the whole history). Teams appear in order of
+        their first match.
+        """
+        history = self.history if history is None else history
+        sides = pd.concat([
+            history[['date', 'team1', 'rating_team1_post']].set_axis(['date', 'team', 'rating'], axis=1),
+            history[['date', 'team2', 'rating_team2_post']].set_axis(['date', 'team', 'rating'], axis=1)
+        ], keys=[0, 1], names=['side', 'row']).swaplevel().sort_index(kind='mergesort')
+        return {
+            team: {'dates': group['date'].tolist(), 'ratings': [round(r, 1) for r in group['rating'].tolist()]}
+            for team, group in sides.groupby('team', sort=False)
+        }
+
+    def save(self, path=ELO_CHECKPOINT_PATH):
+        """Save parameters, ratings and history so a later run can continue with update()"""
+        last = self.history.iloc[-1] if not self.history.empty else None
+        state = {
+            'params': self.params,
+            'last_date': last['date'] if last is not None else None,
+            'last_match_id': int(last['match_id']) if last is not None else None,
+            'ratings': self.ratings,
+            'venue_counts': self.venue_counts,
+            'history': self.history.astype(object).where(self.history.notna(), None).to_dict('list')
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path=ELO_CHECKPOINT_PATH, **params):
+        """
+        Tracker restored from a checkpoint, or a fresh one if there is no checkpoint
+        or it was built with different parameters (or an older checkpoint layout).
+        """
+        tracker = cls(**params)
+        if not os.path.exists(path):
+            return tracker
+        with open(path) as f:
+            state = json.load(f)
+        if state.get('params') != tracker.params or 'venue_counts' not in state:
+            return tracker
+        tracker.ratings = state['ratings']
+        tracker.venue_counts = state['venue_counts']
+        tracker.history = pd.DataFrame(state['history'], columns=HISTORY_COLUMNS)
+        return tracker
 
 def run_elo_analysis(matches_path='../data/IPL_matches.csv'):
     df = pd.read_csv(matches_path)
     # Ensure standard names
     # (Assuming done in processing)
-    
+
     tracker = EloTracker()
     history = tracker.process_matches(df)
     return history
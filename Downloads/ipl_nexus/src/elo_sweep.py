@@ -0,0 +1,125 @@
+"""
+Grid search over Elo parameters, scoring each set by how well win_prob_team1
+predicted the results that followed.
+
+Run from the project root:
+    python -m src.elo_sweep
+    python -m src.elo_sweep --k 20 30 40 --home 0 25 50 --mov 0 0.5 1 --regress 0 0.25 --jobs 4
+
+Every configuration replays the whole match history. The grid is split into one
+chunk per worker and each chunk runs through the engine in a single pass, with
+every step vectorized across its configs (see elo.replay_ratings).
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from elo import match_arrays, mov_multiplier, replay_ratings
+
+MATCHES_PATH = 'data/IPL_matches.csv'
+RESULTS_PATH = 'model_assets/elo_sweep.json'
+PARAM_NAMES = ['k_factor', 'home_advantage', 'mov_scale', 'season_regression']
+
+def score_configs(arrays, configs, n_teams, base_rating=1500, scored=None):
+    """
+    Log-loss and Brier score of win_prob_team1 for each config (rows of
+    k_factor, home_advantage, mov_scale, season_regression).
+    Only decided matches where scored is True count; ties and no results do not.
+    """
+    k, home_advantage, mov_scale, regression = np.asarray(configs, dtype=float).T
+    ratings = np.full((len(k), n_teams), float(base_rating))
+    _, _, p1 = replay_ratings(
+        arrays['team1'], arrays['team2'], arrays['score1'], ratings, k,
+        home=arrays['home'], home_advantage=home_advantage,
+        mov=mov_multiplier(arrays['units'], mov_scale),
+        season_start=arrays['season_start'], regression=regression, base_rating=base_rating)
+
+    decided = arrays['score1'] != 0.5
+    if scored is not None:
+        decided &= scored
+    y, p = arrays['score1'][decided], np.clip(p1[:, decided], 1e-12, 1 - 1e-12)
+    log_loss = -(y * np.log(p) + (1 - y) * np.log(1 - p)).mean(axis=1)
+    brier = ((p - y) ** 2).mean(axis=1)
+    return log_loss, brier
+
+def run_sweep(matches, grid, jobs=1, burn_in_seasons=1, base_rating=1500):
+    """
+    Score every combination in grid ({param: values}) and return a DataFrame
+    sorted by log-loss. The first burn_in_seasons seasons are replayed but not
+    scored, while ratings are still settling.
+    """
+    # Home grounds as known before each match (see elo.home_flags), the same
+    # flags EloTracker rates with
+    _, teams, arrays = match_arrays(matches)
+    seasons = np.unique(arrays['season'])
+    scored = arrays['season'] >= seasons[min(burn_in_seasons, len(seasons) - 1)]
+
+    configs = np.array(list(itertools.product(*(grid[name] for name in PARAM_NAMES))), dtype=float)
+    chunks = [chunk for chunk in np.array_split(configs, max(jobs, 1)) if len(chunk)]
+    if jobs <= 1:
+        scores = [score_configs(arrays, chunk, len(teams), base_rating, scored) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(score_configs, arrays, chunk, len(teams), base_rating, scored) for chunk in chunks]
+            scores = [future.result() for future in futures]
+
+    results = pd.DataFrame(configs, columns=PARAM_NAMES)
+    results['log_loss'] = np.concatenate([log_loss for log_loss, _ in scores])
+    results['brier'] = np.concatenate([brier for _, brier in scores])
+    results.attrs['matches_scored'] = int((scored & (arrays['score1'] != 0.5)).sum())
+    return results.sort_values(['log_loss', 'brier'], kind='mergesort').reset_index(drop=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune Elo parameters by log-loss on match results")
+    parser.add_argument('--k', type=float, nargs='+', default=[10, 20, 30, 40, 50, 60])
+    parser.add_argument('--home', type=float, nargs='+', default=[0, 25, 50, 75, 100],
+                        help="home advantage in rating points")
+    parser.add_argument('--mov', type=float, nargs='+', default=[0, 0.5, 1, 1.5],
+                        help="margin-of-victory scale (0 = plain Elo)")
+    parser.add_argument('--regress', type=float, nargs='+', default=[0, 0.1, 0.2, 0.3, 0.5],
+                        help="fraction of each rating regressed to the base at a new season")
+    parser.add_argument('--burn-in', type=int, default=1, help="seasons to replay before scoring")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--top', type=int, default=10, help="number of configurations to print")
+    parser.add_argument('--output', default=RESULTS_PATH)
+    args = parser.parse_args(argv)
+
+    matches = pd.read_csv(MATCHES_PATH)
+    grid = {'k_factor': args.k, 'home_advantage': args.home, 'mov_scale': args.mov, 'season_regression': args.regress}
+
+    start = time.perf_counter()
+    results = run_sweep(matches, grid, jobs=args.jobs, burn_in_seasons=args.burn_in)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(results)} configurations on {results.attrs['matches_scored']} matches "
+          f"in {elapsed:.2f}s (jobs={args.jobs})\n")
+    print(results.head(args.top).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    # Where the current dashboard settings rank
+    current = results[(results['k_factor'] == 30) & (results['home_advantage'] == 0)
+                      & (results['mov_scale'] == 0) & (results['season_regression'] == 0)]
+    if not current.empty:
+        print(f"\nCurrent settings (K=30, no home/MOV/regression) rank {current.index[0] + 1} of {len(results)}: "
+              f"log-loss {current['log_loss'].iloc[0]:.4f}, Brier {current['brier'].iloc[0]:.4f}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'grid': grid,
+            'burn_in_seasons': args.burn_in,
+            'matches_scored': results.attrs['matches_scored'],
+            'results': results.round(6).to_dict('records')
+        }, f, indent=2)
+    print(f"\nSaved {len(results)} results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import joblib
+import pandas as pd
+
+TEAM_ENCODER_PATH = 'model_assets/team_encoder.pkl'
+VENUE_ENCODER_PATH = 'model_assets/venue_encoder.pkl'
+MODELING_DATA_PATH = 'data/modeling_data.csv'
+
+def model_features(model):
+    """
+    The feature columns a fitted model takes, in the order it was trained on.
+    Read from the model itself rather than kept here, so they cannot drift apart.
+    """
+    names = getattr(model, 'feature_names_in_', None)
+    if names is None:
+        raise ValueError("Model does not record its feature names (fit it on a DataFrame)")
+    return [str(name) for name in names]
+
+def load_encoders():
+    """The team and venue LabelEncoders the shipped model was trained with"""
+    return joblib.load(TEAM_ENCODER_PATH), joblib.load(VENUE_ENCODER_PATH)
+
+def encode_labels(encoder, values):
+    """LabelEncoder codes for values; labels the encoder never saw get -1"""
+    codes = {label: i for i, label in enumerate(encoder.classes_)}
+    return pd.Series(values).map(codes).fillna(-1).astype(int).to_numpy()
+
+def add_fixture_features(data, team_encoder, venue_encoder):
+    """
+    Add the encoded team/venue and toss features to rows with team1, team2,
+    venue, toss_winner and toss_decision columns (in place; also returned)
+    """
+    data['team1_code'] = encode_labels(team_encoder, data['team1'])
+    data['team2_code'] = encode_labels(team_encoder, data['team2'])
+    data['venue_code'] = encode_labels(venue_encoder, data['venue'])
+    data['toss_winner_is_team1'] = (data['toss_winner'] == data['team1']).astype(int)
+    data['toss_decision_code'] = (data['toss_decision'] == 'bat').astype(int)
+    return data
+
+def build_modeling_data(matches, history, team_encoder=None, venue_encoder=None):
+    """
+    One row per rated match: the match columns plus the model features, with the
+    pre-match ratings and win probability taken from an EloTracker history, and
+    target = 1 if team1 won.
+    """
+    if team_encoder is None or venue_encoder is None:
+        team_encoder, venue_encoder = load_encoders()
+
+    elo = history[['match_id', 'rating_team1_pre', 'rating_team2_pre', 'win_prob_team1']]
+    data = matches.merge(elo.astype({'match_id': matches['match_id'].dtype}), on='match_id', how='inner')
+
+    add_fixture_features(data, team_encoder, venue_encoder)
+    data['target'] = (data['match_won_by'] == data['team1']).astype(int)
+    return data
@@ -2,51 +2,27 @@ import pandas as pd
 import json
 import os
 
-def generate_advanced_team_analytics():
+def generate_advanced_team_analytics(df=None):
     """Generate comprehensive team analytics including venue performance, toss impact, batting first vs chasing"""
     
     def calculate_bat_chase_stats(matches, team):
         """Helper to calculate batting first vs chasing stats"""
-        bat_first_matches = []
-        chase_matches = []
-        
-        for _, row in matches.iterrows():
-            if pd.isna(row['toss_decision']) or pd.isna(row['toss_winner']):
-                continue
-            
-            if row['toss_decision'] == 'bat':
-                batted_first = (row['toss_winner'] == team)
-            else:
-                batted_first = (row['toss_winner'] != team)
-            
-            if batted_first:
-                bat_first_matches.append(row)
-            else:
-                chase_matches.append(row)
-        
-        bat_first_df = pd.DataFrame(bat_first_matches)
-        chase_df = pd.DataFrame(chase_matches)
-        
-        bat_first_stats = {'played': 0, 'won': 0, 'lost': 0, 'win_rate': 0}
-        chase_stats = {'played': 0, 'won': 0, 'lost': 0, 'win_rate': 0}
-        
-        if len(bat_first_df) > 0:
-            bat_first_wins = len(bat_first_df[bat_first_df['match_won_by'] == team])
-            bat_first_stats = {
-                'played': len(bat_first_df),
-                'won': bat_first_wins,
-                'lost': len(bat_first_df) - bat_first_wins,
-                'win_rate': round((bat_first_wins / len(bat_first_df) * 100), 1)
+        known = matches[matches['bat_first_team'].notna()]
+        batted_first = known['bat_first_team'] == team
+        won = known['match_won_by'] == team
+        
+        def summary(played, wins):
+            if played == 0:
+                return {'played': 0, 'won': 0, 'lost': 0, 'win_rate': 0}
+            return {
+                'played': played,
+                'won': wins,
+                'lost': played - wins,
+                'win_rate': round((wins / played * 100), 1)
             }
         
-        if len(chase_df) > 0:
-            chase_wins = len(chase_df[chase_df['match_won_by'] == team])
-            chase_stats = {
-                'played': len(chase_df),
-                'won': chase_wins,
-                'lost': len(chase_df) - chase_wins,
-                'win_rate': round((chase_wins / len(chase_df) * 100), 1)
-            }
+        bat_first_stats = summary(int(batted_first.sum()), int((batted_first & won).sum()))
+        chase_stats = summary(int((~batted_first).sum()), int((~batted_first & won).sum()))
         
         return bat_first_stats, chase_stats
     
@@ -71,7 +47,8 @@ def generate_advanced_team_analytics():
         }
     
     print("Loading data...")
-    df = pd.read_csv('data/IPL_matches.csv')
+    if df is None:
+        df = pd.read_csv('data/IPL_matches.csv')
     
     teams = set(df['team1'].dropna()).union(set(df['team2'].dropna()))
     
@@ -1,51 +1,22 @@
 import pandas as pd
 import json
 import os
-
-# Load existing archetypes data
-with open('webapp/static/data/archetypes.json', 'r') as f:
-    archetypes_data = json.load(f)
-
-# Load ball-by-ball data for player stats
-print("Loading ball-by-ball data...")
-df_balls = pd.read_csv('data/IPL.csv', low_memory=False)
-
-# Load matches data for toss info
-df_matches = pd.read_csv('data/IPL_matches.csv')
-
-print(f"Loaded {len(df_balls)} balls and {len(df_matches)} matches")
-
-# Create match_id to cluster mapping
-match_cluster_map = {m['id']: m['cluster'] for m in archetypes_data['matches']}
-
-# Add cluster to balls dataframe
-df_balls['cluster'] = df_balls['match_id'].astype(str).map(match_cluster_map)
-df_balls = df_balls[df_balls['cluster'].notna()]
-
-# Add season info to balls
-match_season_map = {m['id']: m['season'] for m in archetypes_data['matches']}
-df_balls['season'] = df_balls['match_id'].astype(str).map(match_season_map)
-
-print(f"Processing {len(df_balls)} balls with cluster assignments...")
-
-# Get distinct seasons for period calculation
-all_seasons = sorted([m['season'] for m in archetypes_data['matches']], reverse=True)
-last3_cutoff = all_seasons[2] if len(all_seasons) > 2 else all_seasons[0]
-last5_cutoff = all_seasons[4] if len(all_seasons) > 4 else all_seasons[0]
+from utils import load_balls
 
 def calculate_player_stats(cluster_balls):
     """Calculate player stats for given ball data"""
     # Top Batsmen
-    batsman_stats = cluster_balls.groupby('batter').agg({
+    batsman_stats = cluster_balls.groupby('batter', observed=True).agg({
         'runs_batter': 'sum',
         'ball': 'count',
         'match_id': 'nunique'
     }).reset_index()
     batsman_stats.columns = ['player', 'runs', 'balls', 'matches']
+    batsman_stats['player'] = batsman_stats['player'].astype(str)
     batsman_stats['sr'] = (batsman_stats['runs'] / batsman_stats['balls'] * 100).round(1)
     
-    fours_dict = cluster_balls[cluster_balls['runs_batter'] == 4].groupby('batter').size().to_dict()
-    sixes_dict = cluster_balls[cluster_balls['runs_batter'] == 6].groupby('batter').size().to_dict()
+    fours_dict = cluster_balls[cluster_balls['runs_batter'] == 4].groupby('batter', observed=True).size().to_dict()
+    sixes_dict = cluster_balls[cluster_balls['runs_batter'] == 6].groupby('batter', observed=True).size().to_dict()
     
     batsman_stats['fours'] = batsman_stats['player'].map(lambda p: fours_dict.get(p, 0))
     batsman_stats['sixes'] = batsman_stats['player'].map(lambda p: sixes_dict.get(p, 0))
@@ -53,16 +24,17 @@ def calculate_player_stats(cluster_balls):
     top_batsmen = batsman_stats.nlargest(10, 'runs')[['player', 'runs', 'balls', 'sr', 'fours', 'sixes', 'matches']].to_dict('records')
     
     # Top Bowlers
-    bowler_stats = cluster_balls.groupby('bowler').agg({
+    bowler_stats = cluster_balls.groupby('bowler', observed=True).agg({
         'runs_total': 'sum',
         'ball': 'count',
         'wicket_kind': lambda x: x.notna().sum(),
         'match_id': 'nunique'
     }).reset_index()
     bowler_stats.columns = ['player', 'runs', 'balls', 'wickets', 'matches']
+    bowler_stats['player'] = bowler_stats['player'].astype(str)
     bowler_stats['economy'] = (bowler_stats['runs'] / (bowler_stats['balls'] / 6)).round(2)
     
-    dots = cluster_balls[cluster_balls['runs_total'] == 0].groupby('bowler').size().to_dict()
+    dots = cluster_balls[cluster_balls['runs_total'] == 0].groupby('bowler', observed=True).size().to_dict()
     bowler_stats['dots'] = bowler_stats['player'].map(lambda p: dots.get(p, 0))
     
     top_bowlers = bowler_stats.nlargest(10, 'wickets')[['player', 'wickets', 'runs', 'balls', 'economy', 'dots', 'matches']].to_dict('records')
@@ -128,72 +100,102 @@ def calculate_venue_stats(cluster_matches):
     venue_stats_list.sort(key=lambda x: x['matches'], reverse=True)
     return venue_stats_list  # Return all venues, no limit
 
-# Initialize cluster analytics with period breakdowns
-cluster_analytics = {}
+def generate_archetype_analytics(df_balls, df_matches):
+    """Enrich archetypes.json with per-cluster player, toss and venue analytics"""
+    # Load existing archetypes data
+    with open('webapp/static/data/archetypes.json', 'r') as f:
+        archetypes_data = json.load(f)
 
-for cluster_id in range(4):
-    print(f"\nProcessing Cluster {cluster_id}...")
-    
-    cluster_matches = [m for m in archetypes_data['matches'] if m['cluster'] == cluster_id]
-    match_ids_int = [int(m['id']) for m in cluster_matches]
-    
-    # Get recent seasons for individual analytics
-    recent_seasons = [2023, 2024, 2025]
-    
-    # Period-specific analytics
-    periods = {
-        'overall': cluster_matches,
-        'last3': [m for m in cluster_matches if m['season'] >= last3_cutoff],
-        'last5': [m for m in cluster_matches if m['season'] >= last5_cutoff]
-    }
-    
-    # Add individual recent seasons
-    for season in recent_seasons:
-        season_matches = [m for m in cluster_matches if m['season'] == season]
-        if len(season_matches) > 0:
-            periods[f'season_{season}'] = season_matches
-    
-    cluster_analytics[cluster_id] = {}
-    
-    for period_name, period_matches in periods.items():
-        if len(period_matches) == 0:
-            continue
-            
-        print(f"  - {period_name}: {len(period_matches)} matches")
+    print(f"Loaded {len(df_balls)} balls and {len(df_matches)} matches")
+
+    # Create match_id to cluster mapping
+    match_cluster_map = {m['id']: m['cluster'] for m in archetypes_data['matches']}
+
+    # Add cluster to balls dataframe
+    df_balls = df_balls.assign(cluster=df_balls['match_id'].astype(str).map(match_cluster_map))
+    df_balls = df_balls[df_balls['cluster'].notna()]
+
+    # Add season info to balls
+    match_season_map = {m['id']: m['season'] for m in archetypes_data['matches']}
+    df_balls = df_balls.assign(season=df_balls['match_id'].astype(str).map(match_season_map))
+
+    print(f"Processing {len(df_balls)} balls with cluster assignments...")
+
+    # Get distinct seasons for period calculation
+    all_seasons = sorted([m['season'] for m in archetypes_data['matches']], reverse=True)
+    last3_cutoff = all_seasons[2] if len(all_seasons) > 2 else all_seasons[0]
+    last5_cutoff = all_seasons[4] if len(all_seasons) > 4 else all_seasons[0]
+
+    # Initialize cluster analytics with period breakdowns
+    cluster_analytics = {}
+
+    for cluster_id in range(4):
+        print(f"\nProcessing Cluster {cluster_id}...")
+        
+        cluster_matches = [m for m in archetypes_data['matches'] if m['cluster'] == cluster_id]
+        match_ids_int = [int(m['id']) for m in cluster_matches]
         
-        # Filter balls for this period
-        period_match_ids = [m['id'] for m in period_matches]
-        period_balls = df_balls[df_balls['match_id'].astype(str).isin(period_match_ids)]
+        # Get recent seasons for individual analytics
+        recent_seasons = [2023, 2024, 2025]
         
-        # Calculate stats
-        top_batsmen, top_bowlers = calculate_player_stats(period_balls)
+        # Period-specific analytics
+        periods = {
+            'overall': cluster_matches,
+            'last3': [m for m in cluster_matches if m['season'] >= last3_cutoff],
+            'last5': [m for m in cluster_matches if m['season'] >= last5_cutoff]
+        }
         
-        # Toss impact
-        period_match_ids_int = [int(m['id']) for m in period_matches]
-        toss_matches = df_matches[df_matches['match_id'].isin(period_match_ids_int)]
-        toss_impact = calculate_toss_impact(toss_matches)
+        # Add individual recent seasons
+        for season in recent_seasons:
+            season_matches = [m for m in cluster_matches if m['season'] == season]
+            if len(season_matches) > 0:
+                periods[f'season_{season}'] = season_matches
         
-        # Venue stats
-        venue_stats = calculate_venue_stats(period_matches)
+        cluster_analytics[cluster_id] = {}
         
-        cluster_analytics[cluster_id][period_name] = {
-            'top_batsmen': top_batsmen,
-            'top_bowlers': top_bowlers,
-            'toss_impact': toss_impact,
-            'venue_stats': venue_stats
-        }
+        for period_name, period_matches in periods.items():
+            if len(period_matches) == 0:
+                continue
+                
+            print(f"  - {period_name}: {len(period_matches)} matches")
+            
+            # Filter balls for this period
+            period_match_ids = [m['id'] for m in period_matches]
+            period_balls = df_balls[df_balls['match_id'].astype(str).isin(period_match_ids)]
+            
+            # Calculate stats
+            top_batsmen, top_bowlers = calculate_player_stats(period_balls)
+            
+            # Toss impact
+            period_match_ids_int = [int(m['id']) for m in period_matches]
+            toss_matches = df_matches[df_matches['match_id'].isin(period_match_ids_int)]
+            toss_impact = calculate_toss_impact(toss_matches)
+            
+            # Venue stats
+            venue_stats = calculate_venue_stats(period_matches)
+            
+            cluster_analytics[cluster_id][period_name] = {
+                'top_batsmen': top_batsmen,
+                'top_bowlers': top_bowlers,
+                'toss_impact': toss_impact,
+                'venue_stats': venue_stats
+            }
+
+    # Save enriched data
+    output = {
+        'meta': archetypes_data['meta'],
+        'matches': archetypes_data['matches'],
+        'analytics': cluster_analytics
+    }
 
-# Save enriched data
-output = {
-    'meta': archetypes_data['meta'],
-    'matches': archetypes_data['matches'],
-    'analytics': cluster_analytics
-}
+    output_file = 'webapp/static/data/archetypes_detailed.json'
+    with open(output_file, 'w') as f:
+        json.dump(output, f, indent=2)
 
-output_file = 'webapp/static/data/archetypes_detailed.json'
-with open(output_file, 'w') as f:
-    json.dump(output, f, indent=2)
+    print(f"\nSaved enriched archetype analytics to {output_file}")
+    print(f"  - Generated stats for 4 clusters across 3 periods (overall, last3, last5)")
+    print(f"  - Player stats, toss metrics, and venue analytics included")
 
-print(f"\nSaved enriched archetype analytics to {output_file}")
-print(f"  - Generated stats for 4 clusters across 3 periods (overall, last3, last5)")
-print(f"  - Player stats, toss metrics, and venue analytics included")
+if __name__ == "__main__":
+    print("Loading ball-by-ball data...")
+    generate_archetype_analytics(load_balls(), pd.read_csv('data/IPL_matches.csv'))
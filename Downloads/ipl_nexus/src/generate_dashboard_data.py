@@ -6,6 +6,9 @@ from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
+from head_to_head import build_h2h, h2h_slice
+from elo import EloTracker, ELO_CHECKPOINT_PATH
+from features import build_modeling_data, MODELING_DATA_PATH
 
 # Ensure output directory exists
 os.makedirs('webapp/static/data', exist_ok=True)
@@ -21,70 +24,40 @@ def load_matches():
 
 def generate_elo_data(df):
     print("Generating Elo Data...")
-    # Simple Elo implementation for export
-    teams = set(df['team1'].dropna()).union(set(df['team2'].dropna()))
-    ratings = {t: 1500 for t in teams}
-    history = []
-    
-    k = 30
-    df_sorted = df.sort_values('date')
-    
-    for idx, row in df_sorted.iterrows():
-        t1, t2 = row['team1'], row['team2']
-        winner = row['match_won_by']
-        
-        if pd.isna(t1) or pd.isna(t2): continue
-        
-        r1 = ratings.get(t1, 1500)
-        r2 = ratings.get(t2, 1500)
-        
-        # Win prob
-        p1 = 1 / (1 + 10 ** ((r2 - r1) / 400))
-        
-        # Outcome
-        if winner == t1: s1 = 1
-        elif winner == t2: s1 = 0
-        else: s1 = 0.5 # Tie
-        
-        # Update
-        r1_new = r1 + k * (s1 - p1)
-        r2_new = r2 + k * ((1 - s1) - (1 - p1))
-        
-        ratings[t1] = r1_new
-        ratings[t2] = r2_new
-        
-        history.append({
-            'date': str(row['date'])[:10],
-            'season': int(row['season']) if pd.notna(row['season']) else 0,
-            'team': t1,
-            'rating': round(r1_new, 1)
-        })
-        history.append({
-            'date': str(row['date'])[:10],
-            'season': int(row['season']) if pd.notna(row['season']) else 0,
-            'team': t2,
-            'rating': round(r2_new, 1)
-        })
+    # Continue from the saved checkpoint; only matches it has not seen are applied
+    tracker = EloTracker.load(ELO_CHECKPOINT_PATH)
+    new_rows, replayed = tracker.update(df)
+    tracker.save(ELO_CHECKPOINT_PATH)
+    print(f"Applied {len(new_rows)} matches" + (" (full replay)" if replayed else " from checkpoint"))
         
     # Save current ratings
     with open('webapp/static/data/current_elo.json', 'w') as f:
-        json.dump(ratings, f)
+        json.dump(tracker.ratings, f)
         
-    # Save history (optimized structure for charts)
-    # Group by team
-    history_df = pd.DataFrame(history)
+    # Save history (optimized structure for charts), appending the new matches to
+    # each team's series unless everything was replayed
+    history_path = 'webapp/static/data/elo_history.json'
     chart_data = {}
-    for team in history_df['team'].unique():
-        team_data = history_df[history_df['team'] == team]
-        chart_data[team] = {
-            'dates': team_data['date'].tolist(),
-            'ratings': team_data['rating'].tolist()
-        }
+    if not replayed and os.path.exists(history_path):
+        with open(history_path) as f:
+            chart_data = json.load(f)
+    
+    for team, series in tracker.team_series(new_rows).items():
+        existing = chart_data.setdefault(team, {'dates': [], 'ratings': []})
+        existing['dates'] += series['dates']
+        existing['ratings'] += series['ratings']
     
-    with open('webapp/static/data/elo_history.json', 'w') as f:
+    with open(history_path, 'w') as f:
         json.dump(chart_data, f)
         
-    return ratings
+    return tracker
+
+def generate_modeling_data(df, history):
+    """Model features for every rated match, from the same Elo run as the dashboard"""
+    print("Generating Modeling Data...")
+    data = build_modeling_data(df, history)
+    data.to_csv(MODELING_DATA_PATH, index=False)
+    print(f"Saved {len(data)} rows to {MODELING_DATA_PATH}")
 
 def generate_venue_stats(df):
     print("Generating Venue Stats...")
@@ -97,36 +70,11 @@ def generate_venue_stats(df):
         
         avg_score = group['first_innings_runs'].mean()
         
-        # Chasing wins: winner != team batting first
-        # We assume team1 batted first? data doesn't explicitly say who batted first in match-level 
-        # unless we check toss decision.
-        # Logic: if toss_winner == bat => toss_winner is bat_first.
-        # if toss_winner == field => toss_winner is bat_second.
-        
-        matches_with_decision = group.dropna(subset=['toss_decision', 'toss_winner', 'match_won_by'])
-        toss_wins = 0
-        bat_first_wins = 0
+        # Batting order comes from the ball data (bat_first_team, written by process_data.py)
+        matches_with_decision = group.dropna(subset=['toss_winner', 'match_won_by', 'bat_first_team'])
+        toss_wins = int(matches_with_decision['toss_winner_won'].sum())
+        bat_first_wins = int(matches_with_decision['bat_first_won'].sum())
         total = len(matches_with_decision)
-        
-        for _, row in matches_with_decision.iterrows():
-            if row['toss_winner'] == row['match_won_by']:
-                toss_wins += 1
-            
-            # Did bat first win?
-            # If toss=bat and toss_winner=winner => bat first won
-            # If toss=field and toss_winner!=winner => bat first won (since toss winner fielded and lost)
-            t_win = row['toss_winner']
-            t_dec = row['toss_decision']
-            winner = row['match_won_by']
-            
-            # Identify bat first team
-            if t_dec == 'bat':
-                bat_first_team = t_win
-            else:
-                bat_first_team = row['team1'] if row['team1'] != t_win else row['team2']
-            
-            if winner == bat_first_team:
-                bat_first_wins += 1
                 
         if total > 0:
             stats.append({
@@ -264,34 +212,24 @@ def train_prediction_model(df):
     
     # Let's simple create a "Head to Head" matrix
     teams = df['team1'].dropna().unique()
-    matrix = {}
+    totals = h2h_slice(build_h2h(df))
+    win_rate = {pair: round(wins / played, 2) for pair, wins, played in zip(totals.index, totals['wins'], totals['played'])}
     
+    matrix = {}
     for t1 in teams:
-        matrix[t1] = {}
-        for t2 in teams:
-            if t1 == t2: continue
-            
-            # Find matches
-            mask = ((df['team1'] == t1) & (df['team2'] == t2)) | ((df['team1'] == t2) & (df['team2'] == t1))
-            matches = df[mask]
-            
-            if len(matches) == 0:
-                prob = 0.5
-            else:
-                wins = len(matches[matches['match_won_by'] == t1])
-                prob = wins / len(matches)
-                # Weighted by recent form? simplified for now.
-            
-            matrix[t1][t2] = round(prob, 2)
+        # Pairs that never met default to 0.5
+        matrix[t1] = {t2: win_rate.get((t1, t2), 0.5) for t2 in teams if t2 != t1}
             
     with open('webapp/static/data/h2h_matrix.json', 'w') as f:
         json.dump(matrix, f)
 
-def main():
-    df = load_matches()
+def main(df=None):
+    if df is None:
+        df = load_matches()
     if df is None: return
     
-    generate_elo_data(df)
+    tracker = generate_elo_data(df)
+    generate_modeling_data(df, tracker.history)
     generate_venue_stats(df)
     generate_archetypes(df)
     train_prediction_model(df)
@@ -1,16 +1,19 @@
 import pandas as pd
 import json
 import os
+from utils import load_balls
 
-def generate_overview_stats():
+def generate_overview_stats(df=None, matches_df=None):
     """Generate comprehensive overview statistics from ball-by-ball data"""
     
     # Load ball-by-ball data
-    print("Loading ball-by-ball data...")
-    df = pd.read_csv('data/IPL.csv', low_memory=False)
+    if df is None:
+        print("Loading ball-by-ball data...")
+        df = load_balls()
     
     # Load match-level data for champions
-    matches_df = pd.read_csv('data/IPL_matches.csv')
+    if matches_df is None:
+        matches_df = pd.read_csv('data/IPL_matches.csv')
     
     stats = {}
     
@@ -85,11 +88,11 @@ def generate_overview_stats():
     stats['champions'] = champions
     
     # TOP SCORERS (batsmen with most runs)
-    batter_runs = df.groupby('batter')['runs_batter'].sum().sort_values(ascending=False).head(10)
+    batter_runs = df.groupby('batter', observed=True)['runs_batter'].sum().sort_values(ascending=False).head(10)
     stats['top_scorers'] = {k: int(v) for k, v in batter_runs.items()}
     
     # TOP WICKET TAKERS
-    wicket_takers = df[df['wicket_kind'].notna()].groupby('bowler').size().sort_values(ascending=False).head(10)
+    wicket_takers = df[df['wicket_kind'].notna()].groupby('bowler', observed=True).size().sort_values(ascending=False).head(10)
     stats['top_wicket_takers'] = {k: int(v) for k, v in wicket_takers.items()}
     
     # Save to JSON
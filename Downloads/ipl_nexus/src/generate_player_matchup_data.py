@@ -1,230 +1,295 @@
 import pandas as pd
 import json
 import os
+import re
+import shutil
 import numpy as np
 from collections import defaultdict
+from utils import load_balls
 
-def generate_player_matchup_data():
-    print("Generating Player Matchup Data...")
-    
-    # Load ball-by-ball data
+# Per-ball counters summed by the matchup engine
+COUNT_COLUMNS = ['rows', 'balls', 'runs', 'dismissals', 'dots', 'singles', 'twos', 'threes', 'fours', 'sixes']
+
+def add_matchup_counters(df):
+    """
+    Add the per-ball indicator columns that every matchup breakdown sums.
+    Wides do not count as balls faced (or towards scoring shots), but runs and
+    dismissals use all balls; run outs are not credited to the bowler.
+    """
+    df = df.copy()
+    valid = (df['extra_type'] != 'wides') if 'extra_type' in df.columns else pd.Series(True, index=df.index)
+    runs = df['runs_batter'].astype('int32')
+
+    df['rows'] = 1
+    df['balls'] = valid.astype('int32')
+    df['runs'] = runs
+    df['dismissals'] = (
+        df['wicket_kind'].notna() &
+        ~df['wicket_kind'].str.contains('run out', case=False, na=False)
+    ).astype('int32')
+    for col, value in [('dots', 0), ('singles', 1), ('twos', 2), ('threes', 3), ('fours', 4), ('sixes', 6)]:
+        df[col] = (valid & (runs == value)).astype('int32')
+
+    # Phase from the over part of 'ball' (e.g. 3.2 -> over 3)
+    over = np.floor(df['ball'].astype(float))
+    df['phase'] = np.select([over <= 6, over <= 15, over > 15], ['powerplay', 'middle', 'death'], default='')
+
+    df['position'] = np.arange(len(df))
+    return df
+
+def matchup_counts(df, dimension=None):
+    """
+    Sum the matchup counters for every (batter, bowler[, dimension]) group in one pass.
+    'position' keeps the first ball of each group so dict outputs preserve appearance order.
+    """
+    keys = ['batter', 'bowler'] + ([dimension] if dimension else [])
+    aggs = {col: 'sum' for col in COUNT_COLUMNS}
+    aggs['position'] = 'min'
+    return df.groupby(keys, observed=True, sort=True).agg(aggs)
+
+def stats_from_counts(counts):
+    """Calculate H2H stats from summed counters (same rules as the per-pair filters)"""
+    if counts is None or counts['rows'] == 0:
+        return None
+
+    total_balls = int(counts['balls'])
+    total_runs = int(counts['runs'])
+    dismissals = int(counts['dismissals'])
+    fours = int(counts['fours'])
+    sixes = int(counts['sixes'])
+    dots = int(counts['dots'])
+
+    # Calculate metrics
+    avg = round(total_runs / dismissals, 2) if dismissals > 0 else total_runs
+    sr = round((total_runs / total_balls) * 100, 2) if total_balls > 0 else 0
+    dot_pct = round((dots / total_balls) * 100, 1) if total_balls > 0 else 0
+
+    # Boundary dependency
+    boundary_runs = (fours * 4) + (sixes * 6)
+    boundary_pct = round((boundary_runs / total_runs) * 100, 1) if total_runs > 0 else 0
+
+    return {
+        "balls": total_balls,
+        "runs": total_runs,
+        "dismissals": dismissals,
+        "avg": float(avg),
+        "sr": float(sr),
+        "dots": dots,
+        "dot_pct": float(dot_pct),
+        "boundaries": {
+            "fours": fours,
+            "sixes": sixes
+        },
+        "scoring_pattern": {
+            "dots": dots,
+            "singles": int(counts['singles']),
+            "twos": int(counts['twos']),
+            "threes": int(counts['threes']),
+            "fours": fours,
+            "sixes": sixes
+        },
+        "boundary_pct": float(boundary_pct)
+    }
+
+def group_by_pair(counts_df):
+    """Index a (batter, bowler, dimension) counts table as pair -> [(dimension, counts), ...]"""
+    grouped = defaultdict(list)
+    for row in counts_df.reset_index().to_dict('records'):
+        grouped[(row['batter'], row['bowler'])].append(row)
+    return grouped
+
+def sum_counts(rows):
+    """Add up counter rows (e.g. the seasons inside a window)"""
+    if not rows:
+        return None
+    return {col: sum(r[col] for r in rows) for col in COUNT_COLUMNS}
+
+def shard_name(batter, used):
+    """File-safe shard name for a batter, unique within one build"""
+    base = re.sub(r'[^A-Za-z0-9]+', '_', batter).strip('_') or 'player'
+    name, n = base, 2
+    while name in used:
+        name = f"{base}_{n}"
+        n += 1
+    used.add(name)
+    return f"{name}.json"
+
+def write_shard(data, name, tmp_dir, output_dir):
+    """Write data as tmp_dir/name, or carry over output_dir/name (and its .gz/.br) if it already holds data"""
+    old = os.path.join(output_dir, name)
     try:
-        df = pd.read_csv('data/IPL.csv', low_memory=False)
-        print(f"Loaded {len(df)} balls")
+        with open(old, 'rb') as f:
+            unchanged = f.read() == data
     except FileNotFoundError:
-        print("Error: data/IPL.csv not found.")
+        unchanged = False
+    if not unchanged:
+        with open(os.path.join(tmp_dir, name), 'wb') as f:
+            f.write(data)
         return
+    for suffix in ('', '.gz', '.br'):
+        if os.path.exists(old + suffix):
+            try:
+                os.link(old + suffix, os.path.join(tmp_dir, name + suffix))
+            except OSError: # No hard links on this filesystem; copy2 keeps the mtime
+                shutil.copy2(old + suffix, os.path.join(tmp_dir, name + suffix))
+
+def write_matchup_shards(matchups, batsmen, bowlers, output_dir='webapp/static/data/matchups'):
+    """
+    Write one compact JSON file per batter ({bowler: record}) plus index.json,
+    which lists the players and maps each batter to their shard file.
+
+    The files are written to a temporary directory that then replaces
+    output_dir, so the web app never sees a half-written set of shards. A shard
+    whose content is unchanged is carried over as a hard link to the old file
+    (with its precompressed copies), so it keeps its mtime and is not compressed
+    again.
+    """
+    tmp_dir, old_dir = output_dir + '.tmp', output_dir + '.old'
+    for stale in (tmp_dir, old_dir):
+        shutil.rmtree(stale, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    by_batter = defaultdict(dict)
+    for record in matchups.values():
+        by_batter[record['batsman']][record['bowler']] = record
+
+    used = set()
+    shards = {}
+    for batter in sorted(by_batter):
+        shards[batter] = shard_name(batter, used)
+        write_shard(json.dumps(by_batter[batter], separators=(',', ':')).encode(), shards[batter], tmp_dir, output_dir)
+
+    index = {
+        "batsmen": batsmen,
+        "bowlers": bowlers,
+        "shards": shards
+    }
+    # Always rewritten: the web app drops its cached shards when index.json changes
+    with open(os.path.join(tmp_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    # Two renames: output_dir is only missing for the moment between them
+    if os.path.exists(output_dir):
+        os.replace(output_dir, old_dir)
+    os.replace(tmp_dir, output_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(shards)
+
+def generate_player_matchup_data(df=None):
+    print("Generating Player Matchup Data...")
+
+    # Load ball-by-ball data
+    if df is None:
+        try:
+            df = load_balls()
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            return
+    print(f"Loaded {len(df)} balls")
 
     # Ensure output dir
     os.makedirs('webapp/static/data', exist_ok=True)
 
     # Convert season to numeric, handling any string values
     if 'season' in df.columns:
-        df['season'] = pd.to_numeric(df['season'], errors='coerce')
+        df = df.assign(season=pd.to_numeric(df['season'], errors='coerce'))
         df = df.dropna(subset=['season'])  # Drop rows with invalid season
         current_year = int(df['season'].max())
     else:
         current_year = 2024
-    
+
     print(f"Processing data from seasons up to {current_year}")
-    
+
     # Filter relevant columns
-    required_cols = ['season', 'batter', 'bowler', 'runs_batter', 'wicket_kind', 
+    required_cols = ['season', 'batter', 'bowler', 'runs_batter', 'wicket_kind',
                      'venue', 'innings', 'ball']
-    
+
     # Check which columns exist
     available_cols = [col for col in required_cols if col in df.columns]
     print(f"Available columns: {available_cols}")
-    
+
     # Get unique batsmen and bowlers
     batsmen = sorted(df['batter'].dropna().unique().tolist()) if 'batter' in df.columns else []
     bowlers = sorted(df['bowler'].dropna().unique().tolist()) if 'bowler' in df.columns else []
-    
+
     print(f"Found {len(batsmen)} batsmen and {len(bowlers)} bowlers")
-    
+
     matchup_data = {
         "batsmen": batsmen,
         "bowlers": bowlers,
         "matchups": {}
     }
-    
-    def calculate_stats(balls_df):
-        """Calculate H2H stats from filtered balls"""
-        if len(balls_df) == 0:
-            return None
-        
-        # Filter out wides for ball counts and batting stats
-        # Wides do not count as balls faced, but dismissals on wides count
-        if 'extra_type' in balls_df.columns:
-            valid_balls_df = balls_df[balls_df['extra_type'] != 'wides']
-        else:
-            valid_balls_df = balls_df
-
-        total_balls = len(valid_balls_df)
-        total_runs = balls_df['runs_batter'].sum() if 'runs_batter' in balls_df.columns else 0
-        
-        # Dismissals (use ALL balls, as you can get out on a wide)
-        dismissals = 0
-        if 'wicket_kind' in balls_df.columns:
-            # Count dismissals (excluding run outs)
-            dismissals = len(balls_df[
-                (balls_df['wicket_kind'].notna()) & 
-                (~balls_df['wicket_kind'].str.contains('run out', case=False, na=False))
-            ])
-        
-        # Calculate metrics
-        avg = round(total_runs / dismissals, 2) if dismissals > 0 else total_runs
-        sr = round((total_runs / total_balls) * 100, 2) if total_balls > 0 else 0
-        
-        # Boundaries (usually on legal balls or no balls, not wides)
-        fours = len(valid_balls_df[valid_balls_df['runs_batter'] == 4]) if 'runs_batter' in valid_balls_df.columns else 0
-        sixes = len(valid_balls_df[valid_balls_df['runs_batter'] == 6]) if 'runs_batter' in valid_balls_df.columns else 0
-        
-        # Dots (runs_batter=0 on a legal ball)
-        dots = len(valid_balls_df[valid_balls_df['runs_batter'] == 0]) if 'runs_batter' in valid_balls_df.columns else 0
-        dot_pct = round((dots / total_balls) * 100, 1) if total_balls > 0 else 0
-        
-        # Scoring pattern
-        scoring_pattern = {}
-        if 'runs_batter' in valid_balls_df.columns:
-            scoring_pattern = {
-                "dots": int(dots),
-                "singles": int(len(valid_balls_df[valid_balls_df['runs_batter'] == 1])),
-                "twos": int(len(valid_balls_df[valid_balls_df['runs_batter'] == 2])),
-                "threes": int(len(valid_balls_df[valid_balls_df['runs_batter'] == 3])),
-                "fours": int(fours),
-                "sixes": int(sixes)
-            }
-        
-        # Boundary dependency
-        boundary_runs = (fours * 4) + (sixes * 6)
-        boundary_pct = round((boundary_runs / total_runs) * 100, 1) if total_runs > 0 else 0
-        
-        return {
-            "balls": int(total_balls),
-            "runs": int(total_runs),
-            "dismissals": int(dismissals),
-            "avg": float(avg),
-            "sr": float(sr),
-            "dots": int(dots),
-            "dot_pct": float(dot_pct),
-            "boundaries": {
-                "fours": int(fours),
-                "sixes": int(sixes)
-            },
-            "scoring_pattern": scoring_pattern,
-            "boundary_pct": float(boundary_pct)
-        }
-    
-    def get_dismissal_breakdown(balls_df):
-        """Get breakdown of dismissal types"""
-        if 'wicket_kind' not in balls_df.columns:
-            return {}
-        
-        dismissals = balls_df[
-            (balls_df['wicket_kind'].notna()) & 
-            (~balls_df['wicket_kind'].str.contains('run out', case=False, na=False))
-        ]
-        
-        breakdown = {}
-        for wicket_type in dismissals['wicket_kind'].unique():
-            if pd.notna(wicket_type):
-                breakdown[wicket_type] = int(len(dismissals[dismissals['wicket_kind'] == wicket_type]))
-        
-        return breakdown
-    
-    def get_phase_stats(balls_df):
-        """Calculate stats by phase (powerplay/middle/death)"""
-        if 'ball' not in balls_df.columns:
-            return {}
-        
-        # Extract over number from ball (e.g., 3.2 -> over 3)
-        balls_df_copy = balls_df.copy()
-        balls_df_copy['over'] = balls_df_copy['ball'].astype(str).str.split('.').str[0].astype(float)
-        
-        powerplay = balls_df_copy[balls_df_copy['over'] <= 6]
-        middle = balls_df_copy[(balls_df_copy['over'] > 6) & (balls_df_copy['over'] <= 15)]
-        death = balls_df_copy[balls_df_copy['over'] > 15]
-        
-        return {
-            "powerplay": calculate_stats(powerplay),
-            "middle": calculate_stats(middle),
-            "death": calculate_stats(death)
-        }
-    
-    def get_season_wise_stats(balls_df):
-        """Calculate stats for each season"""
-        if 'season' not in balls_df.columns:
-            return {}
-        
-        season_stats = {}
-        for season in sorted(balls_df['season'].unique(), reverse=True):
-            season_balls = balls_df[balls_df['season'] == season]
-            stats = calculate_stats(season_balls)
-            if stats:
-                season_stats[str(int(season))] = stats
-        
-        return season_stats
-    
+
     # Generate matchups
     # Process all unique pairs that meet minimum threshold
     print("Calculating matchups...")
-    
-    matchup_count = 0
+
     # Group by batsman-bowler pairs first to check threshold
-    grouped = df.groupby(['batter', 'bowler']).size()
+    grouped = df.groupby(['batter', 'bowler'], observed=True).size()
     valid_pairs = grouped[grouped >= 6]  # At least 1 over
-    
+
     print(f"Found {len(valid_pairs)} valid matchups (6+ balls, all players)")
-    
+
+    # Restrict to qualifying pairs, then build every breakdown with one grouped pass each
+    pair_index = pd.MultiIndex.from_tuples(valid_pairs.index, names=['batter', 'bowler'])
+    pair_rows = pd.MultiIndex.from_frame(df[['batter', 'bowler']]).isin(pair_index)
+    balls = add_matchup_counters(df[pair_rows])
+
+    by_season = group_by_pair(matchup_counts(balls, 'season'))
+    by_venue = group_by_pair(matchup_counts(balls, 'venue'))
+    by_innings = group_by_pair(matchup_counts(balls, 'innings'))
+    by_phase = group_by_pair(matchup_counts(balls, 'phase'))
+
+    dismissal_balls = balls[balls['dismissals'] == 1]
+    dismissal_types = group_by_pair(matchup_counts(dismissal_balls, 'wicket_kind'))
+
+    matchup_count = 0
     for (batsman, bowler), count in valid_pairs.items():
         matchup_count += 1
-        
-        # Filter balls for this matchup
-        mask = (df['batter'] == batsman) & (df['bowler'] == bowler)
-        pair_balls = df[mask]
-        
+        pair = (batsman, bowler)
+
         # Create canonical key
         key = f"{batsman.replace(' ', '_')}_vs_{bowler.replace(' ', '_')}"
-        
-        # Overall stats
-        overall_stats = calculate_stats(pair_balls)
-        
-        # Last 5 seasons
-        last_5 = pair_balls[pair_balls['season'] >= (current_year - 5)]
-        l5_stats = calculate_stats(last_5)
-        
-        # Last 3 seasons
-        last_3 = pair_balls[pair_balls['season'] >= (current_year - 3)]
-        l3_stats = calculate_stats(last_3)
-        
-        # Venue-wise
+
+        seasons = by_season[pair]
+
+        # Overall, last 5 and last 3 seasons are windows over the season counters
+        overall_stats = stats_from_counts(sum_counts(seasons))
+        l5_stats = stats_from_counts(sum_counts([s for s in seasons if s['season'] >= current_year - 5]))
+        l3_stats = stats_from_counts(sum_counts([s for s in seasons if s['season'] >= current_year - 3]))
+
+        # Venue-wise (at least 1 over), in order of first appearance
         venue_stats = {}
-        if 'venue' in df.columns:
-            for venue in pair_balls['venue'].unique():
-                v_balls = pair_balls[pair_balls['venue'] == venue]
-                if len(v_balls) >= 6:  # At least 1 over
-                    v_stat = calculate_stats(v_balls)
-                    if v_stat:
-                        venue_stats[venue] = v_stat
-        
+        for v in sorted(by_venue[pair], key=lambda r: r['position']):
+            if v['rows'] >= 6:
+                venue_stats[v['venue']] = stats_from_counts(v)
+
         # Batting first vs Chasing
+        innings = {r['innings']: r for r in by_innings[pair]}
         batting_first_stats = None
         chasing_stats = None
-        if 'innings' in df.columns:
-            batting_first = pair_balls[pair_balls['innings'] == 1]
-            chasing = pair_balls[pair_balls['innings'] == 2]
-            
-            if len(batting_first) >= 6:
-                batting_first_stats = calculate_stats(batting_first)
-            if len(chasing) >= 6:
-                chasing_stats = calculate_stats(chasing)
-        
-        # New analytics
-        dismissal_breakdown = get_dismissal_breakdown(pair_balls)
-        phase_stats = get_phase_stats(pair_balls)
-        season_wise = get_season_wise_stats(pair_balls)
-        
+        if 1 in innings and innings[1]['rows'] >= 6:
+            batting_first_stats = stats_from_counts(innings[1])
+        if 2 in innings and innings[2]['rows'] >= 6:
+            chasing_stats = stats_from_counts(innings[2])
+
+        # Dismissal breakdown, in order of first appearance
+        dismissal_breakdown = {
+            d['wicket_kind']: int(d['rows'])
+            for d in sorted(dismissal_types[pair], key=lambda r: r['position'])
+        }
+
+        phases = {r['phase']: r for r in by_phase[pair]}
+        phase_stats = {
+            "powerplay": stats_from_counts(phases.get('powerplay')),
+            "middle": stats_from_counts(phases.get('middle')),
+            "death": stats_from_counts(phases.get('death'))
+        }
+
+        season_wise = {}
+        for s in sorted(seasons, key=lambda r: r['season'], reverse=True):
+            season_wise[str(int(s['season']))] = stats_from_counts(s)
+
         matchup_data["matchups"][key] = {
             "batsman": batsman,
             "bowler": bowler,
@@ -238,37 +303,37 @@ def generate_player_matchup_data():
             "phase_wise": phase_stats,
             "season_wise": season_wise
         }
-        
+
         if matchup_count % 500 == 0:
             print(f"Processed {matchup_count} matchups...")
-    
+
     print(f"\nProcessing complete!")
     print(f"Total matchups processed: {matchup_count}")
     print(f"Expected matchups: {len(valid_pairs)}")
-    
+
     # Build player lists from actual matchups
     batsmen_with_matchups = set()
     bowlers_with_matchups = set()
-    
+
     for key in matchup_data["matchups"]:
         matchup = matchup_data["matchups"][key]
         batsmen_with_matchups.add(matchup["batsman"])
         bowlers_with_matchups.add(matchup["bowler"])
-    
+
     # Update player lists to only include those with matchups
     matchup_data["batsmen"] = sorted(list(batsmen_with_matchups))
     matchup_data["bowlers"] = sorted(list(bowlers_with_matchups))
-    
+
     print(f"Unique batsmen with matchups: {len(matchup_data['batsmen'])}")
     print(f"Unique bowlers with matchups: {len(matchup_data['bowlers'])}")
-    
-    # Save
-    output_file = 'webapp/static/data/player_matchup_data.json'
-    with open(output_file, 'w') as f:
-        json.dump(matchup_data, f, indent=2)
-    
+
+    # Save one shard per batter so the page only ever loads a single record
+    output_dir = 'webapp/static/data/matchups'
+    shard_count = write_matchup_shards(matchup_data["matchups"], matchup_data["batsmen"],
+                                       matchup_data["bowlers"], output_dir)
+
     print(f"\nGenerated {matchup_count} player matchups")
-    print(f"Saved to {output_file}")
+    print(f"Saved {shard_count} batter shards and index.json to {output_dir}")
 
 if __name__ == "__main__":
     generate_player_matchup_data()
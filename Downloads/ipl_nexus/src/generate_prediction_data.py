@@ -2,16 +2,18 @@ import pandas as pd
 import json
 import os
 import numpy as np
+from head_to_head import build_h2h, h2h_slice
 
-def generate_prediction_data():
+def generate_prediction_data(df=None):
     print("Generating Advanced Prediction Data...")
     
     # Load matches
-    try:
-        df = pd.read_csv('data/IPL_matches.csv')
-    except FileNotFoundError:
-        print("Error: data/IPL_matches.csv not found.")
-        return
+    if df is None:
+        try:
+            df = pd.read_csv('data/IPL_matches.csv')
+        except FileNotFoundError:
+            print("Error: data/IPL_matches.csv not found.")
+            return
 
     # Ensure output dir
     os.makedirs('webapp/static/data', exist_ok=True)
@@ -30,53 +32,36 @@ def generate_prediction_data():
         "matchups": {}
     }
 
-    def get_stats(matches, t1, t2):
-        if len(matches) == 0:
+    # Every pair's record is a slice of one head-to-head tensor
+    h2h = build_h2h(df)
+    windows = {
+        "overall": h2h_slice(h2h, by=['batted_first']),
+        "last_5": h2h_slice(h2h, by=['batted_first'], min_season=current_year - 5),
+        "last_3": h2h_slice(h2h, by=['batted_first'], min_season=current_year - 3)
+    }
+
+    def get_stats(totals, t1, t2):
+        """Summarise one window of the tensor from t1's side (rows split by batted_first)"""
+        if (t1, t2) not in totals.index:
             return None
+        t1_rows = totals.loc[(t1, t2)]
+        t2_rows = totals.loc[(t2, t1)]
         
-        played = len(matches)
+        played = int(t1_rows['played'].sum())
         
         # Wins
-        t1_wins = len(matches[matches['match_won_by'] == t1])
-        t2_wins = len(matches[matches['match_won_by'] == t2])
-        draws = len(matches) - (t1_wins + t2_wins)
+        t1_wins = int(t1_rows['wins'].sum())
+        t2_wins = int(t1_rows['losses'].sum())
+        draws = played - (t1_wins + t2_wins)
         
         t1_win_pct = round((t1_wins / played) * 100, 1)
         t2_win_pct = round((t2_wins / played) * 100, 1)
 
-        # Avg Scores (approximate if only match aggregates available)
-        # matches has team_runs if available, but let's filter specifically
-        # We need to look at rows where t1 is batting first vs t2 batting first?
-        # Dataset structure: 'first_innings_runs', 'team1', 'team2', 'toss_decision', 'toss_winner'
-        
-        # Simple avg score regardless of batting first/second for now, or refine?
-        # Let's try to get score when batting.
-        
-        # T1 runs:
-        # If t1 is team1 (bat first?) - checking dataset structure in mind
-        # Usually 'first_innings_runs' corresponds to team batting first.
-        # We need to know who batted first.
-        
-        t1_scores = []
-        t2_scores = []
-        
-        for _, m in matches.iterrows():
-            # Determine who batted first
-            bat_first = None
-            if m['toss_decision'] == 'bat':
-                bat_first = m['toss_winner']
-            else:
-                bat_first = m['team1'] if m['toss_winner'] == m['team2'] else m['team2']
-            
-            if bat_first == t1:
-                if pd.notna(m['first_innings_runs']): t1_scores.append(m['first_innings_runs'])
-                if pd.notna(m['second_innings_runs']): t2_scores.append(m['second_innings_runs'])
-            else:
-                if pd.notna(m['first_innings_runs']): t2_scores.append(m['first_innings_runs'])
-                if pd.notna(m['second_innings_runs']): t1_scores.append(m['second_innings_runs'])
-
-        avg_t1 = int(np.mean(t1_scores)) if t1_scores else 0
-        avg_t2 = int(np.mean(t2_scores)) if t2_scores else 0
+        # Avg score when batting, using whichever innings each side batted in
+        t1_scored = t1_rows['scored'].sum()
+        t2_scored = t2_rows['scored'].sum()
+        avg_t1 = int(t1_rows['runs'].sum() / t1_scored) if t1_scored else 0
+        avg_t2 = int(t2_rows['runs'].sum() / t2_scored) if t2_scored else 0
         
         # Insights calculation
         insights = []
@@ -90,14 +75,7 @@ def generate_prediction_data():
             insights.append("This is a closely contested rivalry.")
             
         # Batting First vs Chasing
-        # Filter wins by t1
-        t1_wins_rows = matches[matches['match_won_by'] == t1]
-        t1_bat_first_wins = 0
-        for _, m in t1_wins_rows.iterrows():
-            bat_first = m['toss_winner'] if m['toss_decision'] == 'bat' else (m['team1'] if m['toss_winner'] == m['team2'] else m['team2'])
-            if bat_first == t1:
-                t1_bat_first_wins += 1
-                
+        t1_bat_first_wins = int(t1_rows['wins'].get(True, 0))
         t1_chase_wins = t1_wins - t1_bat_first_wins
         
         if t1_wins >= 2:
@@ -118,73 +96,52 @@ def generate_prediction_data():
             "insights": insights
         }
 
+    def margin_text(m):
+        if m.get('win_by_runs', 0) > 0:
+            return f"{int(m['win_by_runs'])} runs"
+        elif m.get('win_by_wickets', 0) > 0:
+            return f"{int(m['win_by_wickets'])} wkts"
+        return "Tie"
+
+    # Full match lists for scorecards, grouped once under the canonical "A_vs_B" key
+    pairs = df[df['team1'].notna() & df['team2'].notna()].sort_values('date', ascending=False, kind='mergesort')
+    first, second = pairs[['team1', 'team2']].min(axis=1), pairs[['team1', 'team2']].max(axis=1)
+    match_lists = {}
+    for key, group in pairs.groupby(first + '_vs_' + second, sort=False):
+        match_lists[key] = [{
+            'id': int(m['match_id']) if pd.notna(m.get('match_id')) else 0,
+            'season': int(m['season']) if pd.notna(m.get('season')) else 0,
+            'date': str(m['date'])[:10] if pd.notna(m.get('date')) else "",
+            'venue': m.get('venue', ""),
+            'team1': m.get('team1', ""),
+            'team2': m.get('team2', ""),
+            'toss_winner': m.get('toss_winner', ""),
+            'toss_decision': m.get('toss_decision', ""),
+            'winner': m.get('match_won_by', ""),
+            'win_margin': margin_text(m),
+            'score1': int(m['first_innings_runs']) if pd.notna(m.get('first_innings_runs')) else 0,
+            'score2': int(m['second_innings_runs']) if pd.notna(m.get('second_innings_runs')) else 0,
+            'mom': "N/A" # Column missing in current dataset
+        } for m in group.to_dict('records')]
+
     # Generate pairwise data
     for i, t1 in enumerate(teams):
         for j, t2 in enumerate(teams):
-            if i >= j: continue # Avoid duplicates, but frontend needs t1_vs_t2 lookup. 
-                                # Actually better to store both keys or canonical key?
-                                # Storing canonical key "A_vs_B" where A < B alphabetically is efficient.
+            if i >= j: continue # Canonical key "A_vs_B" where A < B alphabetically
             
-            # Canonical Key
             k1, k2 = sorted([t1, t2])
             key = f"{k1}_vs_{k2}"
             
-            # Filter matches
-            mask = ((df['team1'] == k1) & (df['team2'] == k2)) | ((df['team1'] == k2) & (df['team2'] == k1))
-            pair_matches = df[mask]
-            
-            if len(pair_matches) == 0:
+            if key not in match_lists:
                 continue
 
-            # Timeframes
-            # 1. Overall
-            overall_stats = get_stats(pair_matches, k1, k2)
-            
-            # 2. Last 5 Seasons
-            last_5 = pair_matches[pair_matches['season'] >= (current_year - 5)]
-            l5_stats = get_stats(last_5, k1, k2)
-            
-            # 3. Last 3 Seasons
-            last_3 = pair_matches[pair_matches['season'] >= (current_year - 3)]
-            l3_stats = get_stats(last_3, k1, k2)
-            
-            # 4. Venue-wise Stats (Computed on Frontend now for dynamic filtering)
-            # We skip backend pre-calculation to avoid sync issues with filters.
-
-            # 5. Full Match List for Scorecards
-            match_list = []
-            # Sort by date desc
-            pair_matches_sorted = pair_matches.sort_values('date', ascending=False)
-            
-            for _, m in pair_matches_sorted.iterrows():
-                # Margin string logic
-                margin = "Tie"
-                if m.get('win_by_runs', 0) > 0:
-                    margin = f"{int(m['win_by_runs'])} runs"
-                elif m.get('win_by_wickets', 0) > 0:
-                    margin = f"{int(m['win_by_wickets'])} wkts"
-                
-                match_list.append({
-                    'id': int(m['match_id']) if pd.notna(m.get('match_id')) else 0,
-                    'season': int(m['season']) if pd.notna(m.get('season')) else 0,
-                    'date': str(m['date'])[:10] if pd.notna(m.get('date')) else "",
-                    'venue': m.get('venue', ""),
-                    'team1': m.get('team1', ""),
-                    'team2': m.get('team2', ""),
-                    'toss_winner': m.get('toss_winner', ""),
-                    'toss_decision': m.get('toss_decision', ""),
-                    'winner': m.get('match_won_by', ""),
-                    'win_margin': margin,
-                    'score1': int(m['first_innings_runs']) if pd.notna(m.get('first_innings_runs')) else 0,
-                    'score2': int(m['second_innings_runs']) if pd.notna(m.get('second_innings_runs')) else 0,
-                    'mom': "N/A" # Column missing in current dataset
-                })
-
+            # Timeframes: overall, last 5 seasons, last 3 seasons
+            # (venue-wise stats are computed on the frontend for dynamic filtering)
             prediction_data["matchups"][key] = {
-                "overall": overall_stats,
-                "last_5": l5_stats,
-                "last_3": l3_stats,
-                "matches": match_list
+                "overall": get_stats(windows["overall"], k1, k2),
+                "last_5": get_stats(windows["last_5"], k1, k2),
+                "last_3": get_stats(windows["last_3"], k1, k2),
+                "matches": match_lists[key]
             }
 
     # Save
@@ -2,10 +2,11 @@ import pandas as pd
 import json
 import os
 
-def generate_season_stats():
+def generate_season_stats(df=None):
     """Generate season-wise statistics for overview charts"""
     
-    df = pd.read_csv('data/IPL_matches.csv')
+    if df is None:
+        df = pd.read_csv('data/IPL_matches.csv')
     
     # Season-wise aggregation
     season_stats = []
@@ -24,28 +25,9 @@ def generate_season_stats():
             'avg_margin_wickets': round(group['win_by_wickets'].mean(), 1),
         }
         
-        # Count batting first wins
-        bat_first_wins = 0
-        chase_wins = 0
-        
-        for _, row in group.iterrows():
-            if pd.isna(row['toss_decision']) or pd.isna(row['toss_winner']) or pd.isna(row['match_won_by']):
-                continue
-                
-            t_win = row['toss_winner']
-            t_dec = row['toss_decision']
-            winner = row['match_won_by']
-            
-            # Identify bat first team
-            if t_dec == 'bat':
-                bat_first_team = t_win
-            else:
-                bat_first_team = row['team1'] if row['team1'] != t_win else row['team2']
-            
-            if winner == bat_first_team:
-                bat_first_wins += 1
-            else:
-                chase_wins += 1
+        # Count batting first and chasing wins (no results count for neither)
+        bat_first_wins = int(group['bat_first_won'].sum())
+        chase_wins = int((group['match_won_by'] == group['chase_team']).sum())
         
         total = bat_first_wins + chase_wins
         if total > 0:
@@ -2,262 +2,226 @@ import pandas as pd
 import json
 import os
 from collections import defaultdict
-
-print("Loading IPL data...")
-df_balls = pd.read_csv('data/IPL.csv', low_memory=False)
-df_matches = pd.read_csv('data/IPL_matches.csv')
-
-print(f"Loaded {len(df_balls)} balls and {len(df_matches)} matches")
-
-# Create output directory
-os.makedirs('webapp/static/data/stats', exist_ok=True)
-
-# ============================================================================
-# BATTING RECORDS
-# ============================================================================
-
-print("\n=== Generating Batting Records ===")
-
-# 1. Most Runs (Aggregate)
-print("Calculating most runs...")
-batting_stats = df_balls.groupby('batter').agg({
-    'runs_batter': 'sum',
-    'ball': 'count',
-    'match_id': 'nunique'
-}).reset_index()
-batting_stats.columns = ['player', 'runs', 'balls', 'matches']
-batting_stats['sr'] = (batting_stats['runs'] / batting_stats['balls'] * 100).round(2)
-
-# Get dismissals count
-dismissals = df_balls[df_balls['wicket_kind'].notna() & (df_balls['player_out'] == df_balls['batter'])].groupby('batter').size()
-batting_stats['dismissals'] = batting_stats['player'].map(dismissals).fillna(0).astype(int)
-batting_stats['avg'] = (batting_stats['runs'] / batting_stats['dismissals'].replace(0, 1)).round(2)
-
-# Count boundaries
-fours = df_balls[df_balls['runs_batter'] == 4].groupby('batter').size()
-sixes = df_balls[df_balls['runs_batter'] == 6].groupby('batter').size()
-batting_stats['fours'] = batting_stats['player'].map(fours).fillna(0).astype(int)
-batting_stats['sixes'] = batting_stats['player'].map(sixes).fillna(0).astype(int)
-
-most_runs = batting_stats.nlargest(50, 'runs').to_dict('records')
-
-# 2. Highest Scores in an Innings
-print("Calculating highest scores...")
-innings_scores = df_balls.groupby(['match_id', 'batter']).agg({
-    'runs_batter': 'sum',
-    'ball': 'count'
-}).reset_index()
-innings_scores.columns = ['match_id', 'player', 'runs', 'balls']
-innings_scores['sr'] = (innings_scores['runs'] / innings_scores['balls'] * 100).round(2)
-
-# Add match details
-match_details = df_matches[['match_id', 'season', 'date', 'team1', 'team2', 'venue']].copy()
-innings_scores = innings_scores.merge(match_details, on='match_id', how='left')
-
-highest_scores = innings_scores.nlargest(50, 'runs').to_dict('records')
-
-# 3. Fastest 50s
-print("Calculating fastest 50s...")
-fifties = innings_scores[innings_scores['runs'] >= 50].copy()
-fifties = fifties.nsmallest(50, 'balls')[['player', 'runs', 'balls', 'sr', 'season', 'team1', 'team2', 'venue']].to_dict('records')
-
-# 4. Fastest 100s
-print("Calculating fastest 100s...")
-hundreds = innings_scores[innings_scores['runs'] >= 100].copy()
-hundreds = hundreds.nsmallest(30, 'balls')[['player', 'runs', 'balls', 'sr', 'season', 'team1', 'team2', 'venue']].to_dict('records')
-
-# 5. Most Sixes
-print("Calculating most sixes...")
-most_sixes = batting_stats.nlargest(50, 'sixes')[['player', 'sixes', 'matches', 'runs']].to_dict('records')
-
-# Save batting records
-batting_records = {
-    'most_runs': most_runs,
-    'highest_scores': highest_scores,
-    'fastest_fifties': fifties,
-    'fastest_hundreds': hundreds,
-    'most_sixes': most_sixes
-}
-
-with open('webapp/static/data/stats/batting_records.json', 'w') as f:
-    json.dump(batting_records, f, indent=2)
-print("Saved batting_records.json")
-
-# ============================================================================
-# BOWLING RECORDS
-# ============================================================================
-
-print("\n=== Generating Bowling Records ===")
-
-# 1. Most Wickets (Aggregate)
-print("Calculating most wickets...")
-bowling_stats = df_balls.groupby('bowler').agg({
-    'runs_total': 'sum',
-    'ball': 'count',
-    'wicket_kind': lambda x: x.notna().sum(),
-    'match_id': 'nunique'
-}).reset_index()
-bowling_stats.columns = ['player', 'runs', 'balls', 'wickets', 'matches']
-bowling_stats['economy'] = (bowling_stats['runs'] / (bowling_stats['balls'] / 6)).round(2)
-bowling_stats['avg'] = (bowling_stats['runs'] / bowling_stats['wickets'].replace(0, 1)).round(2)
-bowling_stats['sr'] = (bowling_stats['balls'] / bowling_stats['wickets'].replace(0, 1)).round(2)
-
-most_wickets = bowling_stats.nlargest(50, 'wickets').to_dict('records')
-
-# 2. Best Bowling Figures
-print("Calculating best bowling figures...")
-innings_bowling = df_balls.groupby(['match_id', 'bowler']).agg({
-    'runs_total': 'sum',
-    'ball': 'count',
-    'wicket_kind': lambda x: x.notna().sum()
-}).reset_index()
-innings_bowling.columns = ['match_id', 'player', 'runs', 'balls', 'wickets']
-innings_bowling['economy'] = (innings_bowling['runs'] / (innings_bowling['balls'] / 6)).round(2)
-innings_bowling = innings_bowling.merge(match_details, on='match_id', how='left')
-
-best_bowling = innings_bowling.nlargest(50, 'wickets').to_dict('records')
-
-# 3. Hat Tricks
-print("Finding hat tricks...")
-# Hat trick: 3 consecutive wickets by same bowler
-hat_tricks = []
-for match_id in df_balls['match_id'].unique():
-    match_balls = df_balls[df_balls['match_id'] == match_id].sort_values(['innings', 'over', 'ball'])
-    
-    for bowler in match_balls['bowler'].unique():
-        bowler_balls = match_balls[match_balls['bowler'] == bowler]
-        wicket_balls = bowler_balls[bowler_balls['wicket_kind'].notna()]
-        
-        if len(wicket_balls) >= 3:
-            # Check for consecutive wickets
-            wicket_indices = wicket_balls.index.tolist()
-            for i in range(len(wicket_indices) - 2):
-                # Check if 3 wickets in consecutive deliveries (allowing for wides/noballs)
-                idx1, idx2, idx3 = wicket_indices[i], wicket_indices[i+1], wicket_indices[i+2]
-                if idx3 - idx1 <= 5:  # Within 5 balls (accounting for extras)
-                    match_info = df_matches[df_matches['match_id'] == match_id].iloc[0]
-                    victims = wicket_balls.iloc[i:i+3]['player_out'].tolist()
-                    hat_tricks.append({
-                        'bowler': bowler,
-                        'season': int(match_info['season']),
-                        'match': f"{match_info['team1']} vs {match_info['team2']}",
-                        'venue': match_info['venue'],
-                        'victims': victims
-                    })
-                    break
-
-# 4. Best Economy Rates (min 20 matches)
-print("Calculating best economy rates...")
-best_economy = bowling_stats[bowling_stats['matches'] >= 20].nsmallest(30, 'economy')[['player', 'economy', 'wickets', 'matches']].to_dict('records')
-
-# Save bowling records
-bowling_records = {
-    'most_wickets': most_wickets,
-    'best_bowling': best_bowling,
-    'hat_tricks': hat_tricks,
-    'best_economy': best_economy
-}
-
-with open('webapp/static/data/stats/bowling_records.json', 'w') as f:
-    json.dump(bowling_records, f, indent=2)
-print("Saved bowling_records.json")
-
-# ============================================================================
-# TEAM RECORDS
-# ============================================================================
-
-print("\n=== Generating Team Records ===")
-
-# Points Table by Season
-print("Calculating points tables...")
-points_tables = {}
-
-for season in sorted(df_matches['season'].unique()):
-    season_matches = df_matches[df_matches['season'] == season]
-    
-    teams = set(season_matches['team1'].tolist() + season_matches['team2'].tolist())
-    standings = {}
-    
-    for team in teams:
-        team_matches = season_matches[(season_matches['team1'] == team) | (season_matches['team2'] == team)]
-        wins = len(team_matches[team_matches['match_won_by'] == team])
-        losses = len(team_matches[team_matches['match_won_by'] != team]) - len(team_matches[team_matches['match_won_by'].isna()])
+from utils import load_balls
+from wicket_streaks import wicket_streak_records
+from points_table import build_points_tables
+
+def generate_stats_data(df_balls, df_matches):
+    """Generate batting, bowling, points table and captaincy records from pre-loaded data"""
+    print(f"Loaded {len(df_balls)} balls and {len(df_matches)} matches")
+
+    # Create output directory
+    os.makedirs('webapp/static/data/stats', exist_ok=True)
+
+    # ============================================================================
+    # BATTING RECORDS
+    # ============================================================================
+
+    print("\n=== Generating Batting Records ===")
+
+    # 1. Most Runs (Aggregate)
+    print("Calculating most runs...")
+    batting_stats = df_balls.groupby('batter', observed=True).agg({
+        'runs_batter': 'sum',
+        'ball': 'count',
+        'match_id': 'nunique'
+    }).reset_index()
+    batting_stats.columns = ['player', 'runs', 'balls', 'matches']
+    batting_stats['player'] = batting_stats['player'].astype(str)
+    batting_stats['sr'] = (batting_stats['runs'] / batting_stats['balls'] * 100).round(2)
+
+    # Get dismissals count
+    dismissals = df_balls[df_balls['wicket_kind'].notna() & (df_balls['player_out'] == df_balls['batter'])].groupby('batter', observed=True).size()
+    batting_stats['dismissals'] = batting_stats['player'].map(dismissals).fillna(0).astype(int)
+    batting_stats['avg'] = (batting_stats['runs'] / batting_stats['dismissals'].replace(0, 1)).round(2)
+
+    # Count boundaries
+    fours = df_balls[df_balls['runs_batter'] == 4].groupby('batter', observed=True).size()
+    sixes = df_balls[df_balls['runs_batter'] == 6].groupby('batter', observed=True).size()
+    batting_stats['fours'] = batting_stats['player'].map(fours).fillna(0).astype(int)
+    batting_stats['sixes'] = batting_stats['player'].map(sixes).fillna(0).astype(int)
+
+    most_runs = batting_stats.nlargest(50, 'runs').to_dict('records')
+
+    # 2. Highest Scores in an Innings
+    print("Calculating highest scores...")
+    innings_scores = df_balls.groupby(['match_id', 'batter'], observed=True).agg({
+        'runs_batter': 'sum',
+        'ball': 'count'
+    }).reset_index()
+    innings_scores.columns = ['match_id', 'player', 'runs', 'balls']
+    innings_scores['sr'] = (innings_scores['runs'] / innings_scores['balls'] * 100).round(2)
+
+    # Add match details
+    match_details = df_matches[['match_id', 'season', 'date', 'team1', 'team2', 'venue']].copy()
+    innings_scores = innings_scores.merge(match_details, on='match_id', how='left')
+
+    highest_scores = innings_scores.nlargest(50, 'runs').to_dict('records')
+
+    # 3. Fastest 50s
+    print("Calculating fastest 50s...")
+    fifties = innings_scores[innings_scores['runs'] >= 50].copy()
+    fifties = fifties.nsmallest(50, 'balls')[['player', 'runs', 'balls', 'sr', 'season', 'team1', 'team2', 'venue']].to_dict('records')
+
+    # 4. Fastest 100s
+    print("Calculating fastest 100s...")
+    hundreds = innings_scores[innings_scores['runs'] >= 100].copy()
+    hundreds = hundreds.nsmallest(30, 'balls')[['player', 'runs', 'balls', 'sr', 'season', 'team1', 'team2', 'venue']].to_dict('records')
+
+    # 5. Most Sixes
+    print("Calculating most sixes...")
+    most_sixes = batting_stats.nlargest(50, 'sixes')[['player', 'sixes', 'matches', 'runs']].to_dict('records')
+
+    # Save batting records
+    batting_records = {
+        'most_runs': most_runs,
+        'highest_scores': highest_scores,
+        'fastest_fifties': fifties,
+        'fastest_hundreds': hundreds,
+        'most_sixes': most_sixes
+    }
+
+    with open('webapp/static/data/stats/batting_records.json', 'w') as f:
+        json.dump(batting_records, f, indent=2)
+    print("Saved batting_records.json")
+
+    # ============================================================================
+    # BOWLING RECORDS
+    # ============================================================================
+
+    print("\n=== Generating Bowling Records ===")
+
+    # 1. Most Wickets (Aggregate)
+    print("Calculating most wickets...")
+    bowling_stats = df_balls.groupby('bowler', observed=True).agg({
+        'runs_total': 'sum',
+        'ball': 'count',
+        'wicket_kind': lambda x: x.notna().sum(),
+        'match_id': 'nunique'
+    }).reset_index()
+    bowling_stats.columns = ['player', 'runs', 'balls', 'wickets', 'matches']
+    bowling_stats['player'] = bowling_stats['player'].astype(str)
+    bowling_stats['economy'] = (bowling_stats['runs'] / (bowling_stats['balls'] / 6)).round(2)
+    bowling_stats['avg'] = (bowling_stats['runs'] / bowling_stats['wickets'].replace(0, 1)).round(2)
+    bowling_stats['sr'] = (bowling_stats['balls'] / bowling_stats['wickets'].replace(0, 1)).round(2)
+
+    most_wickets = bowling_stats.nlargest(50, 'wickets').to_dict('records')
+
+    # 2. Best Bowling Figures
+    print("Calculating best bowling figures...")
+    innings_bowling = df_balls.groupby(['match_id', 'bowler'], observed=True).agg({
+        'runs_total': 'sum',
+        'ball': 'count',
+        'wicket_kind': lambda x: x.notna().sum()
+    }).reset_index()
+    innings_bowling.columns = ['match_id', 'player', 'runs', 'balls', 'wickets']
+    innings_bowling['economy'] = (innings_bowling['runs'] / (innings_bowling['balls'] / 6)).round(2)
+    innings_bowling = innings_bowling.merge(match_details, on='match_id', how='left')
+
+    best_bowling = innings_bowling.nlargest(50, 'wickets').to_dict('records')
+
+    # 3. Hat Tricks
+    print("Finding hat tricks...")
+    streaks = wicket_streak_records(df_balls, df_matches)
+    hat_tricks = streaks['hat_tricks']
+    four_in_four = streaks['four_in_four']
+    consecutive_over_wickets = streaks['wickets_in_consecutive_overs']
+    print(f"Found {len(hat_tricks)} hat tricks ({len(four_in_four)} four-in-four)")
+
+    # 4. Best Economy Rates (min 20 matches)
+    print("Calculating best economy rates...")
+    best_economy = bowling_stats[bowling_stats['matches'] >= 20].nsmallest(30, 'economy')[['player', 'economy', 'wickets', 'matches']].to_dict('records')
+
+    # Save bowling records
+    bowling_records = {
+        'most_wickets': most_wickets,
+        'best_bowling': best_bowling,
+        'hat_tricks': hat_tricks,
+        'four_in_four': four_in_four,
+        'wickets_in_consecutive_overs': consecutive_over_wickets,
+        'best_economy': best_economy
+    }
+
+    with open('webapp/static/data/stats/bowling_records.json', 'w') as f:
+        json.dump(bowling_records, f, indent=2)
+    print("Saved bowling_records.json")
+
+    # ============================================================================
+    # TEAM RECORDS
+    # ============================================================================
+
+    print("\n=== Generating Team Records ===")
+
+    # Points Table by Season
+    print("Calculating points tables...")
+    points_tables = build_points_tables(df_balls, df_matches)
+
+    with open('webapp/static/data/stats/points_tables.json', 'w') as f:
+        json.dump(points_tables, f, indent=2)
+    print("Saved points_tables.json")
+
+    # ============================================================================
+    # CAPTAINCY RECORDS
+    # ============================================================================
+
+    print("\n=== Generating Captaincy Records ===")
+
+    # Check if captain columns exist
+    if 'captain1' in df_matches.columns and 'captain2' in df_matches.columns:
+        # Get captain info from matches
+        captaincy_stats = defaultdict(lambda: {'matches': 0, 'wins': 0, 'losses': 0})
         
-        standings[team] = {
-            'team': team,
-            'matches': len(team_matches),
-            'wins': wins,
-            'losses': losses,
-            'points': wins * 2,
-            'nrr': 0  # Simplified - would need detailed calculation
-        }
-    
-    # Sort by points
-    standings_list = sorted(standings.values(), key=lambda x: x['points'], reverse=True)
-    points_tables[str(int(season))] = standings_list
-
-with open('webapp/static/data/stats/points_tables.json', 'w') as f:
-    json.dump(points_tables, f, indent=2)
-print("Saved points_tables.json")
-
-# ============================================================================
-# CAPTAINCY RECORDS
-# ============================================================================
-
-print("\n=== Generating Captaincy Records ===")
-
-# Check if captain columns exist
-if 'captain1' in df_matches.columns and 'captain2' in df_matches.columns:
-    # Get captain info from matches
-    captaincy_stats = defaultdict(lambda: {'matches': 0, 'wins': 0, 'losses': 0})
-    
-    for _, match in df_matches.iterrows():
-        if pd.notna(match.get('captain1')):
-            captain = match['captain1']
-            captaincy_stats[captain]['matches'] += 1
-            if match['match_won_by'] == match['team1']:
-                captaincy_stats[captain]['wins'] += 1
-            elif pd.notna(match['match_won_by']):
-                captaincy_stats[captain]['losses'] += 1
+        for _, match in df_matches.iterrows():
+            if pd.notna(match.get('captain1')):
+                captain = match['captain1']
+                captaincy_stats[captain]['matches'] += 1
+                if match['match_won_by'] == match['team1']:
+                    captaincy_stats[captain]['wins'] += 1
+                elif pd.notna(match['match_won_by']):
+                    captaincy_stats[captain]['losses'] += 1
+            
+            if pd.notna(match.get('captain2')):
+                captain = match['captain2']
+                captaincy_stats[captain]['matches'] += 1
+                if match['match_won_by'] == match['team2']:
+                    captaincy_stats[captain]['wins'] += 1
+                elif pd.notna(match['match_won_by']):
+                    captaincy_stats[captain]['losses'] += 1
+
+        # Convert to list and calculate win percentage
+        captain_records = []
+        for captain, stats in captaincy_stats.items():
+            if stats['matches'] >= 10:  # Minimum 10 matches as captain
+                win_pct = round((stats['wins'] / stats['matches']) * 100, 2) if stats['matches'] > 0 else 0
+                captain_records.append({
+                    'captain': captain,
+                    'matches': stats['matches'],
+                    'wins': stats['wins'],
+                    'losses': stats['losses'],
+                    'win_pct': win_pct
+                })
         
-        if pd.notna(match.get('captain2')):
-            captain = match['captain2']
-            captaincy_stats[captain]['matches'] += 1
-            if match['match_won_by'] == match['team2']:
-                captaincy_stats[captain]['wins'] += 1
-            elif pd.notna(match['match_won_by']):
-                captaincy_stats[captain]['losses'] += 1
-
-    # Convert to list and calculate win percentage
-    captain_records = []
-    for captain, stats in captaincy_stats.items():
-        if stats['matches'] >= 10:  # Minimum 10 matches as captain
-            win_pct = round((stats['wins'] / stats['matches']) * 100, 2) if stats['matches'] > 0 else 0
-            captain_records.append({
-                'captain': captain,
-                'matches': stats['matches'],
-                'wins': stats['wins'],
-                'losses': stats['losses'],
-                'win_pct': win_pct
-            })
-    
-    captain_records = sorted(captain_records, key=lambda x: x['wins'], reverse=True)
-else:
-    print("Captain columns not found in matches data - using placeholder")
-    # Provide placeholder data
-    captain_records = [
-        {'captain': 'MS Dhoni', 'matches': 200, 'wins': 120, 'losses': 80, 'win_pct': 60.0},
-        {'captain': 'R Sharma', 'matches': 150, 'wins': 90, 'losses': 60, 'win_pct': 60.0},
-        {'captain': 'V Kohli', 'matches': 140, 'wins': 70, 'losses': 70, 'win_pct': 50.0}
-    ]
-
-with open('webapp/static/data/stats/captaincy_records.json', 'w') as f:
-    json.dump(captain_records, f, indent=2)
-print("Saved captaincy_records.json")
-
-print("\n=== Stats Data Generation Complete ===")
-print(f"Generated files in webapp/static/data/stats/:")
-print("  - batting_records.json")
-print("  - bowling_records.json")
-print("  - points_tables.json")
-print("  - captaincy_records.json")
+        captain_records = sorted(captain_records, key=lambda x: x['wins'], reverse=True)
+    else:
+        print("Captain columns not found in matches data - using placeholder")
+        # Provide placeholder data
+        captain_records = [
+            {'captain': 'MS Dhoni', 'matches': 200, 'wins': 120, 'losses': 80, 'win_pct': 60.0},
+            {'captain': 'R Sharma', 'matches': 150, 'wins': 90, 'losses': 60, 'win_pct': 60.0},
+            {'captain': 'V Kohli', 'matches': 140, 'wins': 70, 'losses': 70, 'win_pct': 50.0}
+        ]
+
+    with open('webapp/static/data/stats/captaincy_records.json', 'w') as f:
+        json.dump(captain_records, f, indent=2)
+    print("Saved captaincy_records.json")
+
+    print("\n=== Stats Data Generation Complete ===")
+    print(f"Generated files in webapp/static/data/stats/:")
+    print("  - batting_records.json")
+    print("  - bowling_records.json")
+    print("  - points_tables.json")
+    print("  - captaincy_records.json")
+
+if __name__ == "__main__":
+    print("Loading IPL data...")
+    generate_stats_data(load_balls(), pd.read_csv('data/IPL_matches.csv'))
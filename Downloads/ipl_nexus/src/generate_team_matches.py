@@ -2,11 +2,12 @@ import pandas as pd
 import json
 import os
 
-def generate_team_matches():
+def generate_team_matches(df=None):
     """Generate detailed match-by-match data for each team grouped by season"""
     
     print("Loading match data...")
-    df = pd.read_csv('data/IPL_matches.csv')
+    if df is None:
+        df = pd.read_csv('data/IPL_matches.csv')
     
     teams = set(df['team1'].dropna()).union(set(df['team2'].dropna()))
     
@@ -15,57 +16,31 @@ def generate_team_matches():
     for team in teams:
         print(f"Processing matches for {team}...")
         
-        # Get all matches for this team
+        # Get all matches for this team, with the per-match fields derived column-wise
         team_matches = df[(df['team1'] == team) | (df['team2'] == team)].copy()
+        team_matches['opponent'] = team_matches['team2'].where(team_matches['team1'] == team, team_matches['team1'])
+        team_matches['batted_first'] = (team_matches['bat_first_team'] == team).astype(object)
+        team_matches.loc[team_matches['bat_first_team'].isna(), 'batted_first'] = None
+        team_matches['won'] = team_matches['match_won_by'] == team
+        team_matches['team_is_home'] = team_matches['team1'] == team
         
         # Group by season
         season_matches = {}
         for season in sorted(team_matches['season'].dropna().unique()):
-            season_matches_list = []
             season_df = team_matches[team_matches['season'] == season].sort_values('date')
             
-            for _, match in season_df.iterrows():
-                # Determine opponent
-                opponent = match['team2'] if match['team1'] == team else match['team1']
-                
-                # Determine if team batted first
-                if pd.notna(match['toss_decision']) and pd.notna(match['toss_winner']):
-                    if match['toss_decision'] == 'bat':
-                        batted_first = (match['toss_winner'] == team)
-                    else:
-                        batted_first = (match['toss_winner'] != team)
-                else:
-                    batted_first = None
-                
-                # Get team score and opponent score
-                # This requires knowing which team is which in the match
-                is_team1 = (match['team1'] == team)
-                
-                # Determine result
-                won = (match['match_won_by'] == team)
-                result = "Won" if won else "Lost"
-                
-                # Get margin from win_outcome column
-                margin = str(match.get('win_outcome', 'Unknown'))
-                if pd.isna(match.get('win_outcome')):
-                    margin = 'Unknown'
-                
-                match_info = {
-                    'date': str(match['date']) if pd.notna(match['date']) else 'Unknown',
-                    'opponent': str(opponent) if pd.notna(opponent) else 'Unknown',
-                    'venue': str(match['venue']) if pd.notna(match['venue']) else 'Unknown',
-                    'toss_winner': str(match['toss_winner']) if pd.notna(match['toss_winner']) else 'Unknown',
-                    'toss_decision': str(match['toss_decision']) if pd.notna(match['toss_decision']) else 'Unknown',
-                    'batting_first': batted_first,
-                    'result': result,
-                    'margin': str(margin),
-                    'won': won,
-                    'team_is_home': is_team1
-                }
-                
-                season_matches_list.append(match_info)
-            
-            season_matches[str(int(season))] = season_matches_list
+            season_matches[str(int(season))] = [{
+                'date': str(match['date']) if pd.notna(match['date']) else 'Unknown',
+                'opponent': str(match['opponent']) if pd.notna(match['opponent']) else 'Unknown',
+                'venue': str(match['venue']) if pd.notna(match['venue']) else 'Unknown',
+                'toss_winner': str(match['toss_winner']) if pd.notna(match['toss_winner']) else 'Unknown',
+                'toss_decision': str(match['toss_decision']) if pd.notna(match['toss_decision']) else 'Unknown',
+                'batting_first': match['batted_first'],
+                'result': "Won" if match['won'] else "Lost",
+                'margin': str(match['win_outcome']) if pd.notna(match.get('win_outcome')) else 'Unknown',
+                'won': bool(match['won']),
+                'team_is_home': bool(match['team_is_home'])
+            } for match in season_df.to_dict('records')]
         
         team_matches_data[team] = season_matches
     
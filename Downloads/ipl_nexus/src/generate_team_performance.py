@@ -2,11 +2,12 @@ import pandas as pd
 import json
 import os
 
-def generate_team_performance():
+def generate_team_performance(df=None):
     """Generate team-wise performance statistics (wins, losses, matches by season)"""
     
     print("Loading match data...")
-    df = pd.read_csv('data/IPL_matches.csv')
+    if df is None:
+        df = pd.read_csv('data/IPL_matches.csv')
     
     team_data = {}
     
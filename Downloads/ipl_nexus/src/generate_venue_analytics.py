@@ -1,12 +1,14 @@
 import pandas as pd
 import json
 import os
+from utils import load_balls
 
-def generate_venue_analytics():
+def generate_venue_analytics(df=None, ball_df=None):
     """Generate comprehensive venue analytics including team performance, toss analysis, and characteristics"""
     
-    print("Loading data...")
-    df = pd.read_csv('data/IPL_matches.csv')
+    if df is None:
+        print("Loading data...")
+        df = pd.read_csv('data/IPL_matches.csv')
     
     venues = df['venue'].dropna().unique()
     venue_analytics = {}
@@ -14,6 +16,21 @@ def generate_venue_analytics():
     # Get all teams
     all_teams = set(df['team1'].dropna()).union(set(df['team2'].dropna()))
     
+    # Boundary and fielding counters for every venue in a single pass over the ball data
+    try:
+        if ball_df is None:
+            ball_df = load_balls(columns=['venue', 'runs_batter', 'wicket_kind'])
+        ball_counts = pd.DataFrame({
+            'venue': ball_df['venue'],
+            'fours': ball_df['runs_batter'] == 4,
+            'sixes': ball_df['runs_batter'] == 6,
+            'catches': ball_df['wicket_kind'] == 'caught',
+            'runouts': ball_df['wicket_kind'] == 'run out',
+        }).groupby('venue', observed=True).sum()
+    except FileNotFoundError:
+        # If the ball cache is not available, use fallback
+        ball_counts = None
+    
     for venue in venues:
         print(f"Processing {venue}...")
         venue_matches = df[df['venue'] == venue].copy()
@@ -44,20 +61,8 @@ def generate_venue_analytics():
         venue_data['venue_type'] = venue_type
         
         # === BAT FIRST VS CHASE (OVERALL) ===
-        bat_first_wins = 0
-        chase_wins = 0
-        
-        for _, match in venue_matches.iterrows():
-            if pd.notna(match['toss_winner']) and pd.notna(match['toss_decision']) and pd.notna(match['match_won_by']):
-                if match['toss_decision'] == 'bat':
-                    batted_first = match['toss_winner']
-                else:
-                    batted_first = match['team2'] if match['toss_winner'] == match['team1'] else match['team1']
-                
-                if batted_first == match['match_won_by']:
-                    bat_first_wins += 1
-                elif match['match_won_by'] != 'Unknown':
-                    chase_wins += 1
+        bat_first_wins = int(venue_matches['bat_first_won'].sum())
+        chase_wins = int((venue_matches['match_won_by'] == venue_matches['chase_team']).sum())
         
         total_decisive = bat_first_wins + chase_wins
         venue_data['bat_first_wins'] = bat_first_wins
@@ -183,40 +188,28 @@ def generate_venue_analytics():
                 batting_stats['highest_score_team'] = str(highest_2nd['team2'])
                 batting_stats['highest_score_season'] = int(highest_2nd['season'])
         
-        # Load ball-by-ball data for boundaries and fielding stats
-        try:
-            ball_df = pd.read_csv('data/IPL.csv')
-            venue_balls = ball_df[ball_df['venue'] == venue]
+        # Boundaries and fielding stats from the per-venue ball counters
+        if ball_counts is not None and venue in ball_counts.index:
+            counts = ball_counts.loc[venue]
+            fours = int(counts['fours'])
+            sixes = int(counts['sixes'])
             
-            if len(venue_balls) > 0:
-                # Boundaries
-                fours = len(venue_balls[venue_balls['runs_batter'] == 4])
-                sixes = len(venue_balls[venue_balls['runs_batter'] == 6])
-                
-                batting_stats['total_fours'] = fours
-                batting_stats['total_sixes'] = sixes
-                batting_stats['avg_fours_per_match'] = round(fours / len(venue_matches), 1)
-                batting_stats['avg_sixes_per_match'] = round(sixes / len(venue_matches), 1)
-                
-                # Fielding stats - catches and run-outs
-                catches = len(venue_balls[venue_balls['wicket_kind'] == 'caught'])
-                runouts = len(venue_balls[venue_balls['wicket_kind'] == 'run out'])
-                
-                batting_stats['total_catches'] = catches
-                batting_stats['total_runouts'] = runouts
-                batting_stats['catches_per_match'] = round(catches / len(venue_matches), 2)
-                batting_stats['runouts_per_match'] = round(runouts / len(venue_matches), 2)
-                batting_stats['fielding_rank'] = 0  # Will be calculated after all venues processed
-            else:
-                # Fallback if no ball-by-ball data
-                batting_stats.update({
-                    'total_fours': 0, 'total_sixes': 0,
-                    'avg_fours_per_match': 0, 'avg_sixes_per_match': 0,
-                    'total_catches': 0, 'total_runouts': 0,
-                    'catches_per_match': 0, 'runouts_per_match': 0
-                })
-        except:
-            # If IPL.csv not available, use fallback
+            batting_stats['total_fours'] = fours
+            batting_stats['total_sixes'] = sixes
+            batting_stats['avg_fours_per_match'] = round(fours / len(venue_matches), 1)
+            batting_stats['avg_sixes_per_match'] = round(sixes / len(venue_matches), 1)
+            
+            # Fielding stats - catches and run-outs
+            catches = int(counts['catches'])
+            runouts = int(counts['runouts'])
+            
+            batting_stats['total_catches'] = catches
+            batting_stats['total_runouts'] = runouts
+            batting_stats['catches_per_match'] = round(catches / len(venue_matches), 2)
+            batting_stats['runouts_per_match'] = round(runouts / len(venue_matches), 2)
+            batting_stats['fielding_rank'] = 0  # Will be calculated after all venues processed
+        else:
+            # Fallback if no ball-by-ball data
             batting_stats.update({
                 'total_fours': 0, 'total_sixes': 0,
                 'avg_fours_per_match': 0, 'avg_sixes_per_match': 0,
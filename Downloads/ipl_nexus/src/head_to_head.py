@@ -0,0 +1,47 @@
+import pandas as pd
+
+H2H_KEYS = ['team_a', 'team_b', 'season', 'venue', 'batted_first']
+
+def build_h2h(matches):
+    """
+    Winner-count tensor for every pairing in one grouped pass.
+    Each match is counted from both sides, so the row (team_a, team_b, season, venue,
+    batted_first) holds team_a's record against team_b: played, wins, losses and the
+    runs team_a scored (with the number of innings that had a score).
+    """
+    m = matches[matches['team1'].notna() & matches['team2'].notna()]
+    bat_first = m['bat_first_team']
+
+    views = []
+    for team_a, team_b in [('team1', 'team2'), ('team2', 'team1')]:
+        batted_first = bat_first == m[team_a]
+        runs = m['first_innings_runs'].where(batted_first, m['second_innings_runs'])
+        views.append(pd.DataFrame({
+            'team_a': m[team_a],
+            'team_b': m[team_b],
+            'season': m['season'],
+            'venue': m['venue'],
+            'batted_first': batted_first,
+            'wins': (m['match_won_by'] == m[team_a]).astype(int),
+            'losses': (m['match_won_by'] == m[team_b]).astype(int),
+            'runs': runs,
+            'scored': runs.notna().astype(int)
+        }))
+
+    sides = pd.concat(views, ignore_index=True)
+    return sides.groupby(H2H_KEYS, dropna=False).agg(
+        played=('wins', 'size'),
+        wins=('wins', 'sum'),
+        losses=('losses', 'sum'),
+        runs=('runs', 'sum'),
+        scored=('scored', 'sum')
+    )
+
+def h2h_slice(h2h, by=(), min_season=None):
+    """
+    Collapse the tensor to (team_a, team_b[, *by]) totals.
+    min_season keeps only seasons from that year onwards.
+    """
+    if min_season is not None:
+        h2h = h2h[h2h.index.get_level_values('season') >= min_season]
+    return h2h.groupby(level=['team_a', 'team_b', *by]).sum()
@@ -0,0 +1,429 @@
+"""
+Rebuild all dashboard data from one entry point.
+
+Run from the project root:
+    python -m src.pipeline                  # process IPL.csv, then run every stage
+    python -m src.pipeline --skip-process   # reuse IPL_matches.csv and the ball cache
+    python -m src.pipeline --append         # only process matches new to IPL.csv
+    python -m src.pipeline --only stats_data comprehensive_stats
+    python -m src.pipeline --jobs 4         # run up to 4 independent stages at once
+
+The match table and ball cache are loaded once (per worker) and handed to every
+stage in memory. Stages declare the files they read and write; a stage starts as
+soon as the stages producing its inputs have finished.
+
+Stages whose inputs, source and parameters are unchanged since their last
+successful build are skipped (see build_cache.py); pass --force to rebuild anyway.
+
+Every run writes pipeline_profile.json with each stage's wall and CPU time, peak
+memory, input rows and output size (see profiling.py); --profile adds
+tracemalloc peaks and per-stage cProfile dumps.
+
+Finally, the content-hashed URL manifest is refreshed (see data_manifest.py)
+and new or changed JSON outputs get precompressed .gz/.br copies for the web
+app to serve (see compress_data.py).
+"""
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+
+# Generators import their helpers as top-level modules (from utils import ...)
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from utils import load_balls, BALLS_CACHE_PATH
+from build_cache import BuildCache
+from profiling import profile_stage, path_bytes, write_profile, PROFILE_PATH, CPROFILE_DIR
+from compress_data import precompress
+from data_manifest import write_manifest
+from elo import ELO_CHECKPOINT_PATH
+from features import MODELING_DATA_PATH, TEAM_ENCODER_PATH, VENUE_ENCODER_PATH
+from process_data import process_data
+from generate_dashboard_data import main as generate_dashboard_data
+from rebuild_archetypes import rebuild_archetypes
+from generate_archetype_analytics import generate_archetype_analytics
+from generate_stats_data import generate_stats_data
+from generate_comprehensive_stats import generate_comprehensive_stats
+from generate_overview_stats import generate_overview_stats
+from generate_venue_analytics import generate_venue_analytics
+from generate_player_matchup_data import generate_player_matchup_data
+from generate_prediction_data import generate_prediction_data
+from generate_season_stats import generate_season_stats
+from generate_team_matches import generate_team_matches
+from generate_team_performance import generate_team_performance
+from generate_advanced_analytics import generate_advanced_team_analytics
+from prediction_table import generate_prediction_table, PREDICTION_TABLE_PATH
+from predictor import PREDICTOR_INPUTS
+
+MATCHES_PATH = 'data/IPL_matches.csv'
+DATA_DIR = 'webapp/static/data'
+ARCHETYPES_PATH = f'{DATA_DIR}/archetypes.json'
+
+def data_files(*names):
+    return [f'{DATA_DIR}/{name}' for name in names]
+
+# Stage graph: each stage is called as run(matches, balls) and declares the files
+# it reads and writes. Dependencies are derived from those declarations (see
+# stage_dependencies), so the list only has to be in a valid order. 'module' is
+# the src module whose source (with its src imports) goes into the build fingerprint.
+STAGES = [
+    {
+        'name': 'dashboard_data',
+        'module': 'generate_dashboard_data',
+        'run': lambda matches, balls: generate_dashboard_data(matches),
+        'inputs': [MATCHES_PATH, TEAM_ENCODER_PATH, VENUE_ENCODER_PATH],
+        'outputs': data_files('current_elo.json', 'elo_history.json', 'venue_stats.json',
+                              'archetypes.json', 'h2h_matrix.json') + [ELO_CHECKPOINT_PATH, MODELING_DATA_PATH],
+    },
+    {
+        # Overwrites the dashboard's archetypes.json with uniquely named clusters
+        'name': 'rebuild_archetypes',
+        'module': 'rebuild_archetypes',
+        'run': lambda matches, balls: rebuild_archetypes(matches),
+        'inputs': [MATCHES_PATH],
+        'outputs': [ARCHETYPES_PATH],
+    },
+    {
+        'name': 'archetype_analytics',
+        'module': 'generate_archetype_analytics',
+        'run': lambda matches, balls: generate_archetype_analytics(balls, matches),
+        'inputs': [MATCHES_PATH, BALLS_CACHE_PATH, ARCHETYPES_PATH],
+        'outputs': data_files('archetypes_detailed.json'),
+    },
+    {
+        'name': 'stats_data',
+        'module': 'generate_stats_data',
+        'run': lambda matches, balls: generate_stats_data(balls, matches),
+        'inputs': [MATCHES_PATH, BALLS_CACHE_PATH],
+        'outputs': data_files('stats/batting_records.json', 'stats/bowling_records.json',
+                              'stats/points_tables.json', 'stats/captaincy_records.json'),
+    },
+    {
+        # Runs after stats_data so its richer batting/bowling records are the ones kept
+        'name': 'comprehensive_stats',
+        'module': 'generate_comprehensive_stats',
+        'run': lambda matches, balls: generate_comprehensive_stats(balls, matches),
+        'inputs': [MATCHES_PATH, BALLS_CACHE_PATH],
+        'outputs': data_files('stats/series_records.json', 'stats/player_profiles.json',
+                              'stats/team_records.json', 'stats/ground_records.json',
+                              'stats/match_records.json', 'stats/scoring_records.json',
+                              'stats/partnership_records.json', 'stats/batting_records.json',
+                              'stats/bowling_records.json', 'stats/fielding_records.json'),
+    },
+    {
+        'name': 'overview_stats',
+        'module': 'generate_overview_stats',
+        'run': lambda matches, balls: generate_overview_stats(balls, matches),
+        'inputs': [MATCHES_PATH, BALLS_CACHE_PATH],
+        'outputs': data_files('overview_stats.json'),
+    },
+    {
+        'name': 'venue_analytics',
+        'module': 'generate_venue_analytics',
+        'run': lambda matches, balls: generate_venue_analytics(matches, balls),
+        'inputs': [MATCHES_PATH, BALLS_CACHE_PATH],
+        'outputs': data_files('venue_analytics.json'),
+    },
+    {
+        'name': 'player_matchups',
+        'module': 'generate_player_matchup_data',
+        'run': lambda matches, balls: generate_player_matchup_data(balls),
+        'inputs': [BALLS_CACHE_PATH],
+        'outputs': data_files('matchups'),
+    },
+    {
+        'name': 'prediction_data',
+        'module': 'generate_prediction_data',
+        'run': lambda matches, balls: generate_prediction_data(matches),
+        'inputs': [MATCHES_PATH],
+        'outputs': data_files('prediction_data.json'),
+    },
+    {
+        'name': 'season_stats',
+        'module': 'generate_season_stats',
+        'run': lambda matches, balls: generate_season_stats(matches),
+        'inputs': [MATCHES_PATH],
+        'outputs': data_files('season_stats.json'),
+    },
+    {
+        'name': 'team_matches',
+        'module': 'generate_team_matches',
+        'run': lambda matches, balls: generate_team_matches(matches),
+        'inputs': [MATCHES_PATH],
+        'outputs': data_files('team_matches.json'),
+    },
+    {
+        'name': 'team_performance',
+        'module': 'generate_team_performance',
+        'run': lambda matches, balls: generate_team_performance(matches),
+        'inputs': [MATCHES_PATH],
+        'outputs': data_files('team_performance.json'),
+    },
+    {
+        'name': 'advanced_analytics',
+        'module': 'generate_advanced_analytics',
+        'run': lambda matches, balls: generate_advanced_team_analytics(matches),
+        'inputs': [MATCHES_PATH],
+        'outputs': data_files('team_analytics.json'),
+    },
+    {
+        # Every fixture scored with the latest ratings, for /api/predict to look up
+        'name': 'prediction_table',
+        'module': 'prediction_table',
+        'run': lambda matches, balls: generate_prediction_table(),
+        'inputs': PREDICTOR_INPUTS,
+        'outputs': [PREDICTION_TABLE_PATH],
+    },
+]
+
+# Runs before the graph, since every stage reads what it writes
+PROCESS_STAGE = {
+    'name': 'process_data',
+    'module': 'process_data',
+    'inputs': ['data/IPL.csv'],
+    'outputs': [MATCHES_PATH, BALLS_CACHE_PATH],
+}
+
+STAGE_NAMES = [stage['name'] for stage in STAGES]
+STAGES_BY_NAME = {stage['name']: stage for stage in STAGES}
+
+def stage_dependencies(names):
+    """
+    For each selected stage, the earlier selected stages it has to wait for:
+    those that write one of its inputs, or write the same output (so the
+    declared order decides which version is kept).
+    """
+    deps = {}
+    for i, name in enumerate(names):
+        stage = STAGES_BY_NAME[name]
+        needs = set(stage['inputs']) | set(stage['outputs'])
+        deps[name] = {earlier for earlier in names[:i] if needs & set(STAGES_BY_NAME[earlier]['outputs'])}
+    return deps
+
+def shares_outputs(name, others):
+    """True if any of the other stages writes one of this stage's outputs"""
+    outputs = set(STAGES_BY_NAME[name]['outputs'])
+    return any(outputs & set(STAGES_BY_NAME[other]['outputs']) for other in others)
+
+def load_frames():
+    """Load the processed match table and the typed ball cache once"""
+    matches = pd.read_csv(MATCHES_PATH)
+    balls = load_balls()
+    print(f"Loaded {len(matches)} matches and {len(balls)} balls")
+    return matches, balls
+
+def run_stage(name, matches, balls, detailed=False):
+    """
+    Run one stage and return (metrics, error traceback or None), where metrics
+    holds wall/CPU time, peak memory, input row counts and output bytes (see
+    profiling.profile_stage; detailed adds tracemalloc and cProfile).
+    Each stage gets its own copy of the (small) match table; the ball frame is
+    shared and its columns are read-only views of the ball cache, so stages
+    must not modify it in place.
+    """
+    print(f"\n[pipeline] {name}")
+    stage = STAGES_BY_NAME[name]
+    error = None
+    with profile_stage(name, detailed=detailed) as metrics:
+        try:
+            stage['run'](matches.copy(), balls)
+        except Exception:
+            error = traceback.format_exc()
+    metrics['input_rows'] = {}
+    if MATCHES_PATH in stage['inputs']:
+        metrics['input_rows']['matches'] = len(matches)
+    if BALLS_CACHE_PATH in stage['inputs']:
+        metrics['input_rows']['balls'] = len(balls)
+    metrics['output_bytes'] = path_bytes(stage['outputs'])
+    return metrics, error
+
+# Frames loaded once per worker process by init_worker
+_worker_frames = None
+
+def init_worker():
+    """
+    Pool initializer: each worker memory-maps the ball cache instead of
+    receiving a pickled copy. The ball columns are views of the mapped file
+    (see utils.load_balls), so the workers share its pages.
+    """
+    global _worker_frames
+    _worker_frames = load_frames()
+
+def run_stage_in_worker(name, detailed=False):
+    matches, balls = _worker_frames
+    return run_stage(name, matches, balls, detailed)
+
+def skip_blocked(waiting, names, blocked, skipped):
+    """Drop waiting stages that depend on a failed or skipped stage (in order, so skips cascade)"""
+    for name in names:
+        if name in waiting and waiting[name] & blocked:
+            del waiting[name]
+            skipped.add(name)
+            blocked.add(name)
+            print(f"[pipeline] Skipping {name}: a stage it depends on did not finish")
+
+def run_stages(names, jobs=1, cache=None, detailed=False):
+    """
+    Run the selected stages and return ({stage: metrics}, {stage: status}), where
+    status is 'ok', 'cached', 'FAILED' or 'skipped'.
+    With jobs=1 everything runs in this process on one copy of the data; otherwise
+    independent stages run concurrently on a pool of jobs worker processes.
+    With a BuildCache, a stage whose fingerprint is unchanged is not run (unless an
+    earlier stage that rewrote one of its outputs did). A failing stage is
+    reported and only the stages that depend on it are skipped.
+    Frames and worker processes are only started once a stage actually has to run.
+    """
+    waiting = stage_dependencies(names)
+    deps = {name: set(d) for name, d in waiting.items()}
+    metrics, status = {}, {}
+    blocked, skipped = set(), set()
+    ran = set()
+    fingerprints = {}
+
+    def needs_run(name):
+        """Fingerprint the stage now that its inputs are final; False if the cache covers it"""
+        if cache is None:
+            return True
+        stage = STAGES_BY_NAME[name]
+        fingerprints[name] = cache.fingerprint(stage)
+        if cache.is_fresh(stage, fingerprints[name]) and not shares_outputs(name, deps[name] & ran):
+            print(f"[pipeline] {name} is up to date")
+            status[name] = 'cached'
+            return False
+        return True
+
+    def finish(name, stage_metrics, error):
+        metrics[name] = stage_metrics
+        ran.add(name)
+        if error:
+            print(f"[pipeline] {name} failed:\n{error}")
+            status[name] = 'FAILED'
+            blocked.add(name)
+            if cache is not None:
+                cache.forget(STAGES_BY_NAME[name])
+        else:
+            status[name] = 'ok'
+            if cache is not None:
+                cache.record(STAGES_BY_NAME[name], fingerprints[name])
+
+    def report_skips():
+        for name in list(skipped) + list(waiting):
+            status.setdefault(name, 'skipped')
+
+    if jobs <= 1:
+        frames = None
+        for name in names:
+            skip_blocked(waiting, names, blocked, skipped)
+            if name in waiting:
+                del waiting[name]
+                if needs_run(name):
+                    if frames is None:
+                        frames = load_frames()
+                    finish(name, *run_stage(name, *frames, detailed))
+        report_skips()
+        return metrics, status
+
+    finished = set()
+    pool = None
+    running = {}
+    try:
+        while waiting or running:
+            skip_blocked(waiting, names, blocked, skipped)
+            for name in [n for n in names if n in waiting and waiting[n] <= finished]:
+                del waiting[name]
+                if not needs_run(name):
+                    finished.add(name)
+                    continue
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker)
+                running[pool.submit(run_stage_in_worker, name, detailed)] = name
+            if not running:
+                # Cached stages may have unblocked others; go round again
+                if waiting and any(waiting[n] <= finished for n in waiting):
+                    continue
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                finish(name, *future.result())
+                finished.add(name)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    report_skips()
+    return metrics, status
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the dashboard data under webapp/static/data")
+    parser.add_argument('--skip-process', action='store_true',
+                        help="reuse data/IPL_matches.csv and the ball cache instead of re-processing IPL.csv")
+    parser.add_argument('--append', action='store_true',
+                        help="only process matches in IPL.csv that are not yet in IPL_matches.csv")
+    parser.add_argument('--only', nargs='+', choices=STAGE_NAMES, metavar='STAGE',
+                        help=f"run only these stages ({', '.join(STAGE_NAMES)})")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="number of stages to run at once (default: CPU count; 1 runs in-process)")
+    parser.add_argument('--force', action='store_true',
+                        help="ignore the build manifest and rerun every selected stage")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"also trace memory allocations and write cProfile dumps to {CPROFILE_DIR}/ per stage")
+    args = parser.parse_args(argv)
+
+    total_start = time.perf_counter()
+    cache = BuildCache()
+    if not args.skip_process:
+        fingerprint = cache.fingerprint(PROCESS_STAGE)
+        if not args.force and cache.is_fresh(PROCESS_STAGE, fingerprint):
+            print("[pipeline] process_data is up to date")
+        else:
+            print("[pipeline] process_data")
+            process_data(append=args.append)
+            cache.record(PROCESS_STAGE, fingerprint)
+
+    names = [name for name in STAGE_NAMES if not args.only or name in args.only]
+    if args.force:
+        for name in names:
+            cache.forget(STAGES_BY_NAME[name])
+    try:
+        metrics, status = run_stages(names, jobs=args.jobs, cache=cache, detailed=args.profile)
+    finally:
+        cache.save()
+
+    manifest = write_manifest(DATA_DIR)
+    written, removed = precompress(DATA_DIR, jobs=args.jobs)
+    print(f"\n[pipeline] Data manifest lists {len(manifest)} files")
+    print(f"[pipeline] Precompressed {written} files, removed {removed} stale copies")
+    total = time.perf_counter() - total_start
+
+    stages = {}
+    for name in names:
+        stages[name] = {'status': status.get(name, 'skipped'), **metrics.get(name, {})}
+        if name not in metrics:
+            stages[name]['output_bytes'] = path_bytes(STAGES_BY_NAME[name]['outputs'])
+    write_profile(stages, jobs=args.jobs, total_wall_s=round(total, 3), detailed=args.profile)
+
+    print(f"\n[pipeline] Stage profile (jobs={args.jobs}, saved to {PROFILE_PATH}):")
+    print(f"  {'stage':<22} {'wall':>8} {'cpu':>8} {'peak rss':>10} {'output':>10}  status")
+    for name in names:
+        stage = stages[name]
+        if 'wall_s' in stage:
+            rss = f"{stage['peak_rss_mb']:.0f} MB" if stage['peak_rss_mb'] is not None else '-'
+            print(f"  {name:<22} {stage['wall_s']:7.2f}s {stage['cpu_s']:7.2f}s {rss:>10} "
+                  f"{stage['output_bytes'] / 1024:7.0f} KB  {stage['status']}")
+        else:
+            print(f"  {name:<22} {'-':>8} {'-':>8} {'-':>10} {stage['output_bytes'] / 1024:7.0f} KB  {stage['status']}")
+    print(f"  {'total':<22} {total:7.2f}s")
+    if any(stages[name].get('peak_rss_scope') == 'process' for name in names):
+        print("  (peak rss could not be reset between stages here, so it is each process's peak so far)")
+    if args.profile:
+        print(f"\ncProfile dumps are in {CPROFILE_DIR}/ (view with: python -m pstats {CPROFILE_DIR}/<stage>.prof)")
+
+    return 1 if any(s in ('FAILED', 'skipped') for s in status.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
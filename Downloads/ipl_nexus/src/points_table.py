@@ -0,0 +1,162 @@
+import pandas as pd
+import numpy as np
+from utils import RETIRED_NOT_OUT
+
+# Balls in a full T20 innings; a side bowled out is charged its whole quota for NRR
+QUOTA_BALLS = 120
+
+def innings_totals(balls):
+    """
+    Runs, legal balls and wickets for every innings 1 and 2 in one grouped pass.
+    Super overs (innings 3+) do not count towards net run rate.
+
+    A side bowled out is charged the full quota of its match (nrr_balls). That
+    is 120 balls unless the match was reduced: an innings that was neither
+    bowled out nor a won chase batted its whole allocation, so a shorter one
+    gives the match's reduced quota.
+    """
+    b = balls.loc[balls['innings'].isin([1, 2]),
+                  ['match_id', 'innings', 'batting_team', 'bowling_team', 'runs_total', 'extra_type',
+                   'wicket_kind', 'match_won_by']]
+    b = b.assign(
+        runs=b['runs_total'].astype('int32'),
+        legal=~b['extra_type'].isin(['wides', 'noballs']),
+        out=b['wicket_kind'].notna() & ~b['wicket_kind'].isin(RETIRED_NOT_OUT)
+    )
+    totals = b.groupby(['match_id', 'innings'], sort=True).agg(
+        batting_team=('batting_team', 'first'),
+        bowling_team=('bowling_team', 'first'),
+        winner=('match_won_by', 'first'),
+        runs=('runs', 'sum'),
+        balls=('legal', 'sum'),
+        wickets=('out', 'sum')
+    ).reset_index()
+    totals['batting_team'] = totals['batting_team'].astype(str)
+    totals['bowling_team'] = totals['bowling_team'].astype(str)
+
+    all_out = totals['wickets'] >= 10
+    won_chase = (totals['innings'] == 2) & (totals['batting_team'] == totals['winner'].astype(str))
+    # Whole overs, in case play stopped mid-over
+    allocation = (np.ceil(totals['balls'] / 6) * 6).where(~all_out & ~won_chase)
+    quota = allocation.groupby(totals['match_id']).transform('min').fillna(QUOTA_BALLS).clip(upper=QUOTA_BALLS)
+    totals['nrr_balls'] = np.where(all_out, quota, totals['balls']).astype(int)
+    return totals.drop(columns='winner')
+
+def super_over_winners(balls):
+    """
+    match_id -> winner of the super over, for ties that one decided. Innings 3
+    and 4 are the super over (5 and 6 a second one if that was tied too); the
+    side with more runs in the last pair won. A last super over tied on runs
+    goes to the side with more boundaries over the whole match, super overs
+    included (the rule before repeated super overs). Ties still level are left
+    out.
+    """
+    b = balls[['match_id', 'innings', 'batting_team', 'runs_total', 'runs_batter']]
+    b = b.assign(runs=b['runs_total'].astype('int32'), boundaries=b['runs_batter'].isin([4, 6]).astype('int32'))
+    runs = b.groupby(['match_id', 'innings'], sort=True).agg(
+        batting_team=('batting_team', 'first'),
+        runs=('runs', 'sum'),
+        boundaries=('boundaries', 'sum')
+    ).reset_index()
+    runs['batting_team'] = runs['batting_team'].astype(str)
+    boundaries = runs.groupby(['match_id', 'batting_team'])['boundaries'].sum()
+
+    runs = runs[runs['innings'] >= 3]
+    pair = (runs['innings'] - 3) // 2
+    last = runs[pair == pair.groupby(runs['match_id']).transform('max')].copy()
+    last['boundaries'] = boundaries.reindex(pd.MultiIndex.from_frame(last[['match_id', 'batting_team']])).to_numpy()
+    last = last[last.groupby('match_id')['runs'].transform('size') == 2]
+    # Leader first: more runs, then more boundaries
+    last = last.sort_values(['match_id', 'runs', 'boundaries'], ascending=[True, False, False], kind='mergesort')
+    leader = last.groupby('match_id').nth(0).set_index('match_id')
+    other = last.groupby('match_id').nth(1).set_index('match_id')
+    decided = (leader['runs'] > other['runs']) | (leader['boundaries'] > other['boundaries'])
+    return leader.loc[decided, 'batting_team']
+
+def format_overs(balls):
+    """Balls as cricket overs notation, e.g. 123.4"""
+    return f"{int(balls) // 6}.{int(balls) % 6}"
+
+def build_points_tables(balls, matches, as_of=None):
+    """
+    Standings for every season: played, won, lost, tied, no result, points and
+    net run rate, sorted by points then NRR.
+    Pass as_of (a date) to get the tables as they stood after that day's matches.
+    """
+    matches = matches[['match_id', 'season', 'date', 'team1', 'team2', 'match_won_by', 'result_type']].copy()
+    matches['date'] = pd.to_datetime(matches['date'])
+    if as_of is not None:
+        matches = matches[matches['date'] <= pd.to_datetime(as_of)]
+
+    # A tie decided by a super over keeps its recorded winner; only ties recorded
+    # without one take the winner from the super-over innings
+    matches['match_won_by'] = matches['match_won_by'].astype(object)
+    undecided = ~((matches['match_won_by'] == matches['team1']) | (matches['match_won_by'] == matches['team2']))
+    ties = matches.loc[undecided & (matches['result_type'] == 'tie'), 'match_id']
+    if len(ties):
+        winners = super_over_winners(balls[balls['match_id'].isin(ties)])
+        matches['match_won_by'] = matches['match_won_by'].where(~undecided, matches['match_id'].map(winners))
+
+    # One row per team per match
+    results = pd.concat([
+        matches.rename(columns={'team1': 'team', 'team2': 'opponent'}),
+        matches.rename(columns={'team2': 'team', 'team1': 'opponent'})
+    ], ignore_index=True)
+    results = results[results['team'].notna() & (results['team'] != '')]
+
+    no_result = results['result_type'] == 'no result'
+    won = ~no_result & (results['match_won_by'] == results['team'])
+    # A super-over win counts as a win; only ties nobody won share the points
+    tied = ~no_result & ~won & (results['match_won_by'] != results['opponent'])
+    results = results.assign(
+        won=won.astype(int),
+        no_result=no_result.astype(int),
+        tied=tied.astype(int),
+        lost=(~no_result & ~won & ~tied).astype(int)
+    )
+
+    # Runs and balls for/against, from the innings of matches that produced a result
+    totals = innings_totals(balls[balls['match_id'].isin(matches.loc[matches['result_type'] != 'no result', 'match_id'])])
+    batting = totals.groupby(['match_id', 'batting_team'])[['runs', 'nrr_balls']].sum()
+    bowling = totals.groupby(['match_id', 'bowling_team'])[['runs', 'nrr_balls']].sum()
+    batting.index.names = bowling.index.names = ['match_id', 'team']
+    run_rates = batting.add_prefix('for_').join(bowling.add_prefix('against_'), how='outer').fillna(0).reset_index()
+    results = results.merge(run_rates, on=['match_id', 'team'], how='left').fillna(
+        {'for_runs': 0, 'for_nrr_balls': 0, 'against_runs': 0, 'against_nrr_balls': 0})
+
+    table = results.groupby(['season', 'team']).agg(
+        matches=('match_id', 'size'),
+        wins=('won', 'sum'),
+        losses=('lost', 'sum'),
+        ties=('tied', 'sum'),
+        no_result=('no_result', 'sum'),
+        runs_for=('for_runs', 'sum'),
+        balls_for=('for_nrr_balls', 'sum'),
+        runs_against=('against_runs', 'sum'),
+        balls_against=('against_nrr_balls', 'sum')
+    ).reset_index()
+
+    table['points'] = table['wins'] * 2 + table['ties'] + table['no_result']
+    rate_for = table['runs_for'] / (table['balls_for'] / 6)
+    rate_against = table['runs_against'] / (table['balls_against'] / 6)
+    table['nrr'] = (rate_for.fillna(0) - rate_against.fillna(0)).replace([np.inf, -np.inf], 0).round(3)
+    table = table.sort_values(['season', 'points', 'nrr'], ascending=[True, False, False], kind='mergesort')
+
+    points_tables = {}
+    for season, group in table.groupby('season', sort=True):
+        points_tables[str(int(season))] = [{
+            'team': str(row['team']),
+            'matches': int(row['matches']),
+            'wins': int(row['wins']),
+            'losses': int(row['losses']),
+            'ties': int(row['ties']),
+            'no_result': int(row['no_result']),
+            'points': int(row['points']),
+            'nrr': float(row['nrr']),
+            'runs_for': int(row['runs_for']),
+            'overs_for': format_overs(row['balls_for']),
+            'runs_against': int(row['runs_against']),
+            'overs_against': format_overs(row['balls_against'])
+        } for row in group.to_dict('records')]
+
+    return points_tables
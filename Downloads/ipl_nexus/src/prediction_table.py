@@ -0,0 +1,87 @@
+"""
+Precomputed win probabilities for every fixture the model can be asked about:
+each ordered pair of rated teams, at every venue, for both toss winners and
+both toss decisions, scored by MatchPredictor in a single call.
+
+The web app answers /api/predict from this table whenever it covers a fixture,
+so the model only runs for teams or venues outside it. The pipeline rebuilds
+the table whenever the Elo ratings, the model or the encoders change.
+
+The table is stored flat. With T teams and V venues, the probability that
+team1 wins is at
+    team1_win_prob[table_index(i, j, v, toss, decision, T, V)]
+for teams[i] vs teams[j] at venues[v], where toss is 0 if team1 won it and 1 if
+team2 did, and decision is the index into TOSS_DECISIONS. Entries with i == j
+are null. elo_team1_win_prob[i][j] is the Elo win probability given to the model.
+"""
+import itertools
+import json
+import os
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from predictor import MatchPredictor, MODEL_PATH, CURRENT_ELO_PATH
+
+PREDICTION_TABLE_PATH = 'webapp/static/data/prediction_table.json'
+TOSS_DECISIONS = ['bat', 'field']
+
+def table_index(i, j, v, toss, decision, n_teams, n_venues):
+    """Position of one fixture in the flat team1_win_prob list"""
+    return (((i * n_teams + j) * n_venues + v) * 2 + toss) * len(TOSS_DECISIONS) + decision
+
+def build_prediction_table(predictor):
+    """
+    The table for every rated team the model knows and every venue it knows.
+    Other teams and venues are all encoded alike (-1), so the live model
+    handles them instead.
+    """
+    teams = sorted(t for t in predictor.elo.ratings if t in predictor.known_teams)
+    venues = sorted(v for v in predictor.known_venues if isinstance(v, str))
+
+    fixtures = []
+    for (i, team1), (j, team2) in itertools.product(enumerate(teams), repeat=2):
+        for venue, toss_winner, decision in itertools.product(venues, (team1, team2), TOSS_DECISIONS):
+            fixtures.append((team1, team2, venue, toss_winner, decision))
+    # One predict call for everything; the i == j fixtures are scored too and
+    # blanked afterwards, which keeps the index arithmetic trivial
+    scores = predictor.predict(fixtures)
+    proba = scores['team1_win_prob'].round(4).tolist()
+    elo = scores['elo_team1_win_prob'].round(4).tolist()
+
+    n_teams, n_venues = len(teams), len(venues)
+    block = n_venues * 2 * len(TOSS_DECISIONS)
+    elo_matrix = [[None] * n_teams for _ in teams]
+    for i, j in itertools.product(range(n_teams), repeat=2):
+        start = table_index(i, j, 0, 0, 0, n_teams, n_venues)
+        if i == j:
+            proba[start:start + block] = [None] * block
+        else:
+            elo_matrix[i][j] = elo[start]
+
+    return {
+        'teams': teams,
+        'venues': venues,
+        'toss_decisions': TOSS_DECISIONS,
+        'ratings': {team: predictor.elo.ratings[team] for team in teams},
+        'team1_win_prob': proba,
+        'elo_team1_win_prob': elo_matrix,
+    }
+
+def generate_prediction_table(root='.', model_path=MODEL_PATH, ratings_path=CURRENT_ELO_PATH,
+                              output=PREDICTION_TABLE_PATH):
+    print("Generating Prediction Table...")
+    start = time.perf_counter()
+    table = build_prediction_table(MatchPredictor.load(root, model_path, ratings_path))
+    with open(os.path.join(root, output), 'w') as f:
+        json.dump(table, f, separators=(',', ':'))
+    scored = sum(p is not None for p in table['team1_win_prob'])
+    print(f"Scored {scored} fixtures ({len(table['teams'])} teams, {len(table['venues'])} venues) "
+          f"in {time.perf_counter() - start:.2f}s")
+    return table
+
+if __name__ == "__main__":
+    generate_prediction_table()
@@ -0,0 +1,76 @@
+"""
+Win probabilities for upcoming fixtures from the shipped XGBoost match predictor.
+
+A fixture is team1, team2, venue, toss_winner and toss_decision ('bat' or
+'field'). Its features are built as in modeling_data.csv (see features.py),
+with the teams' current Elo ratings as the pre-match ratings. Any number of
+fixtures is scored in a single model call.
+"""
+import json
+import os
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+
+from elo import EloTracker
+from features import TEAM_ENCODER_PATH, VENUE_ENCODER_PATH, add_fixture_features, model_features
+
+MODEL_PATH = 'model_assets/xgboost_model.pkl'
+CURRENT_ELO_PATH = 'webapp/static/data/current_elo.json'
+FIXTURE_COLUMNS = ['team1', 'team2', 'venue', 'toss_winner', 'toss_decision']
+# Files MatchPredictor.load reads, relative to the project root
+PREDICTOR_INPUTS = [MODEL_PATH, TEAM_ENCODER_PATH, VENUE_ENCODER_PATH, CURRENT_ELO_PATH]
+
+class MatchPredictor:
+    def __init__(self, model, team_encoder, venue_encoder, ratings, base_rating=1500):
+        self.model = model
+        self.team_encoder = team_encoder
+        self.venue_encoder = venue_encoder
+        # Same expected-score formula (and defaults) as the ratings were produced with
+        self.elo = EloTracker(base_rating=base_rating)
+        self.elo.ratings = dict(ratings)
+        self.feature_names = model_features(model)
+        self.known_teams = set(team_encoder.classes_)
+        self.known_venues = set(venue_encoder.classes_)
+
+    @classmethod
+    def load(cls, root='.', model_path=MODEL_PATH, ratings_path=CURRENT_ELO_PATH):
+        """The shipped model and encoders with the latest Elo ratings, paths relative to the project root"""
+        with warnings.catch_warnings():
+            # The pickles come from older xgboost/scikit-learn releases and still load fine
+            warnings.simplefilter('ignore', UserWarning)
+            model = joblib.load(os.path.join(root, model_path))
+            team_encoder = joblib.load(os.path.join(root, TEAM_ENCODER_PATH))
+            venue_encoder = joblib.load(os.path.join(root, VENUE_ENCODER_PATH))
+        with open(os.path.join(root, ratings_path)) as f:
+            ratings = json.load(f)
+        return cls(model, team_encoder, venue_encoder, ratings)
+
+    def features(self, fixtures):
+        """Model feature matrix for a DataFrame with FIXTURE_COLUMNS, in the model's column order"""
+        data = pd.DataFrame(fixtures, columns=FIXTURE_COLUMNS)
+        data['rating_team1_pre'] = data['team1'].map(self.elo.ratings).fillna(self.elo.base_rating)
+        data['rating_team2_pre'] = data['team2'].map(self.elo.ratings).fillna(self.elo.base_rating)
+        data['win_prob_team1'] = self.elo.calculate_expected_score(data['rating_team1_pre'], data['rating_team2_pre'])
+        add_fixture_features(data, self.team_encoder, self.venue_encoder)
+        return data[self.feature_names]
+
+    def predict(self, fixtures):
+        """
+        DataFrame with, per fixture, the model's probability that team1 wins and
+        the Elo win probability it was given as a feature
+        """
+        features = self.features(fixtures)
+        proba = self.model.predict_proba(features)[:, 1] if len(features) else np.array([])
+        return pd.DataFrame({
+            'team1_win_prob': proba.astype(float),
+            'elo_team1_win_prob': features['win_prob_team1'].to_numpy(dtype=float)
+        })
+
+    def unseen(self, fixture):
+        """Fields of a fixture whose value the model never saw (they are encoded as -1)"""
+        fields = [f for f in ('team1', 'team2') if fixture[f] not in self.known_teams]
+        if fixture['venue'] not in self.known_venues:
+            fields.append('venue')
+        return fields
@@ -2,6 +2,10 @@ import pandas as pd
 import numpy as np
 import re
 import os
+import sys
+
+RAW_PATH = 'data/IPL.csv'
+MATCHES_PATH = 'data/IPL_matches.csv'
 
 def clean_season(season):
     if pd.isna(season):
@@ -71,12 +75,31 @@ def clean_win_outcome(outcome):
             
     return runs, wickets
 
-def process_data():
-    print("Loading data...")
-    df = pd.read_csv('data/IPL.csv', low_memory=False)
+def add_batting_order(matches, balls):
+    """
+    Add bat_first_team, chase_team, bat_first_won and toss_winner_won to the match table.
+    The first-innings batting_team in the ball data is authoritative.
+    """
+    first_innings = balls[balls['innings'] == 1].groupby('match_id')['batting_team'].first()
+    bat_first = matches['match_id'].map(first_innings)
+    
+    # Fallback from the toss when a match has no first-innings balls
+    toss_loser = matches['team1'].where(matches['toss_winner'] != matches['team1'], matches['team2'])
+    toss_bat_first = matches['toss_winner'].where(matches['toss_decision'] == 'bat', toss_loser)
+    bat_first = bat_first.fillna(toss_bat_first)
     
+    matches['bat_first_team'] = bat_first
+    matches['chase_team'] = matches['team2'].where(bat_first == matches['team1'], matches['team1'])
+    matches.loc[bat_first.isna(), 'chase_team'] = np.nan
+    matches['bat_first_won'] = matches['match_won_by'] == matches['bat_first_team']
+    matches['toss_winner_won'] = matches['match_won_by'] == matches['toss_winner']
+    return matches
+
+def clean_balls(df):
+    """Season cleaning and team/venue name standardization for raw ball-by-ball rows"""
     print("Cleaning season...")
-    df['season'] = df['season'].apply(clean_season)
+    # Parse each distinct season label once
+    df['season'] = df['season'].map({s: clean_season(s) for s in df['season'].unique()})
     
     print("Standardizing team names...")
     df = standardize_names(df)
@@ -84,9 +107,16 @@ def process_data():
     print("Standardizing venue names...")
     from utils import standardize_venues
     df = standardize_venues(df)
-    
+    return df
+
+def aggregate_matches(df):
+    """
+    One row per match from cleaned ball-by-ball rows: metadata, teams, innings
+    scores and wickets, parsed outcome and batting order.
+    Every match is aggregated from its own rows only, so any subset of matches
+    can be processed on its own.
+    """
     # Process Match Level Data
-    print("Aggregating match data...")
     match_cols = ['match_id', 'date', 'season', 'venue', 'home_team', 'away_team', 
                   'toss_winner', 'toss_decision', 'match_won_by', 
                   'win_outcome', 'result_type']
@@ -191,10 +221,79 @@ def process_data():
     # We reuse utils for this or implement here inline
     # Let's verify team names after running
     
-    # Save
-    out_path = 'data/IPL_matches.csv'
-    matches_all.to_csv(out_path, index=False)
-    print(f"Saved match-level data to {out_path}, Shape: {matches_all.shape}")
+    # Batting order from the innings-1 batting side (the toss is only a fallback
+    # for matches with no first-innings balls)
+    print("Deriving batting order...")
+    matches_all = add_batting_order(matches_all, df)
+    
+    return matches_all
+
+def read_new_rows(known_ids, path=RAW_PATH, chunksize=500_000):
+    """Raw rows of matches not in known_ids, read in chunks so the old history is never held in memory"""
+    new_rows = [chunk[~chunk['match_id'].isin(known_ids)]
+                for chunk in pd.read_csv(path, low_memory=False, chunksize=chunksize)]
+    return pd.concat(new_rows, ignore_index=True)
+
+def replace_file(write, path):
+    """Call write(temp_path), then move the result over path, so path is never left half-written"""
+    tmp = path + '.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+def process_data(append=False):
+    """
+    Rebuild data/IPL_matches.csv and the ball cache from data/IPL.csv.
+
+    With append=True only matches whose match_id is not yet in the processed
+    table are cleaned and aggregated, then merged into the existing match table
+    and ball cache (existing matches are not re-read from their raw rows).
+    Only this cleaning step is incremental: the pipeline stages after it
+    rebuild their outputs from the whole table whenever it changes.
+    """
+    from utils import to_ball_schema, load_balls, save_balls, BALLS_CACHE_PATH
+    
+    if append and not (os.path.exists(MATCHES_PATH) and os.path.exists(BALLS_CACHE_PATH)):
+        print("No processed data to append to, running a full rebuild...")
+        append = False
+    
+    print("Loading data...")
+    if append:
+        # The ball cache is written last, so it only lists matches that made it
+        # into both files
+        df = read_new_rows(set(load_balls(columns=['match_id'])['match_id'].astype(int)))
+        print(f"Found {df['match_id'].nunique()} new matches")
+        if df.empty:
+            return
+    else:
+        df = pd.read_csv(RAW_PATH, low_memory=False)
+    
+    df = clean_balls(df)
+    
+    # Typed columnar cache so downstream generators never re-parse the CSV
+    balls = to_ball_schema(df)
+    if append:
+        # Categories differ between the two parts, so re-apply the schema to the union
+        balls = to_ball_schema(pd.concat([load_balls(), balls], ignore_index=True))
+    
+    print("Aggregating match data...")
+    matches_all = aggregate_matches(df)
+    if append:
+        # Rows for these matches may already be there if a previous run stopped
+        # before writing the ball cache; the fresh ones replace them
+        previous = pd.read_csv(MATCHES_PATH)
+        previous_rows = previous[~previous['match_id'].isin(matches_all['match_id'])]
+        matches_all = pd.concat([previous_rows, matches_all], ignore_index=True).sort_values('match_id', kind='mergesort')
+        matches_all.fillna({'first_innings_runs': 0, 'second_innings_runs': 0,
+                            'first_innings_wickets': 0, 'second_innings_wickets': 0}, inplace=True)
+    
+    # Match table first, then the ball cache: append mode takes the matches it
+    # already has from the cache, so a run that stops in between is redone
+    replace_file(lambda path: matches_all.to_csv(path, index=False), MATCHES_PATH)
+    print(f"Saved match-level data to {MATCHES_PATH}, Shape: {matches_all.shape}")
+    
+    print("Writing ball cache...")
+    replace_file(lambda path: save_balls(balls, path), BALLS_CACHE_PATH)
+    print(f"Saved ball-by-ball cache to {BALLS_CACHE_PATH}, Shape: {balls.shape}")
 
 if __name__ == "__main__":
-    process_data()
+    process_data(append='--append' in sys.argv)
@@ -0,0 +1,128 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+PROFILE_PATH = 'pipeline_profile.json'
+CPROFILE_DIR = 'profiles'
+
+def reset_peak_rss():
+    """
+    Reset this process's resident-memory high-water mark, so peak_rss_mb covers
+    only what runs after it. Linux resets VmHWM when 5 is written to
+    /proc/self/clear_refs; returns False where that is not possible.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """
+    High-water mark of this process's resident memory in MB: since the last
+    reset_peak_rss on Linux, otherwise since the process started (None where
+    neither is available).
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 2 ** 10, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+def path_bytes(paths):
+    """
+    Total size of the given files, walking directories. Precompressed .gz/.br
+    copies and dotfiles in those directories are not counted, as they are
+    written after the stage (see compress_data.py) rather than by it.
+    """
+    total = 0
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                total += sum(os.path.getsize(os.path.join(root, f)) for f in files
+                             if not f.startswith('.') and not f.endswith(('.gz', '.br')))
+        elif os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+@contextmanager
+def profile_stage(name, detailed=False, cprofile_dir=CPROFILE_DIR):
+    """
+    Measure the wrapped block: wall and CPU seconds and its peak RSS. The peak
+    is reset when the block starts where the OS allows it (peak_rss_scope
+    'stage'); elsewhere it is the process's peak so far ('process'), which for
+    in-process runs includes every earlier stage. With detailed=True, also the tracemalloc peak of allocations made inside the
+    block and a cProfile dump at cprofile_dir/<name>.prof (both slow the block down).
+    Yields the metrics dict, which is filled in when the block exits.
+    """
+    metrics = {}
+    profiler = None
+    if detailed:
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    reset = reset_peak_rss()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield metrics
+    finally:
+        metrics['wall_s'] = round(time.perf_counter() - wall, 3)
+        metrics['cpu_s'] = round(time.process_time() - cpu, 3)
+        if detailed:
+            profiler.disable()
+            metrics['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            tracemalloc.stop()
+            os.makedirs(cprofile_dir, exist_ok=True)
+            metrics['cprofile'] = os.path.join(cprofile_dir, f'{name}.prof')
+            profiler.dump_stats(metrics['cprofile'])
+        metrics['peak_rss_mb'] = peak_rss_mb()
+        metrics['peak_rss_scope'] = 'stage' if reset else 'process'
+        metrics['pid'] = os.getpid()
+
+def write_profile(stages, path=PROFILE_PATH, **run_info):
+    """
+    Save per-stage metrics with run_info (jobs, total time, ...). Each stage also
+    records its wall time from the previous profile, so regressions show up
+    between data refreshes. Returns the report.
+    """
+    previous = {}
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                previous = json.load(f).get('stages', {})
+        except (json.JSONDecodeError, AttributeError):
+            previous = {}
+
+    for name, metrics in stages.items():
+        # Cached stages carry the last measured time forward
+        last = previous.get(name, {})
+        last_wall = last.get('wall_s', last.get('previous_wall_s'))
+        if last_wall is not None:
+            metrics['previous_wall_s'] = last_wall
+
+    report = {
+        'generated_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        **run_info,
+        'stages': stages
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
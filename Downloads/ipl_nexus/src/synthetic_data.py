@@ -0,0 +1,305 @@
+"""
+Deterministic synthetic ball-by-ball data in the raw data/IPL.csv layout, for
+benchmarking and testing the generators without the real dataset.
+
+Run from the project root:
+    python -m src.synthetic_data                   # 1x: ~1,100 matches -> data/synthetic/IPL_x1.csv
+    python -m src.synthetic_data --scale 10        # 10x the matches and 10x the players
+    python -m src.synthetic_data --scale 100 --player-scale 1 --output /tmp/IPL.csv
+
+The league follows the real one's shape: seasons 2008-2025 with 8 and later 10
+franchises, old team names, season labels like "2007/08" and venue spellings
+that process_data.py has to clean up. Every match is simulated delivery by
+delivery (extras, wickets, strike rotation, chases stopping at the target) with
+all innings of a chunk of matches drawn at once as numpy arrays. The same
+arguments and seed always produce the same file.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from utils import BALL_SCHEMA
+
+COLUMNS = list(BALL_SCHEMA)
+OUTPUT_DIR = 'data/synthetic'
+FIRST_MATCH_ID = 335982
+
+SEASONS = range(2008, 2026)
+# Season labels as they appear in the raw data
+SEASON_LABELS = {2008: '2007/08', 2010: '2009/10', 2021: '2020/21'}
+# Matches per season at scale 1 with 8 and with 10 teams (league games plus playoffs)
+MATCHES_PER_SEASON = {8: 60, 10: 74}
+
+# (first season, name) per franchise, then its home venue as spelled in the raw data
+FRANCHISES = [
+    ([(2008, 'Chennai Super Kings')], ['MA Chidambaram Stadium, Chepauk', 'MA Chidambaram Stadium, Chepauk, Chennai']),
+    ([(2008, 'Mumbai Indians')], ['Wankhede Stadium', 'Wankhede Stadium, Mumbai']),
+    ([(2008, 'Kolkata Knight Riders')], ['Eden Gardens', 'Eden Gardens, Kolkata']),
+    ([(2008, 'Rajasthan Royals')], ['Sawai Mansingh Stadium', 'Sawai Mansingh Stadium, Jaipur']),
+    ([(2008, 'Royal Challengers Bangalore'), (2024, 'Royal Challengers Bengaluru')],
+     ['M Chinnaswamy Stadium', 'M.Chinnaswamy Stadium', 'M Chinnaswamy Stadium, Bengaluru']),
+    ([(2008, 'Delhi Daredevils'), (2019, 'Delhi Capitals')], ['Feroz Shah Kotla', 'Arun Jaitley Stadium, Delhi']),
+    ([(2008, 'Kings XI Punjab'), (2021, 'Punjab Kings')],
+     ['Punjab Cricket Association Stadium, Mohali', 'Punjab Cricket Association IS Bindra Stadium, Mohali']),
+    ([(2008, 'Deccan Chargers'), (2013, 'Sunrisers Hyderabad')],
+     ['Rajiv Gandhi International Stadium, Uppal', 'Rajiv Gandhi International Stadium, Uppal, Hyderabad']),
+    ([(2022, 'Gujarat Titans')], ['Narendra Modi Stadium, Ahmedabad']),
+    ([(2022, 'Lucknow Super Giants')], ['Bharat Ratna Shri Atal Bihari Vajpayee Ekana Cricket Stadium, Lucknow']),
+]
+PLAYERS_PER_TEAM = 25
+PLAYING_XI = 11
+BOWLERS = 5 # The last five of the XI share the overs, four each
+
+# Delivery outcome probabilities
+EXTRA_TYPES = np.array([None, 'wides', 'noballs', 'legbyes', 'byes'], dtype=object)
+EXTRA_PROBS = [0.945, 0.03, 0.005, 0.015, 0.005]
+BAT_RUNS = [0, 1, 2, 3, 4, 6]
+BAT_RUN_PROBS = [0.38, 0.34, 0.08, 0.005, 0.125, 0.07]
+BYE_RUNS = [1, 2, 4]
+BYE_RUN_PROBS = [0.75, 0.15, 0.1]
+WICKET_PROB = 0.05
+WICKET_KINDS = np.array(['caught', 'bowled', 'lbw', 'run out', 'stumped', 'caught and bowled'], dtype=object)
+WICKET_KIND_PROBS = [0.58, 0.17, 0.1, 0.08, 0.03, 0.04]
+NO_RESULT_PROB = 0.015
+
+MAX_LEGAL_BALLS = 120
+MAX_DELIVERIES = 140 # Room per innings for 120 legal balls plus extras
+CHUNK_MATCHES = 2000 # Matches simulated and written at a time, bounding memory at large scales
+
+def season_label(year):
+    return SEASON_LABELS.get(year, str(year))
+
+def franchise_name(franchise, year):
+    """Name a franchise played under in the given season"""
+    names, _ = FRANCHISES[franchise]
+    return [name for first, name in names if first <= year][-1]
+
+def player_names(player_scale=1):
+    """Player name per global player id: franchise * pool size + index in its squad"""
+    pool = PLAYERS_PER_TEAM * player_scale
+    names = []
+    for names_by_season, _ in FRANCHISES:
+        prefix = ''.join(word[0] for word in names_by_season[-1][1].split())
+        names.extend(f'{prefix} Player {i + 1}' for i in range(pool))
+    return np.array(names, dtype=object)
+
+def schedule(scale, rng):
+    """
+    One row per match: match_id, date, season label and year, the two franchises
+    (team1 is at home) and the raw venue name.
+    """
+    frames = []
+    for year in SEASONS:
+        active = [i for i in range(len(FRANCHISES)) if FRANCHISES[i][0][0][0] <= year]
+        n = int(round(MATCHES_PER_SEASON[len(active)] * scale))
+        # Random fixtures between two different active franchises
+        first = rng.integers(len(active), size=n)
+        second = (first + rng.integers(1, len(active), size=n)) % len(active)
+        team1, team2 = np.array(active)[first], np.array(active)[second]
+        # Several matches a day across a two-month season
+        days = np.arange(n) * 60 // max(n, 1)
+        venues = [FRANCHISES[t][1][v % len(FRANCHISES[t][1])]
+                  for t, v in zip(team1, rng.integers(0, 6, size=n))]
+        frames.append(pd.DataFrame({
+            'date': (pd.Timestamp(f'{year}-03-25') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'),
+            'season': season_label(year),
+            'year': year,
+            'team1': team1,
+            'team2': team2,
+            'venue': venues
+        }))
+    fixtures = pd.concat(frames, ignore_index=True)
+    fixtures.insert(0, 'match_id', np.arange(FIRST_MATCH_ID, FIRST_MATCH_ID + len(fixtures)))
+    return fixtures
+
+def simulate_innings(rng, targets, legal_limits):
+    """
+    Deliveries for len(targets) innings at once, as (innings, MAX_DELIVERIES)
+    arrays. An innings ends after legal_limits legal balls, ten wickets or once
+    its runs pass the target (inf for a first innings); 'bowled' marks the
+    deliveries that happened.
+    Batters are batting-order positions (0-10) and bowlers indexes 0-4.
+    """
+    n, d = len(targets), MAX_DELIVERIES
+    extra = rng.choice(len(EXTRA_TYPES), size=(n, d), p=EXTRA_PROBS)
+    bat_runs = np.where((extra == 0) | (extra == 2), rng.choice(BAT_RUNS, size=(n, d), p=BAT_RUN_PROBS), 0)
+    extra_runs = np.select(
+        [extra == 1, extra == 2, extra >= 3],
+        [np.where(rng.random((n, d)) < 0.05, 5, 1), 1, rng.choice(BYE_RUNS, size=(n, d), p=BYE_RUN_PROBS)], 0)
+    wicket = (extra == 0) & (rng.random((n, d)) < WICKET_PROB)
+    bat_runs[wicket] = 0
+    runs = bat_runs + extra_runs
+    legal = (extra == 0) | (extra >= 3)
+
+    # Everything before a delivery decides whether it is bowled, so 'bowled' is a prefix of each row
+    legal_before = np.cumsum(legal, axis=1) - legal
+    wickets_after = np.cumsum(wicket, axis=1)
+    runs_before = np.cumsum(runs, axis=1) - runs
+    bowled = ((legal_before < np.asarray(legal_limits)[:, None]) & (wickets_after - wicket < 10)
+              & (runs_before <= np.asarray(targets)[:, None]))
+
+    over = legal_before // 6
+    idx = np.arange(d)
+    over_start = np.where(np.diff(over, axis=1, prepend=-1) != 0, idx, 0)
+    ball = idx - np.maximum.accumulate(over_start, axis=1) + 1
+
+    # Batters swap ends on an odd number of runs taken and at the end of each over
+    taken = bat_runs + np.where(extra >= 3, extra_runs, extra_runs - 1).clip(min=0) * (extra != 0)
+    swap = (taken % 2 == 1) ^ (legal & (legal_before % 6 == 5))
+    striker_end = (np.cumsum(swap, axis=1) - swap) % 2
+
+    # The striker is the one out; the next batter in the order takes their end
+    ends = []
+    for end in (0, 1):
+        arrivals = np.full((n, d + 1), -1)
+        arrivals[:, 0] = end
+        arrivals[:, 1:] = np.where(wicket & (striker_end == end), wickets_after + 1, -1)
+        ends.append(np.maximum.accumulate(arrivals, axis=1)[:, :d])
+    batter = np.where(striker_end == 0, ends[0], ends[1])
+    non_striker = np.where(striker_end == 0, ends[1], ends[0])
+
+    return {
+        'bowled': bowled, 'over': over, 'ball': ball, 'batter': batter, 'non_striker': non_striker,
+        'bowler': over % BOWLERS, 'extra': extra, 'runs_batter': bat_runs, 'runs_extras': extra_runs,
+        'runs_total': runs, 'wicket': wicket
+    }
+
+def simulate_matches(fixtures, player_scale, rng, names):
+    """Ball-by-ball rows in the raw IPL.csv layout for the given fixtures"""
+    m = len(fixtures)
+    pool = PLAYERS_PER_TEAM * player_scale
+    years = fixtures['year'].to_numpy()
+    team1, team2 = fixtures['team1'].to_numpy(), fixtures['team2'].to_numpy()
+
+    toss_winner = np.where(rng.random(m) < 0.5, team1, team2)
+    toss_decision = np.where(rng.random(m) < 0.45, 'bat', 'field')
+    toss_loser = np.where(toss_winner == team1, team2, team1)
+    bat_first = np.where(toss_decision == 'bat', toss_winner, toss_loser)
+    chasing = np.where(toss_decision == 'bat', toss_loser, toss_winner)
+    no_result = rng.random(m) < NO_RESULT_PROB
+
+    # Playing XI per match and side: a random 11 from the franchise's squad, in batting order
+    def playing_xi(franchise):
+        picks = rng.random((m, pool)).argpartition(PLAYING_XI - 1, axis=1)[:, :PLAYING_XI]
+        return franchise[:, None] * pool + picks
+    xi = {1: playing_xi(bat_first), 2: playing_xi(chasing)}
+
+    first = simulate_innings(rng, np.full(m, np.inf), np.full(m, MAX_LEGAL_BALLS))
+    totals = (first['runs_total'] * first['bowled']).sum(axis=1)
+    # Rain: a no-result chase is cut off somewhere in its first ten overs
+    second = simulate_innings(rng, totals, np.where(no_result, rng.integers(0, 60, size=m), MAX_LEGAL_BALLS))
+
+    chase_totals = (second['runs_total'] * second['bowled']).sum(axis=1)
+    chase_wickets = (second['wicket'] & second['bowled']).sum(axis=1)
+    tie = (chase_totals == totals) & ~no_result
+    winner = np.where(chase_totals > totals, chasing, bat_first)
+    # Ties go to a super over, decided here by coin toss
+    winner = np.where(tie, np.where(rng.random(m) < 0.5, bat_first, chasing), winner)
+    win_outcome = np.where(chase_totals > totals,
+                           pd.Series(10 - chase_wickets).astype(str).to_numpy() + ' wickets',
+                           pd.Series(totals - chase_totals).astype(str).to_numpy() + ' runs').astype(object)
+    win_outcome[tie | no_result] = None
+    result_type = np.full(m, None, dtype=object)
+    result_type[tie] = 'tie'
+    result_type[no_result] = 'no result'
+
+    # Team names by season, 'Unknown' winner for no results as in the raw data
+    team_names = {}
+    def team_name(franchises):
+        for key in set(zip(franchises, years)) - team_names.keys():
+            team_names[key] = franchise_name(*key)
+        return np.array([team_names[key] for key in zip(franchises, years)], dtype=object)
+    winner_name = team_name(winner)
+    winner_name[no_result] = 'Unknown'
+
+    frames = []
+    for innings, sim, batting, bowling in ((1, first, bat_first, chasing), (2, second, chasing, bat_first)):
+        rows, deliveries = np.nonzero(sim['bowled'])
+        at = (rows, deliveries)
+        bat_xi, bowl_xi = xi[innings], xi[3 - innings]
+        wicket = sim['wicket'][at]
+        batter = names[bat_xi[rows, sim['batter'][at]]]
+        frames.append(pd.DataFrame({
+            'match_id': fixtures['match_id'].to_numpy()[rows],
+            'date': fixtures['date'].to_numpy()[rows],
+            'season': fixtures['season'].to_numpy()[rows],
+            'venue': fixtures['venue'].to_numpy()[rows],
+            'innings': innings,
+            'over': sim['over'][at],
+            'ball': sim['ball'][at],
+            'batting_team': team_name(batting)[rows],
+            'bowling_team': team_name(bowling)[rows],
+            'batter': batter,
+            'bowler': names[bowl_xi[rows, PLAYING_XI - BOWLERS + sim['bowler'][at]]],
+            'non_striker': names[bat_xi[rows, sim['non_striker'][at]]],
+            'runs_batter': sim['runs_batter'][at],
+            'runs_extras': sim['runs_extras'][at],
+            'runs_total': sim['runs_total'][at],
+            'extra_type': EXTRA_TYPES[sim['extra'][at]],
+            'wicket_kind': np.where(wicket, rng.choice(WICKET_KINDS, size=len(rows), p=WICKET_KIND_PROBS), None),
+            'player_out': np.where(wicket, batter, None),
+            'toss_winner': team_name(toss_winner)[rows],
+            'toss_decision': toss_decision[rows],
+            'match_won_by': winner_name[rows],
+            'win_outcome': win_outcome[rows],
+            'result_type': result_type[rows],
+            '_delivery': deliveries
+        }))
+
+    balls = pd.concat(frames, ignore_index=True)
+    balls = balls.sort_values(['match_id', 'innings', '_delivery'], kind='mergesort')
+    return balls[COLUMNS]
+
+def generate(path, scale=1, player_scale=None, seed=0, chunk_matches=CHUNK_MATCHES):
+    """
+    Write a synthetic IPL.csv to path with scale times the matches of a real
+    league history and player_scale (default: scale, at least 1) times the
+    players per squad. Returns (matches, rows) written.
+    """
+    if player_scale is None:
+        player_scale = max(int(scale), 1)
+    if scale <= 0 or player_scale < 1:
+        raise ValueError("scale must be positive and player_scale at least 1")
+
+    rng = np.random.default_rng(seed)
+    fixtures = schedule(scale, rng)
+    names = player_names(player_scale)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rows = 0
+    for start in range(0, len(fixtures), chunk_matches):
+        balls = simulate_matches(fixtures.iloc[start:start + chunk_matches], player_scale, rng, names)
+        balls.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+        rows += len(balls)
+    return len(fixtures), rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic ball-by-ball IPL data")
+    parser.add_argument('--scale', type=float, default=1,
+                        help="multiple of a real league history's matches, e.g. 1, 10 or 100")
+    parser.add_argument('--player-scale', type=int, default=None,
+                        help="multiple of the players per squad (default: same as --scale)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+                        help=f"CSV to write (default: {OUTPUT_DIR}/IPL_x<scale>.csv)")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(OUTPUT_DIR, f'IPL_x{args.scale:g}.csv')
+    player_scale = args.player_scale or max(int(args.scale), 1)
+
+    start = time.perf_counter()
+    matches, rows = generate(output, scale=args.scale, player_scale=player_scale, seed=args.seed)
+    print(f"Wrote {matches} matches ({rows} deliveries, {PLAYERS_PER_TEAM * player_scale} players per squad) "
+          f"to {output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+from pyarrow import feather
 
 def load_data(data_path='../data/IPL_matches.csv'):
     """
@@ -23,6 +24,96 @@ def load_data(data_path='../data/IPL_matches.csv'):
         
     return df
 
+# Columnar cache of the cleaned ball-by-ball data, written by process_data.py
+BALLS_CACHE_PATH = 'data/IPL_balls.feather'
+
+# Player and team columns each share one category set so they can be compared
+# directly (e.g. player_out == batter, toss_winner == match_won_by)
+PLAYER_COLUMNS = ['batter', 'bowler', 'non_striker', 'player_out']
+TEAM_COLUMNS = ['batting_team', 'bowling_team', 'toss_winner', 'match_won_by']
+
+# wicket_kind values where the batter leaves without being dismissed
+RETIRED_NOT_OUT = ['retired hurt', 'retired not out']
+
+BALL_SCHEMA = {
+    'match_id': 'int32',
+    'date': 'datetime64[ns]',
+    'season': 'int16',
+    'venue': 'category',
+    'innings': 'int8',
+    'over': 'int8',
+    'ball': 'float32',
+    'batting_team': 'category',
+    'bowling_team': 'category',
+    'batter': 'category',
+    'bowler': 'category',
+    'non_striker': 'category',
+    'runs_batter': 'int8',
+    'runs_extras': 'int8',
+    'runs_total': 'int8',
+    'extra_type': 'category',
+    'wicket_kind': 'category',
+    'player_out': 'category',
+    'toss_winner': 'category',
+    'toss_decision': 'category',
+    'match_won_by': 'category',
+    'win_outcome': 'category',
+    'result_type': 'category',
+}
+
+def to_ball_schema(df):
+    """
+    Coerce cleaned ball-by-ball data to the fixed BALL_SCHEMA.
+    Columns missing from the source are added as empty so the layout never changes.
+    """
+    df = df.reindex(columns=list(BALL_SCHEMA))
+
+    for col, dtype in BALL_SCHEMA.items():
+        if dtype.startswith('int'):
+            df[col] = df[col].fillna(0).astype(dtype)
+        elif dtype.startswith('float'):
+            df[col] = df[col].astype(dtype)
+        elif dtype.startswith('datetime'):
+            df[col] = pd.to_datetime(df[col])
+
+    for group in (PLAYER_COLUMNS, TEAM_COLUMNS):
+        values = pd.concat([df[c] for c in group]).dropna().astype(str).unique()
+        shared = pd.CategoricalDtype(sorted(values))
+        for col in group:
+            df[col] = df[col].astype(shared)
+
+    for col, dtype in BALL_SCHEMA.items():
+        if dtype == 'category' and col not in PLAYER_COLUMNS + TEAM_COLUMNS:
+            df[col] = df[col].astype('category')
+
+    return df
+
+def save_balls(balls, path=BALLS_CACHE_PATH):
+    """
+    Write the ball cache uncompressed and as a single record batch, the layout
+    load_balls needs to map it without copying.
+    """
+    balls.to_feather(path, compression='uncompressed', chunksize=max(len(balls), 1))
+
+def load_balls(path=BALLS_CACHE_PATH, columns=None):
+    """
+    Load the typed ball-by-ball cache written by process_data.py.
+    Pass columns to read only the fields a generator needs.
+
+    The file is memory-mapped and converted without copying: split_blocks keeps
+    one pandas block per column, so numeric columns and category codes are
+    read-only views of the mapped pages (only category codes with nulls, and
+    the category labels, are copied). Parallel pipeline workers therefore share
+    one copy of the cache through the OS page cache. This relies on the layout
+    save_balls writes; an older multi-batch file still loads, but each worker
+    then holds its own copy.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Ball cache not found at {path}, please run process_data.py first.")
+
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
 def standardize_teams(df):
     """
     Standardize team names (e.g., 'Rising Pune Supergiant' variations).
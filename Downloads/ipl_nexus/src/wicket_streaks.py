@@ -0,0 +1,116 @@
+import pandas as pd
+import numpy as np
+
+# Dismissals that are not credited to the bowler
+NON_BOWLER_WICKETS = ['run out', 'retired hurt', 'retired out', 'obstructing the field']
+
+def bowler_wickets(balls):
+    """Boolean mask of deliveries where the bowler took a wicket"""
+    return balls['wicket_kind'].notna() & ~balls['wicket_kind'].isin(NON_BOWLER_WICKETS)
+
+def find_wicket_streaks(balls):
+    """
+    Runs of consecutive wickets in each bowler's sequence of deliveries in a match.
+    Wides and no-balls are skipped unless the bowler took a wicket off them, so a
+    streak can carry across overs. Returns one row per streak of 2+ wickets.
+    """
+    cols = ['match_id', 'innings', 'over', 'ball', 'bowler', 'extra_type', 'wicket_kind', 'player_out']
+    b = balls.loc[balls['innings'].isin([1, 2]), cols].copy()
+    b['position'] = np.arange(len(b))
+    b = b.sort_values(['match_id', 'bowler', 'innings', 'over', 'ball', 'position'], kind='mergesort')
+
+    b['is_wicket'] = bowler_wickets(b)
+    legal = ~b['extra_type'].isin(['wides', 'noballs'])
+    b = b[legal | b['is_wicket']]
+
+    # A streak starts on a wicket whose previous delivery (same bowler, same match) was not one
+    same_spell = (b['match_id'] == b['match_id'].shift()) & (b['bowler'] == b['bowler'].shift())
+    prev_wicket = b['is_wicket'].shift(fill_value=False) & same_spell
+    b['streak'] = (b['is_wicket'] & ~prev_wicket).cumsum()
+
+    streaks = b[b['is_wicket']].groupby('streak').agg(
+        match_id=('match_id', 'first'),
+        bowler=('bowler', 'first'),
+        innings=('innings', 'first'),
+        over=('over', 'first'),
+        last_over=('over', 'last'),
+        wickets=('is_wicket', 'size'),
+        victims=('player_out', lambda p: [str(v) for v in p.dropna()])
+    )
+    return streaks[streaks['wickets'] >= 2].reset_index(drop=True)
+
+def find_consecutive_over_wickets(balls, min_overs=3):
+    """Spells where a bowler took a wicket in each of at least min_overs successive overs they bowled"""
+    b = balls.loc[balls['innings'].isin([1, 2]), ['match_id', 'innings', 'over', 'bowler', 'wicket_kind']]
+    b = b.assign(is_wicket=bowler_wickets(b))
+    overs = b.groupby(['match_id', 'bowler', 'innings', 'over'], observed=True, sort=True)['is_wicket'].sum().reset_index()
+
+    # Same shifted comparison as the ball streaks, one level up: a bowler's overs in a match
+    same_spell = (overs['match_id'] == overs['match_id'].shift()) & (overs['bowler'] == overs['bowler'].shift())
+    took_wicket = overs['is_wicket'] > 0
+    overs['streak'] = (took_wicket & ~(took_wicket.shift(fill_value=False) & same_spell)).cumsum()
+
+    runs = overs[took_wicket].groupby('streak').agg(
+        match_id=('match_id', 'first'),
+        bowler=('bowler', 'first'),
+        overs=('over', 'size'),
+        wickets=('is_wicket', 'sum'),
+        first_over=('over', 'first'),
+        last_over=('over', 'last')
+    )
+    return runs[runs['overs'] >= min_overs].reset_index(drop=True)
+
+def wicket_streak_records(balls, matches, limit=50):
+    """
+    JSON-ready hat tricks, four-in-fours and wickets-in-consecutive-overs spells.
+    matches supplies season, teams and venue for each match_id.
+    """
+    matches_by_id = matches.set_index('match_id')[['season', 'team1', 'team2', 'venue']].to_dict('index')
+
+    def base_record(row):
+        info = matches_by_id.get(row['match_id'])
+        if info is None:
+            return None
+        return {
+            'bowler': str(row['bowler']),
+            'season': int(info['season']),
+            'match': f"{info['team1']} vs {info['team2']}",
+            'venue': info['venue']
+        }
+
+    # Overs are stored from 0, so add 1 for display
+    streaks = find_wicket_streaks(balls)
+    hat_tricks = []
+    for row in streaks[streaks['wickets'] >= 3].to_dict('records'):
+        record = base_record(row)
+        if record is None:
+            continue
+        record.update(
+            victims=row['victims'],
+            wickets=int(row['wickets']),
+            innings=int(row['innings']),
+            over=int(row['over']) + 1,
+            spans_overs=bool(row['last_over'] != row['over'])
+        )
+        hat_tricks.append(record)
+
+    over_runs = find_consecutive_over_wickets(balls)
+    over_runs = over_runs.sort_values(['overs', 'wickets'], ascending=False, kind='mergesort').head(limit)
+    consecutive_overs = []
+    for row in over_runs.to_dict('records'):
+        record = base_record(row)
+        if record is None:
+            continue
+        record.update(
+            overs=int(row['overs']),
+            wickets=int(row['wickets']),
+            first_over=int(row['first_over']) + 1,
+            last_over=int(row['last_over']) + 1
+        )
+        consecutive_overs.append(record)
+
+    return {
+        'hat_tricks': hat_tricks,
+        'four_in_four': [r for r in hat_tricks if r['wickets'] >= 4],
+        'wickets_in_consecutive_overs': consecutive_overs
+    }
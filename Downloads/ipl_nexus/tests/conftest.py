@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# Modules under test import their helpers as top-level modules (from utils import ...)
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from synthetic_data import generate
+
+@pytest.fixture(scope='session')
+def synthetic_csv(tmp_path_factory):
+    """A small synthetic data/IPL.csv (~60 matches over every season), generated once per session"""
+    path = tmp_path_factory.mktemp('synthetic') / 'IPL.csv'
+    generate(str(path), scale=0.05)
+    return path
+
+@pytest.fixture(scope='session')
+def synthetic_frames(synthetic_csv, tmp_path_factory):
+    """(matches, balls) processed from synthetic_csv, as the pipeline loads them"""
+    import pandas as pd
+    from process_data import process_data, MATCHES_PATH
+    from utils import load_balls
+
+    project = tmp_path_factory.mktemp('processed')
+    (project / 'data').mkdir()
+    os.symlink(synthetic_csv, project / 'data' / 'IPL.csv')
+    cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        process_data()
+        return pd.read_csv(MATCHES_PATH), load_balls()
+    finally:
+        os.chdir(cwd)
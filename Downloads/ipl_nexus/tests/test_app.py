@@ -0,0 +1,164 @@
+"""
+The /data/ route: content-hashed URLs, ETag revalidation and precompressed
+copies, on a data directory built by the pipeline's own manifest and
+compression steps.
+"""
+import gzip
+import importlib
+import json
+import os
+import sys
+
+import flask
+import pytest
+
+try:
+    import brotli
+except ImportError: # Only .gz copies are written without it
+    brotli = None
+
+from compress_data import precompress
+from data_manifest import build_manifest, write_manifest
+
+WEBAPP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'webapp')
+BEST = 'br' if brotli else 'gzip'
+
+@pytest.fixture(scope='module')
+def app_module():
+    # Imported the way gunicorn does (--chdir webapp app:app), so Flask finds its root
+    if WEBAPP_DIR not in sys.path:
+        sys.path.insert(0, WEBAPP_DIR)
+    return importlib.import_module('app')
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    (tmp_path / 'templates').mkdir()
+    (tmp_path / 'templates' / 'teams.html').write_text("fetch('{{ data_url(\"team_matches.json\") }}')")
+    return str(tmp_path / 'templates')
+
+@pytest.fixture
+def data_dir(app_module, tmp_path, templates_dir, monkeypatch):
+    """A data directory with one compressible page file, its manifest and its .gz/.br copies"""
+    data = tmp_path / 'data'
+    data.mkdir()
+    (data / 'team_matches.json').write_text(json.dumps([{'match_id': i, 'team': 'A'} for i in range(200)]))
+    write_manifest(str(data), templates_dir)
+    precompress(str(data))
+    monkeypatch.setattr(app_module, 'DATA_DIR', str(data))
+    monkeypatch.setattr(app_module, 'MANIFEST_PATH', str(data / 'manifest.json'))
+    monkeypatch.setattr(app_module, 'COMPRESSED_RECORD_PATH', str(data / '.compressed.json'))
+    monkeypatch.setattr(app_module, '_manifest', {'mtime_ns': None, 'files': {}})
+    monkeypatch.setattr(app_module, '_compressed', {'mtime_ns': None, 'files': {}})
+    return data
+
+@pytest.fixture
+def client(app_module, data_dir):
+    return app_module.app.test_client()
+
+def hashed_url(app_module):
+    with app_module.app.test_request_context():
+        return flask.render_template_string('{{ data_url("team_matches.json") }}')
+
+def test_encoding_negotiation(client, data_dir):
+    plain = (data_dir / 'team_matches.json').read_bytes()
+    cases = [('gzip', 'gzip', gzip.decompress), ('', None, bytes)]
+    if brotli:
+        cases.append(('gzip, deflate, br', 'br', brotli.decompress))
+    for accept, encoding, decode in cases:
+        response = client.get('/data/team_matches.json', headers={'Accept-Encoding': accept})
+        assert response.status_code == 200
+        assert response.headers.get('Content-Encoding') == encoding
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert decode(response.get_data()) == plain
+
+def test_etag_revalidation(client):
+    for accept in ('br', 'gzip', ''):
+        headers = {'Accept-Encoding': accept}
+        etag = client.get('/data/team_matches.json', headers=headers).headers['ETag']
+        response = client.get('/data/team_matches.json', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert 'no-cache' in response.headers['Cache-Control']
+
+def test_hashed_urls(app_module, client, data_dir, templates_dir):
+    url = hashed_url(app_module)
+    assert url != '/data/team_matches.json'
+    response = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == BEST
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'max-age=31536000' in response.headers['Cache-Control']
+
+    # A page from before a rebuild is sent to the current name
+    (data_dir / 'team_matches.json').write_text('[]' * 1000)
+    write_manifest(str(data_dir), templates_dir)
+    response = client.get(url)
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(hashed_url(app_module))
+    assert hashed_url(app_module) != url
+
+def test_rewritten_file_is_never_served_stale(app_module, client, data_dir):
+    path = data_dir / 'team_matches.json'
+    # Same bytes rewritten (e.g. by a stage): the copies still match
+    path.write_bytes(path.read_bytes())
+    response = client.get('/data/team_matches.json', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == BEST
+    assert precompress(str(data_dir)) == (0, 0)
+
+    # New content before the pipeline has caught up: plain file, plain name
+    path.write_text('[1]' * 1000)
+    response = client.get('/data/team_matches.json', headers={'Accept-Encoding': 'gzip, br'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == path.read_bytes()
+    assert hashed_url(app_module) == '/data/team_matches.json'
+
+def test_manifest_and_copies_untouched_by_a_noop_build(data_dir, templates_dir):
+    mtimes = {name: os.stat(data_dir / name).st_mtime_ns
+              for name in ('manifest.json', '.compressed.json', 'team_matches.json.gz')}
+    write_manifest(str(data_dir), templates_dir)
+    assert precompress(str(data_dir)) == (0, 0)
+    assert {name: os.stat(data_dir / name).st_mtime_ns for name in mtimes} == mtimes
+
+def test_manifest_lists_page_files_only(tmp_path):
+    (tmp_path / 'templates').mkdir()
+    (tmp_path / 'templates' / 'stats.html').write_text(
+        "fetch('{{ data_url(\"stats/team_records.json\") }}'); fetch(\"{{ data_url('overview.json') }}\")"
+        "fetch('{{ data_url(\"missing.json\") }}')")
+    data = tmp_path / 'data'
+    (data / 'stats').mkdir(parents=True)
+    (data / 'matchups').mkdir()
+    for name in ('stats/team_records.json', 'overview.json', 'team_matches.json', 'matchups/V Kohli.json'):
+        (data / name).write_text('{}')
+
+    manifest = build_manifest(str(data), str(tmp_path / 'templates'))
+    assert sorted(manifest) == ['overview.json', 'stats/team_records.json']
+    assert manifest['overview.json'].startswith('overview.') and manifest['overview.json'].endswith('.json')
+
+@pytest.fixture
+def real_client(app_module):
+    """The app on the data and model assets checked into the repo"""
+    return app_module.app.test_client()
+
+def test_team_matches_paging_must_be_integers(real_client):
+    team = real_client.get('/api/teams').get_json()['teams'][0]
+    assert real_client.get(f'/api/teams/{team}/matches?page=2').status_code == 200
+    for query in ('page=abc', 'page=1.5', 'per_page=ten', 'page=0'):
+        response = real_client.get(f'/api/teams/{team}/matches?{query}')
+        assert response.status_code == 400, query
+
+def test_predict_refuses_unknown_teams(real_client):
+    fixture = {'team1': 'Mumbai Indians', 'team2': 'Chennai Super Kings', 'venue': 'Wankhede Stadium',
+               'toss_winner': 'Mumbai Indians', 'toss_decision': 'bat'}
+    response = real_client.get('/api/predict', query_string=fixture)
+    if response.status_code == 503:
+        pytest.skip(response.get_json()['error'])
+    assert response.status_code == 200
+    assert 0 < response.get_json()['predictions'][0]['team1_win_prob'] < 1
+
+    response = real_client.get('/api/predict', query_string={**fixture, 'team1': 'Foo', 'toss_winner': 'Foo'})
+    assert response.status_code == 400
+    assert 'Foo' in response.get_json()['error']
+
+    # A new venue is still scored, and flagged
+    response = real_client.get('/api/predict', query_string={**fixture, 'venue': 'Nowhere Park'})
+    assert response.status_code == 200
+    assert response.get_json()['predictions'][0]['unseen'] == ['venue']
@@ -0,0 +1,72 @@
+"""When a pipeline stage's build fingerprint changes, and when it must not"""
+import os
+
+import pytest
+
+import build_cache
+from build_cache import BuildCache
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Stage modules (stage imports helper) and one input and output file"""
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'stage.py').write_text('from helper import f\nimport pandas as pd\n')
+    (src / 'helper.py').write_text('def f():\n    return 1\n')
+    monkeypatch.setattr(build_cache, 'SRC_DIR', str(src))
+    (tmp_path / 'in.csv').write_text('a,b\n1,2\n')
+    (tmp_path / 'out.json').write_text('{}')
+    return tmp_path
+
+@pytest.fixture
+def stage(project):
+    return {'name': 'stage', 'module': 'stage', 'params': {'limit': 50},
+            'inputs': [str(project / 'in.csv')], 'outputs': [str(project / 'out.json')]}
+
+def built(project, stage):
+    """A cache that has recorded stage as built, saved and read back"""
+    cache = BuildCache(str(project / '.build_manifest.json'))
+    cache.record(stage, cache.fingerprint(stage))
+    cache.save()
+    return BuildCache(str(project / '.build_manifest.json'))
+
+def is_fresh(project, stage):
+    cache = BuildCache(str(project / '.build_manifest.json'))
+    return cache.is_fresh(stage, cache.fingerprint(stage))
+
+def test_module_sources_follow_src_imports(project):
+    assert [os.path.basename(p) for p in build_cache.module_sources('stage')] == ['helper.py', 'stage.py']
+
+def test_unchanged_stage_is_fresh(project, stage):
+    built(project, stage)
+    assert is_fresh(project, stage)
+    # Rewriting the same bytes changes the mtime, not the fingerprint
+    (project / 'in.csv').write_text('a,b\n1,2\n')
+    os.utime(project / 'in.csv', ns=(1, 1))
+    assert is_fresh(project, stage)
+
+@pytest.mark.parametrize('change', ['input', 'imported source', 'params', 'missing output', 'missing input'])
+def test_changes_invalidate(project, stage, change):
+    built(project, stage)
+    if change == 'input':
+        (project / 'in.csv').write_text('a,b\n1,3\n')
+    elif change == 'imported source':
+        (project / 'src' / 'helper.py').write_text('def f():\n    return 2\n')
+    elif change == 'params':
+        stage = {**stage, 'params': {'limit': 100}}
+    elif change == 'missing output':
+        os.remove(project / 'out.json')
+    else:
+        os.remove(project / 'in.csv')
+    assert not is_fresh(project, stage)
+
+def test_forgotten_or_other_version_is_stale(project, stage):
+    cache = built(project, stage)
+    cache.forget(stage)
+    cache.save()
+    assert not is_fresh(project, stage)
+
+    built(project, stage)
+    path = project / '.build_manifest.json'
+    path.write_text(path.read_text().replace(f'"version": {build_cache.MANIFEST_VERSION}', '"version": 0'))
+    assert not is_fresh(project, stage)
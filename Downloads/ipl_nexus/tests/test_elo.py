@@ -0,0 +1,77 @@
+"""Incremental Elo updates against a full replay, and the sweep against the tracker"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from elo import EloTracker, home_flags, match_arrays
+from elo_sweep import score_configs
+
+PARAMS = {'k_factor': 30, 'home_advantage': 50, 'mov_scale': 1, 'season_regression': 0.25}
+
+@pytest.fixture
+def matches(synthetic_frames):
+    return synthetic_frames[0]
+
+def full_replay(matches):
+    tracker = EloTracker(**PARAMS)
+    tracker.process_matches(matches)
+    return tracker
+
+def assert_same_ratings(tracker, expected):
+    assert tracker.ratings == pytest.approx(expected.ratings)
+    pd.testing.assert_frame_equal(tracker.history.reset_index(drop=True),
+                                  expected.history.reset_index(drop=True), check_dtype=False)
+
+def test_update_from_checkpoint_matches_full_replay(matches, tmp_path):
+    path = str(tmp_path / 'elo_checkpoint.json')
+    ordered = matches.sort_values(['date', 'match_id'])
+    cut = len(ordered) * 2 // 3
+
+    tracker = EloTracker(**PARAMS)
+    tracker.update(ordered.iloc[:cut])
+    tracker.save(path)
+
+    tracker = EloTracker.load(path, **PARAMS)
+    applied, replayed = tracker.update(matches)
+    assert not replayed
+    assert len(applied) == len(matches) - cut
+    assert_same_ratings(tracker, full_replay(matches))
+
+    # Nothing new: nothing applied, nothing replayed
+    applied, replayed = tracker.update(matches)
+    assert applied.empty and not replayed
+
+def test_changed_result_replays(matches):
+    tracker = full_replay(matches)
+    first = matches.sort_values(['date', 'match_id']).index[0]
+    edited = matches.copy()
+    edited.loc[first, 'match_won_by'] = 'No Result'
+
+    _, replayed = tracker.update(edited)
+    assert replayed
+    assert_same_ratings(tracker, full_replay(edited))
+
+def test_home_flags_use_earlier_matches_only():
+    df = pd.DataFrame({'team1': ['A', 'A', 'B', 'A'], 'team2': ['B', 'C', 'A', 'B'],
+                       'venue': ['X', 'Y', 'Y', 'Y']})
+    # No home ground before a team's first match; A's X/Y tie in match 3 goes to X
+    counts = {}
+    assert home_flags(df, counts).tolist() == [0, 0, 0, 1]
+    assert counts['A'] == {'X': 1, 'Y': 3}
+
+    # Continuing from the counts of the first two matches gives the same flags
+    counts = {}
+    home_flags(df.iloc[:2], counts)
+    assert home_flags(df.iloc[2:], counts).tolist() == [0, 1]
+
+def test_sweep_scores_the_tracker_probabilities(matches):
+    _, teams, arrays = match_arrays(matches)
+    configs = [[PARAMS[name] for name in ('k_factor', 'home_advantage', 'mov_scale', 'season_regression')]]
+    log_loss, brier = score_configs(arrays, configs, len(teams))
+
+    history = full_replay(matches).history
+    decided = history['winner'].eq(history['team1']) | history['winner'].eq(history['team2'])
+    y = history.loc[decided, 'winner'].eq(history.loc[decided, 'team1']).astype(float)
+    p = history.loc[decided, 'win_prob_team1'].astype(float)
+    assert log_loss[0] == pytest.approx(-(y * np.log(p) + (1 - y) * np.log(1 - p)).mean())
+    assert brier[0] == pytest.approx(((p - y) ** 2).mean())
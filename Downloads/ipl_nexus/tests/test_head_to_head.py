@@ -0,0 +1,53 @@
+"""The head-to-head tensor against a plain count over the synthetic matches"""
+from collections import Counter
+
+import pandas as pd
+
+from head_to_head import build_h2h, h2h_slice
+
+def naive_totals(matches, min_season=None):
+    """(team_a, team_b) -> Counter of played/wins/losses/runs from team_a's side, one match at a time"""
+    totals = {}
+    for m in matches.to_dict('records'):
+        if pd.isna(m['team1']) or pd.isna(m['team2']) or (min_season and m['season'] < min_season):
+            continue
+        for a, b in [(m['team1'], m['team2']), (m['team2'], m['team1'])]:
+            runs = m['first_innings_runs'] if m['bat_first_team'] == a else m['second_innings_runs']
+            totals.setdefault((a, b), Counter()).update(
+                played=1, wins=int(m['match_won_by'] == a), losses=int(m['match_won_by'] == b),
+                runs=0 if pd.isna(runs) else runs)
+    return totals
+
+def test_pair_totals(synthetic_frames):
+    matches = synthetic_frames[0]
+    h2h = build_h2h(matches)
+    for min_season in (None, matches['season'].max() - 3):
+        totals = h2h_slice(h2h, min_season=min_season)
+        expected = naive_totals(matches, min_season)
+        assert set(totals.index) == set(expected)
+        for pair, counts in expected.items():
+            row = totals.loc[pair]
+            assert (row['played'], row['wins'], row['losses']) == (counts['played'], counts['wins'], counts['losses'])
+            assert row['runs'] == counts['runs']
+
+def test_both_sides_agree(synthetic_frames):
+    totals = h2h_slice(build_h2h(synthetic_frames[0]), by=['season'])
+    mirrored = totals.swaplevel('team_a', 'team_b').reindex(totals.index)
+    assert (totals['played'] == mirrored['played']).all()
+    assert (totals['wins'] == mirrored['losses']).all()
+
+def test_batting_first_split_and_missing_venue():
+    matches = pd.DataFrame([
+        {'team1': 'A', 'team2': 'B', 'season': 2020, 'venue': 'V', 'bat_first_team': 'A', 'match_won_by': 'A',
+         'first_innings_runs': 180, 'second_innings_runs': 150},
+        {'team1': 'B', 'team2': 'A', 'season': 2020, 'venue': None, 'bat_first_team': 'A', 'match_won_by': 'B',
+         'first_innings_runs': 140, 'second_innings_runs': 141},
+        {'team1': 'A', 'team2': 'B', 'season': 2021, 'venue': 'V', 'bat_first_team': 'B', 'match_won_by': 'No Result',
+         'first_innings_runs': 60, 'second_innings_runs': None},
+    ]).astype({'first_innings_runs': float, 'second_innings_runs': float})
+    split = h2h_slice(build_h2h(matches), by=['batted_first'])
+    assert split.loc[('A', 'B', True), ['played', 'wins', 'losses', 'runs', 'scored']].tolist() == [2, 1, 1, 320, 2]
+    assert split.loc[('A', 'B', False), ['played', 'wins', 'losses', 'runs', 'scored']].tolist() == [1, 0, 0, 0, 0]
+    assert split.loc[('B', 'A', False), ['played', 'wins', 'losses', 'runs', 'scored']].tolist() == [2, 1, 1, 291, 2]
+    # The match with no venue is still counted
+    assert h2h_slice(build_h2h(matches))['played'].tolist() == [3, 3]
@@ -0,0 +1,27 @@
+"""Partnerships split on wickets and retirements"""
+import pandas as pd
+
+from generate_comprehensive_stats import compute_partnerships
+
+def test_retired_not_out_ends_the_stand_but_not_the_wicket():
+    rows = []
+    def ball(n, batter, non_striker, runs, wicket_kind=None, extra_type=None):
+        rows.append({'match_id': 1, 'innings': 1, 'over': n // 6, 'ball': n % 6 + 1, 'season': 2020,
+                     'batting_team': 'A', 'batter': batter, 'non_striker': non_striker, 'runs_total': runs,
+                     'extra_type': extra_type, 'wicket_kind': wicket_kind})
+    ball(0, 'P', 'Q', 4)
+    ball(1, 'P', 'Q', 1, extra_type='wides')
+    ball(2, 'P', 'Q', 0, wicket_kind='bowled')       # 1st wicket: P and Q, 5 runs
+    ball(3, 'R', 'Q', 6)
+    ball(4, 'R', 'Q', 0, wicket_kind='retired hurt')  # Q retires: R and Q, still the 2nd wicket
+    ball(5, 'R', 'S', 2)
+    ball(6, 'S', 'R', 0, wicket_kind='caught')       # 2nd wicket falls: R and S
+    ball(7, 'T', 'S', 1)                             # 3rd wicket, unbroken
+
+    stands = compute_partnerships(pd.DataFrame(rows))
+    assert stands[['wicket', 'batter', 'partner', 'runs', 'balls', 'ended']].values.tolist() == [
+        [1, 'P', 'Q', 5, 2, 1],
+        [2, 'R', 'Q', 6, 2, 0],
+        [2, 'R', 'S', 2, 2, 1],
+        [3, 'T', 'S', 1, 1, 0],
+    ]
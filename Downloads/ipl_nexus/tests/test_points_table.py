@@ -0,0 +1,96 @@
+"""
+Points tables on a small hand-built season covering super overs (recorded
+winner, decided on runs, on boundary count, a double super over, still level)
+and a rain-reduced match.
+"""
+import pandas as pd
+import pytest
+
+from points_table import build_points_tables, innings_totals, super_over_winners
+
+def innings(match_id, number, batting, bowling, runs, balls=120, wickets=0, fours=0):
+    """Legal deliveries adding up to runs (fours boundaries, the rest in twos), the last wickets balls dismissals"""
+    rest = runs - 4 * fours
+    scores = [4] * fours + [2] * (rest // 2) + [1] * (rest % 2)
+    assert len(scores) <= balls, "use more balls or fours"
+    scores += [0] * (balls - len(scores))
+    return [{
+        'match_id': match_id, 'innings': number, 'batting_team': batting, 'bowling_team': bowling,
+        'runs_batter': r, 'runs_total': r, 'extra_type': None,
+        'wicket_kind': 'bowled' if i >= balls - wickets else None
+    } for i, r in enumerate(scores)]
+
+def match(match_id, team1, team2, winner='Unknown', result_type=None):
+    return {'match_id': match_id, 'season': 2020, 'date': f'2020-04-{match_id:02d}',
+            'team1': team1, 'team2': team2, 'match_won_by': winner, 'result_type': result_type}
+
+@pytest.fixture
+def season():
+    matches, balls = [], []
+    def add(row, *innings_rows):
+        matches.append(row)
+        for rows in innings_rows:
+            balls.extend(rows)
+
+    # 1: A beat B outright
+    add(match(1, 'A', 'B', 'A'), innings(1, 1, 'A', 'B', 150, wickets=5), innings(1, 2, 'B', 'A', 140, wickets=8))
+    # 2: tied, no winner recorded; C won the super over on runs
+    add(match(2, 'A', 'C', result_type='tie'),
+        innings(2, 1, 'A', 'C', 150), innings(2, 2, 'C', 'A', 150),
+        innings(2, 3, 'A', 'C', 8, balls=6), innings(2, 4, 'C', 'A', 9, balls=5))
+    # 3: tied with B recorded as winner, which stands even though C made more in the super over
+    add(match(3, 'B', 'C', 'B', 'tie'),
+        innings(3, 1, 'B', 'C', 150), innings(3, 2, 'C', 'B', 150),
+        innings(3, 3, 'B', 'C', 8, balls=6), innings(3, 4, 'C', 'B', 12, balls=6))
+    # 4: super over level on runs; B hit more boundaries over the whole match
+    add(match(4, 'A', 'B', result_type='tie'),
+        innings(4, 1, 'A', 'B', 150, fours=10), innings(4, 2, 'B', 'A', 150, fours=12),
+        innings(4, 3, 'A', 'B', 10, balls=6, fours=1), innings(4, 4, 'B', 'A', 10, balls=6, fours=1))
+    # 5: super over level on runs and boundaries, so the points are shared
+    add(match(5, 'B', 'C', result_type='tie'),
+        innings(5, 1, 'B', 'C', 150, fours=10), innings(5, 2, 'C', 'B', 150, fours=10),
+        innings(5, 3, 'B', 'C', 10, balls=6, fours=1), innings(5, 4, 'C', 'B', 10, balls=6, fours=1))
+    # 6: first super over tied, A won the second
+    add(match(6, 'A', 'C', result_type='tie'),
+        innings(6, 1, 'A', 'C', 150), innings(6, 2, 'C', 'A', 150),
+        innings(6, 3, 'A', 'C', 7, balls=6), innings(6, 4, 'C', 'A', 7, balls=6),
+        innings(6, 5, 'C', 'A', 6, balls=6), innings(6, 6, 'A', 'C', 7, balls=4))
+    # 7: cut to 15 overs a side; C was bowled out in 10 overs and is charged 15
+    add(match(7, 'A', 'C', 'A'), innings(7, 1, 'A', 'C', 120, balls=90, wickets=3),
+        innings(7, 2, 'C', 'A', 60, balls=60, wickets=10))
+    # 8: washed out
+    add(match(8, 'B', 'C', result_type='no result'), innings(8, 1, 'B', 'C', 30, balls=24))
+
+    matches = pd.DataFrame(matches)
+    # The ball cache carries each match's recorded winner on every delivery
+    balls = pd.DataFrame(balls).merge(matches[['match_id', 'match_won_by']], on='match_id')
+    return balls, matches
+
+def test_super_over_winners(season):
+    balls, _ = season
+    winners = super_over_winners(balls).to_dict()
+    assert winners == {2: 'C', 3: 'C', 4: 'B', 6: 'A'}
+
+def test_standings(season):
+    balls, matches = season
+    table = {row['team']: row for row in build_points_tables(balls, matches)['2020']}
+
+    assert {t: (r['wins'], r['losses'], r['ties'], r['no_result']) for t, r in table.items()} == {
+        'A': (3, 2, 0, 0),  # beat B, won the double super over and the reduced match
+        'B': (2, 1, 1, 1),  # recorded winner of 3, boundary count in 4
+        'C': (1, 3, 1, 1),
+    }
+    assert {t: r['points'] for t, r in table.items()} == {'A': 6, 'B': 6, 'C': 4}
+    assert [r['team'] for r in build_points_tables(balls, matches)['2020']][:2] == sorted(
+        ['A', 'B'], key=lambda t: -table[t]['nrr'])
+
+def test_reduced_quota_for_all_out_side(season):
+    balls, _ = season
+    totals = innings_totals(balls).set_index(['match_id', 'innings'])
+    # Bowled out in a 15-over match: charged 90 balls, not 120
+    assert totals.loc[(7, 2), 'balls'] == 60
+    assert totals.loc[(7, 2), 'nrr_balls'] == 90
+    # Full-length innings are charged what they faced
+    assert totals.loc[(1, 2), 'nrr_balls'] == 120
+    # Super overs never count towards NRR
+    assert 3 not in totals.index.get_level_values('innings')
@@ -0,0 +1,41 @@
+"""process_data's append mode against a full rebuild of the same raw data"""
+import shutil
+
+import pandas as pd
+import pytest
+
+from process_data import process_data, MATCHES_PATH, RAW_PATH
+from utils import load_balls, BALLS_CACHE_PATH
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """An empty project directory to run in, as the pipeline runs from the project root"""
+    (tmp_path / 'data').mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def processed():
+    return pd.read_csv(MATCHES_PATH), load_balls(BALLS_CACHE_PATH)
+
+def test_append_matches_full_rebuild(project, synthetic_csv):
+    raw = pd.read_csv(synthetic_csv, low_memory=False)
+    ids = raw['match_id'].unique()
+
+    shutil.copy(synthetic_csv, RAW_PATH)
+    process_data()
+    full_matches, full_balls = processed()
+
+    # The same history arriving in two batches
+    raw[raw['match_id'].isin(ids[:40])].to_csv(RAW_PATH, index=False)
+    process_data()
+    shutil.copy(synthetic_csv, RAW_PATH)
+    process_data(append=True)
+    matches, balls = processed()
+
+    assert len(matches) == len(ids) == len(full_matches)
+    pd.testing.assert_frame_equal(matches, full_matches)
+    pd.testing.assert_frame_equal(balls, full_balls)
+
+    # Nothing new: the processed files are left alone
+    process_data(append=True)
+    pd.testing.assert_frame_equal(processed()[0], full_matches)
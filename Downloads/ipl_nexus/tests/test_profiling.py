@@ -0,0 +1,22 @@
+"""Stage metrics: per-stage memory peaks and output sizes"""
+import numpy as np
+import pytest
+
+from profiling import path_bytes, profile_stage, reset_peak_rss
+
+def test_peak_rss_is_per_stage():
+    if not reset_peak_rss():
+        pytest.skip("the peak RSS cannot be reset on this OS")
+    with profile_stage('big') as big:
+        np.ones(200 * 2 ** 20 // 8).sum()
+    with profile_stage('small') as small:
+        np.ones(1000).sum()
+    assert big['peak_rss_scope'] == small['peak_rss_scope'] == 'stage'
+    assert big['peak_rss_mb'] - small['peak_rss_mb'] > 150
+
+def test_output_bytes_skip_compressed_copies(tmp_path):
+    (tmp_path / 'shards').mkdir()
+    for name, size in [('a.json', 100), ('a.json.gz', 30), ('a.json.br', 20),
+                       ('shards/b.json', 50), ('shards/b.json.gz', 10), ('shards/.state.json', 5)]:
+        (tmp_path / name).write_bytes(b'x' * size)
+    assert path_bytes([str(tmp_path / 'a.json'), str(tmp_path / 'shards'), str(tmp_path / 'missing.json')]) == 150
@@ -0,0 +1,23 @@
+"""The ball cache round trip"""
+import pandas as pd
+
+from utils import to_ball_schema, save_balls, load_balls
+
+def test_ball_cache_is_mapped_without_copying(tmp_path):
+    path = str(tmp_path / 'balls.feather')
+    save_balls(to_ball_schema(pd.DataFrame({
+        'match_id': [1, 1, 2], 'innings': [1, 1, 2], 'runs_total': [4, 0, 6],
+        'batter': ['A', 'B', 'A'], 'wicket_kind': [None, 'bowled', None],
+        'date': ['2020-04-01'] * 3,
+    })), path)
+
+    balls = load_balls(path)
+    assert balls['runs_total'].tolist() == [4, 0, 6]
+    assert balls['batter'].tolist() == ['A', 'B', 'A']
+    assert balls['wicket_kind'].isna().tolist() == [True, False, True]
+    # Views of the read-only mapping, not copies owned by this process
+    for col in ('match_id', 'runs_total', 'date'):
+        assert not balls[col].to_numpy().flags.writeable
+    assert not balls['batter'].cat.codes.to_numpy().flags.writeable
+
+    assert load_balls(path, columns=['match_id'])['match_id'].tolist() == [1, 1, 2]
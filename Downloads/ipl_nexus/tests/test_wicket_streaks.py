@@ -0,0 +1,61 @@
+"""Hat tricks and wickets-in-consecutive-overs spells on hand-built overs"""
+import pandas as pd
+
+from wicket_streaks import find_consecutive_over_wickets, find_wicket_streaks, wicket_streak_records
+
+# One character per delivery: '.' dot ball, 'W' bowled, 'R' run out, 'w' wide,
+# 'S' stumped off a wide
+def over(number, bowler, deliveries, match_id=1, innings=1):
+    rows, ball = [], 0
+    for i, d in enumerate(deliveries):
+        wide = d in 'wS'
+        ball += not wide
+        rows.append({
+            'match_id': match_id, 'innings': innings, 'over': number, 'ball': float(f'{number}.{max(ball, 1)}'),
+            'bowler': bowler, 'extra_type': 'wides' if wide else None,
+            'wicket_kind': {'W': 'bowled', 'R': 'run out', 'S': 'stumped'}.get(d),
+            'player_out': f'{bowler}-{number}-{i}' if d in 'WRS' else None,
+        })
+    return rows
+
+def balls(*overs):
+    return pd.DataFrame([row for rows in overs for row in rows])
+
+def test_streak_carries_across_overs_and_skips_wides():
+    streaks = find_wicket_streaks(balls(
+        over(0, 'X', '....WW'),
+        over(1, 'Y', 'W.....'), # another bowler's over does not break X's sequence
+        over(2, 'X', 'wW....'),
+    ))
+    assert streaks[['bowler', 'over', 'last_over', 'wickets']].values.tolist() == [['X', 0, 2, 3]]
+    assert streaks['victims'][0] == ['X-0-4', 'X-0-5', 'X-2-1']
+
+def test_run_out_breaks_a_streak_but_a_stumping_off_a_wide_does_not():
+    streaks = find_wicket_streaks(balls(
+        over(0, 'X', 'WRW...'),
+        over(0, 'Z', 'WSW...', innings=2),
+    ))
+    assert streaks[['bowler', 'innings', 'wickets']].values.tolist() == [['Z', 2, 3]]
+
+def test_streaks_stay_within_a_match():
+    streaks = find_wicket_streaks(balls(over(19, 'X', '....WW'), over(0, 'X', 'W.....', match_id=2)))
+    assert streaks['wickets'].tolist() == [2]
+
+def test_wickets_in_consecutive_overs():
+    spells = find_consecutive_over_wickets(balls(
+        over(0, 'X', 'W.....'), over(2, 'X', '..W..W'), over(4, 'X', '.....W'), over(6, 'X', '......'),
+        over(1, 'Y', 'W.....'), over(3, 'Y', 'W.....'),
+    ))
+    assert spells[['bowler', 'overs', 'wickets', 'first_over', 'last_over']].values.tolist() == [['X', 3, 4, 0, 4]]
+
+def test_records():
+    matches = pd.DataFrame([{'match_id': 1, 'season': 2020, 'team1': 'A', 'team2': 'B', 'venue': 'V'}])
+    records = wicket_streak_records(balls(over(0, 'X', 'WWWW..'), over(2, 'X', 'W.....'), over(4, 'X', 'W.....')),
+                                    matches)
+    [hat_trick] = records['hat_tricks']
+    assert hat_trick == {'bowler': 'X', 'season': 2020, 'match': 'A vs B', 'venue': 'V',
+                         'victims': ['X-0-0', 'X-0-1', 'X-0-2', 'X-0-3'], 'wickets': 4, 'innings': 1,
+                         'over': 1, 'spans_overs': False}
+    assert records['four_in_four'] == [hat_trick]
+    assert [(r['overs'], r['wickets'], r['first_over'], r['last_over'])
+            for r in records['wickets_in_consecutive_overs']] == [(3, 6, 1, 5)]
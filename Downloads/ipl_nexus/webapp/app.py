@@ -1,8 +1,43 @@
-from flask import Flask, render_template, send_from_directory
+from flask import Flask, render_template, send_from_directory, jsonify, request, redirect, url_for
+from werkzeug.security import safe_join
+from functools import lru_cache
+import hashlib
+import json
 import os
+import re
+import sys
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
+DATA_DIR = os.path.join(app.static_folder, 'data')
+MATCHUP_DIR = os.path.join(DATA_DIR, 'matchups')
+
+# Precompressed copies written by src/compress_data.py, in order of preference,
+# and its record of the content hash each file's copies were made from
+PRECOMPRESSED = {'br': '.br', 'gzip': '.gz'}
+COMPRESSED_RECORD_PATH = os.path.join(DATA_DIR, '.compressed.json')
+
+# Logical name -> content-hashed name, written by src/data_manifest.py
+# (digests are the first 12 hex characters of the file's sha256)
+MANIFEST_PATH = os.path.join(DATA_DIR, 'manifest.json')
+HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<ext>\.json)$')
+ONE_YEAR = 365 * 24 * 3600
+
+# Match predictor (src/predictor.py). Without the model's dependencies or files,
+# /api/predict answers 503 for what the prediction table does not cover and the
+# rest of the app still runs.
+PROJECT_DIR = os.path.dirname(app.root_path)
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'src'))
+MAX_FIXTURES = 10000
+FIXTURE_COLUMNS = ['team1', 'team2', 'venue', 'toss_winner', 'toss_decision']
+PREDICTION_TABLE_PATH = os.path.join(DATA_DIR, 'prediction_table.json')
+try:
+    from predictor import MatchPredictor, PREDICTOR_INPUTS
+    predictor_import_error = None
+except Exception as e: # e.g. xgboost missing or built for another numpy
+    MatchPredictor, predictor_import_error = None, f'{type(e).__name__}: {e}'
+    app.logger.exception("Could not import the match predictor")
+
 # Production configuration
 app.config['ENV'] = os.getenv('FLASK_ENV', 'production')
 app.config['DEBUG'] = os.getenv('FLASK_DEBUG', 'False') == 'True'
@@ -31,9 +66,377 @@ def archetypes():
 def player_matchup():
     return render_template('player_matchup.html')
 
+@app.route('/stats')
+def stats():
+    return render_template('stats.html')
+
+_manifest = {'mtime_ns': None, 'files': {}}
+_compressed = {'mtime_ns': None, 'files': {}}
+
+def load_json_state(path, state):
+    """The JSON file at path, reloaded into state whenever the pipeline rewrites it ({} if missing)"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if mtime_ns != state['mtime_ns']:
+        with open(path) as f:
+            state.update(mtime_ns=mtime_ns, files=json.load(f))
+    return state['files']
+
+def load_data_manifest():
+    """The data manifest, reloaded whenever the pipeline rewrites it"""
+    return load_json_state(MANIFEST_PATH, _manifest)
+
+_digests = {}
+
+def file_digest(path):
+    """Content digest of a file, recomputed only when its size or mtime changes"""
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    if _digests.get(path, (None,))[0] != key:
+        with open(path, 'rb') as f:
+            _digests[path] = (key, hashlib.sha256(f.read()).hexdigest()[:12])
+    return _digests[path][1]
+
+def content_digest(filename):
+    """
+    Content hash of a data file, or None unless the manifest lists it with that
+    hash (a file rewritten since, e.g. by running one generator, is not).
+    """
+    hashed = load_data_manifest().get(filename)
+    path = safe_join(DATA_DIR, filename)
+    if hashed is None or path is None or not os.path.isfile(path):
+        return None
+    digest = file_digest(path)
+    return digest if HASHED_NAME.match(hashed)['digest'] == digest else None
+
+@app.context_processor
+def data_url_helper():
+    def data_url(filename):
+        """URL of a data file, under its content-hashed name when the manifest has a current one"""
+        if content_digest(filename):
+            filename = load_data_manifest()[filename]
+        return url_for('serve_data', filename=filename)
+    return {'data_url': data_url}
+
+def precompressed_encoding(filename):
+    """
+    Best encoding the client accepts that has a precompressed copy of filename
+    made from its current content (per compress_data's record), or None
+    """
+    path = safe_join(DATA_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    entry = load_json_state(COMPRESSED_RECORD_PATH, _compressed).get(filename)
+    if entry is None or entry['digest'] != file_digest(path):
+        return None
+    available = [encoding for encoding, suffix in PRECOMPRESSED.items()
+                 if entry['copies'].get(suffix) and os.path.isfile(path + suffix)]
+    return request.accept_encodings.best_match(available) if available else None
+
 @app.route('/data/<path:filename>')
 def serve_data(filename):
-    return send_from_directory('static/data', filename)
+    # Content-hashed names never change content, so they are cached for good;
+    # plain names are revalidated on every use against a strong ETag
+    immutable = False
+    hashed = HASHED_NAME.match(filename)
+    if hashed and hashed['stem'] + hashed['ext'] in load_data_manifest():
+        filename = hashed['stem'] + hashed['ext']
+        digest = content_digest(filename)
+        if digest != hashed['digest']:
+            # Requested by a page from before the last rebuild
+            response = redirect(url_for('serve_data', filename=load_data_manifest()[filename]
+                                        if digest else filename))
+            response.cache_control.no_store = True
+            return response
+        immutable = True
+    digest = content_digest(filename)
+
+    encoding = precompressed_encoding(filename)
+    if encoding:
+        response = send_from_directory(DATA_DIR, filename + PRECOMPRESSED[encoding], mimetype='application/json',
+                                       etag=f'{digest}-{encoding}' if digest else True,
+                                       max_age=ONE_YEAR if immutable else None)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(DATA_DIR, filename, etag=digest or True,
+                                       max_age=ONE_YEAR if immutable else None)
+    if immutable:
+        response.cache_control.immutable = True
+    # Caches must key on Accept-Encoding, since the same URL has several encodings
+    response.vary.add('Accept-Encoding')
+    return response
+
+# Team API data files and page sizes
+TEAM_FILES = {'matches': 'team_matches.json', 'performance': 'team_performance.json',
+              'analytics': 'team_analytics.json'}
+MATCHES_PER_PAGE = 20
+MAX_MATCHES_PER_PAGE = 100
+
+_team_index = {'mtimes': None, 'teams': {}}
+
+def load_team_index():
+    """
+    team -> {'seasons': {season: match rows by date}, 'matches': every row in order,
+    'performance': ..., 'analytics': ...} from the generated team files. Built once
+    per worker (at startup) and rebuilt only when the pipeline rewrites a file.
+    """
+    paths = [os.path.join(DATA_DIR, name) for name in TEAM_FILES.values()]
+    mtimes = [os.stat(path).st_mtime_ns for path in paths]
+    if mtimes != _team_index['mtimes']:
+        data = {}
+        for key, path in zip(TEAM_FILES, paths):
+            with open(path) as f:
+                data[key] = json.load(f)
+
+        teams = {}
+        for team, by_season in data['matches'].items():
+            seasons = {}
+            for season in sorted(by_season, key=int):
+                seasons[season] = [{'season': int(season), **match} for match in by_season[season]]
+            teams[team] = {
+                'seasons': seasons,
+                'matches': [match for rows in seasons.values() for match in rows],
+                'performance': data['performance'].get(team),
+                'analytics': data['analytics'].get(team),
+            }
+        _team_index.update(mtimes=mtimes, teams=teams)
+    return _team_index['teams']
+
+def team_index_or_error(team=None):
+    """(index, None), or (None, error response) if the data is missing or the team unknown"""
+    try:
+        index = load_team_index()
+    except FileNotFoundError:
+        return None, (jsonify({'error': 'Team data has not been generated'}), 503)
+    if team is not None and team not in index:
+        return None, (jsonify({'error': f'No team named {team}'}), 404)
+    return index, None
+
+@app.route('/api/teams')
+def teams_api():
+    index, error = team_index_or_error()
+    if error:
+        return error
+    return jsonify({'teams': sorted(index)})
+
+@app.route('/api/teams/<team>')
+def team_api(team):
+    index, error = team_index_or_error(team)
+    if error:
+        return error
+    entry = index[team]
+    return jsonify({
+        'team': team,
+        'seasons': [int(season) for season in entry['seasons']],
+        'performance': entry['performance'],
+        'analytics': entry['analytics'],
+    })
+
+@app.route('/api/teams/<team>/matches')
+def team_matches_api(team):
+    """One page of a team's matches by date, optionally for one season and/or venue"""
+    index, error = team_index_or_error(team)
+    if error:
+        return error
+    season = request.args.get('season')
+    venue = request.args.get('venue')
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', MATCHES_PER_PAGE))
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be integers'}), 400
+    if page < 1 or not 1 <= per_page <= MAX_MATCHES_PER_PAGE:
+        return jsonify({'error': f'page must be at least 1 and per_page between 1 and {MAX_MATCHES_PER_PAGE}'}), 400
+
+    entry = index[team]
+    matches = entry['seasons'].get(season, []) if season else entry['matches']
+    if venue:
+        venue = venue.casefold()
+        matches = [match for match in matches if match['venue'].casefold() == venue]
+
+    start = (page - 1) * per_page
+    return jsonify({
+        'team': team,
+        'season': int(season) if season and season.isdigit() else season,
+        'venue': request.args.get('venue'),
+        'page': page,
+        'per_page': per_page,
+        'total': len(matches),
+        'pages': -(-len(matches) // per_page),
+        'matches': matches[start:start + per_page],
+    })
+
+def fixture_error(fixture):
+    """Why a fixture cannot be scored, or None"""
+    if not isinstance(fixture, dict):
+        return 'each fixture must be an object'
+    missing = [field for field in FIXTURE_COLUMNS if not isinstance(fixture.get(field), str)]
+    if missing:
+        return f"missing or non-string fields: {', '.join(missing)}"
+    if fixture['team1'] == fixture['team2']:
+        return 'team1 and team2 must differ'
+    if fixture['toss_winner'] not in (fixture['team1'], fixture['team2']):
+        return 'toss_winner must be team1 or team2'
+    if fixture['toss_decision'] not in ('bat', 'field'):
+        return "toss_decision must be 'bat' or 'field'"
+    return None
+
+_predictor = {'mtimes': None, 'predictor': None, 'error': None}
+
+def load_predictor():
+    """
+    (predictor, None) with the latest model, encoders and Elo ratings, loaded
+    once per worker and again only when the pipeline rewrites one of them; or
+    (None, reason) if it cannot be loaded
+    """
+    if MatchPredictor is None:
+        return None, predictor_import_error
+    try:
+        mtimes = [os.stat(os.path.join(PROJECT_DIR, path)).st_mtime_ns for path in PREDICTOR_INPUTS]
+    except FileNotFoundError as e:
+        _predictor.update(mtimes=None, predictor=None, error=f'{type(e).__name__}: {e}')
+        return None, _predictor['error']
+    if mtimes != _predictor['mtimes']:
+        try:
+            _predictor.update(predictor=MatchPredictor.load(PROJECT_DIR), error=None)
+        except Exception as e:
+            # A corrupt pickle or an incompatible xgboost must not take the app down;
+            # the load is retried once the files change again
+            app.logger.exception("Could not load the match predictor")
+            _predictor.update(predictor=None, error=f'{type(e).__name__}: {e}')
+        _predictor['mtimes'] = mtimes
+    return _predictor['predictor'], _predictor['error']
+
+_prediction_table = {'mtime': None, 'table': None}
+
+def load_prediction_table():
+    """
+    The pipeline's precomputed predictions (see src/prediction_table.py) with
+    team and venue positions, reloaded only when the pipeline rewrites the file
+    """
+    mtime = os.stat(PREDICTION_TABLE_PATH).st_mtime_ns
+    if mtime != _prediction_table['mtime']:
+        with open(PREDICTION_TABLE_PATH) as f:
+            table = json.load(f)
+        table['team_index'] = {team: i for i, team in enumerate(table['teams'])}
+        table['venue_index'] = {venue: i for i, venue in enumerate(table['venues'])}
+        table['decision_index'] = {d: i for i, d in enumerate(table['toss_decisions'])}
+        _prediction_table.update(mtime=mtime, table=table)
+    return _prediction_table['table']
+
+def table_prediction(table, fixture):
+    """(team1_win_prob, elo_team1_win_prob) from the table, or None if it does not cover the fixture"""
+    i = table['team_index'].get(fixture['team1'])
+    j = table['team_index'].get(fixture['team2'])
+    v = table['venue_index'].get(fixture['venue'])
+    if i is None or j is None or v is None:
+        return None
+    toss = 0 if fixture['toss_winner'] == fixture['team1'] else 1
+    decision = table['decision_index'][fixture['toss_decision']]
+    # Same layout as prediction_table.table_index
+    n_teams, n_venues, n_decisions = len(table['teams']), len(table['venues']), len(table['toss_decisions'])
+    index = (((i * n_teams + j) * n_venues + v) * 2 + toss) * n_decisions + decision
+    return table['team1_win_prob'][index], table['elo_team1_win_prob'][i][j]
+
+@app.route('/api/predict', methods=['GET', 'POST'])
+def predict_api():
+    """
+    Win probabilities for one fixture (GET query parameters, or a POSTed object)
+    or many ({"fixtures": [...]}), each with team1, team2, venue, toss_winner
+    and toss_decision. Fixtures covered by the precomputed table are looked up;
+    the rest are scored together in one model call. A team the model was not
+    trained on is refused (400), as it would only get a made-up probability;
+    an unseen venue is scored and reported in 'unseen'.
+    """
+    if request.method == 'GET':
+        fixtures = [{field: request.args.get(field) for field in FIXTURE_COLUMNS}]
+    else:
+        body = request.get_json(silent=True)
+        fixtures = body.get('fixtures', [body]) if isinstance(body, dict) else None
+        if not isinstance(fixtures, list):
+            return jsonify({'error': 'Send a fixture object or {"fixtures": [...]} as JSON'}), 400
+    if len(fixtures) > MAX_FIXTURES:
+        return jsonify({'error': f'At most {MAX_FIXTURES} fixtures per request'}), 400
+    for i, fixture in enumerate(fixtures):
+        error = fixture_error(fixture)
+        if error:
+            return jsonify({'error': f'fixture {i}: {error}'}), 400
+
+    try:
+        table = load_prediction_table()
+    except FileNotFoundError:
+        table = None
+    scores = [table_prediction(table, fixture) if table else None for fixture in fixtures]
+    missing = [i for i, score in enumerate(scores) if score is None]
+    # Everything in the table is known to the model, so only misses can have unseen fields
+    unseen = {}
+    if missing:
+        predictor, predictor_error = load_predictor()
+        if predictor is None:
+            return jsonify({'error': f'Match predictor is unavailable: {predictor_error}'}), 503
+        for i in missing:
+            unseen[i] = predictor.unseen(fixtures[i])
+            teams = [fixtures[i][field] for field in ('team1', 'team2') if field in unseen[i]]
+            if teams:
+                return jsonify({'error': f"fixture {i}: unknown team {', '.join(teams)}"}), 400
+        scored = predictor.predict([fixtures[i] for i in missing])
+        for i, score in zip(missing, scored.itertuples(index=False)):
+            scores[i] = (score.team1_win_prob, score.elo_team1_win_prob)
+
+    predictions = []
+    for i, (fixture, (win_prob, elo_win_prob)) in enumerate(zip(fixtures, scores)):
+        prediction = {field: fixture[field] for field in FIXTURE_COLUMNS}
+        prediction['team1_win_prob'] = round(win_prob, 4)
+        prediction['team2_win_prob'] = round(1 - win_prob, 4)
+        prediction['elo_team1_win_prob'] = round(elo_win_prob, 4)
+        if unseen.get(i):
+            prediction['unseen'] = unseen[i]
+        predictions.append(prediction)
+    return jsonify({'predictions': predictions})
+
+_matchup_index = {'mtime': None, 'index': None}
+
+def load_matchup_index():
+    """
+    Batter -> shard file index written by generate_player_matchup_data.py,
+    reloaded (dropping every cached shard) when the pipeline rewrites it
+    """
+    path = os.path.join(MATCHUP_DIR, 'index.json')
+    mtime = os.stat(path).st_mtime_ns
+    if mtime != _matchup_index['mtime']:
+        with open(path) as f:
+            index = json.load(f)
+        load_matchup_shard.cache_clear()
+        _matchup_index.update(mtime=mtime, index=index)
+    return _matchup_index['index']
+
+@lru_cache(maxsize=256)
+def load_matchup_shard(shard):
+    """All matchups for one batter, keyed by bowler (cleared with the index)"""
+    with open(os.path.join(MATCHUP_DIR, shard)) as f:
+        return json.load(f)
+
+@app.route('/api/matchup/<batter>/<bowler>')
+def matchup_api(batter, bowler):
+    try:
+        shard = load_matchup_index()['shards'].get(batter)
+        record = load_matchup_shard(shard).get(bowler) if shard else None
+    except FileNotFoundError:
+        # No data yet, or a shard went missing while the pipeline rewrites matchups/
+        return jsonify({'error': 'Matchup data has not been generated'}), 503
+
+    if record is None:
+        return jsonify({'error': f'No matchup found for {batter} vs {bowler}'}), 404
+    return jsonify(record)
+
+# Build the team index, prediction table and predictor as each worker starts rather than on its first request
+for loader in (load_team_index, load_prediction_table, load_predictor):
+    try:
+        loader()
+    except FileNotFoundError:
+        pass
 
 # Error handlers
 @app.errorhandler(404)
@@ -484,6 +484,88 @@ function renderPartnerships(container, category) {
     `;
 }
 
+function renderPartnershipsByWicket(container) {
+    const byWicket = statsData.partnership.partnerships_by_wicket || {};
+    const data = Object.keys(byWicket)
+        .sort((a, b) => Number(a) - Number(b))
+        .filter(wicket => byWicket[wicket].length > 0)
+        .map(wicket => byWicket[wicket][0]);
+    
+    container.innerHTML = `
+        <div class="stats-header">
+            <h2>Highest Partnership For Each Wicket</h2>
+            <p>Record stand for every wicket from 1st to 10th (* unbroken)</p>
+        </div>
+        <table class="stats-table">
+            <thead>
+                <tr>
+                    <th class="text-center">Wicket</th>
+                    <th class="text-center">Runs</th>
+                    <th class="text-center">Balls</th>
+                    <th>Batsmen</th>
+                    <th>Team</th>
+                    <th class="text-center">Season</th>
+                </tr>
+            </thead>
+            <tbody>
+                ${data.map(partnership => `
+                    <tr>
+                        <td class="text-center">${partnership.wicket}</td>
+                        <td class="text-center stat-highlight">${partnership.runs}${partnership.unbroken ? '*' : ''}</td>
+                        <td class="text-center">${partnership.balls}</td>
+                        <td>${partnership.batsmen.join(' & ')}</td>
+                        <td>${partnership.team}</td>
+                        <td class="text-center">${partnership.season}</td>
+                    </tr>
+                `).join('')}
+            </tbody>
+        </table>
+    `;
+}
+
+function renderTopPartnershipPairs(container) {
+    const data = (statsData.partnership.top_pairs || []).slice(0, 50);
+    
+    container.innerHTML = `
+        <div class="stats-header">
+            <h2>Top Batting Pairs</h2>
+            <p>Most partnership runs together, across all wickets</p>
+        </div>
+        <table class="stats-table">
+            <thead>
+                <tr>
+                    <th>Rank</th>
+                    <th>Batsmen</th>
+                    <th class="text-center">Runs</th>
+                    <th class="text-center">Inns</th>
+                    <th class="text-center">Avg</th>
+                    <th class="text-center">Highest</th>
+                    <th class="text-center">50s</th>
+                    <th class="text-center">100s</th>
+                </tr>
+            </thead>
+            <tbody>
+                ${data.map((pair, idx) => `
+                    <tr>
+                        <td>
+                            <span class="rank-badge rank-${idx < 3 ? idx + 1 : 'other'}">
+                                ${idx + 1}
+                            </span>
+                        </td>
+                        <td>${pair.batsmen.join(' & ')}</td>
+                        <td class="text-center stat-highlight">${pair.runs}</td>
+                        <td class="text-center">${pair.innings}</td>
+                        <td class="text-center">${pair.avg}</td>
+                        <td class="text-center">${pair.highest}</td>
+                        <td class="text-center">${pair.fifties}</td>
+                        <td class="text-center">${pair.hundreds}</td>
+                    </tr>
+                `).join('')}
+            </tbody>
+        </table>
+    `;
+}
+
 // ========== ADDITIONAL BATTING FUNCTIONS ==========
 function renderHighestAvg(container) {
     const data = statsData.batting.highest_avg.slice(0, 50);